@@ -0,0 +1,104 @@
+import logging
+import queue
+import threading
+import time
+
+
+class AlertDispatcher:
+    """
+    Background dispatch queue for alert notifications.
+
+    Alerts submitted within coalesce_seconds of each other (e.g. the four
+    metric alerts of one drift run) are delivered together as one batch to
+    every sender. Each sender is a callable taking the list of alert events
+    and raising on failure; failed senders are retried with exponential
+    backoff. The final status ("Sent" or "Failed") of each batch is passed
+    to on_status together with the ids of its alerts.
+
+    Callers never wait for delivery: submit() only enqueues.
+    """
+
+    def __init__(self, senders, on_status=None, coalesce_seconds: float = 2.0, max_batch_size: int = 100,
+                 max_attempts: int = 3, backoff_seconds: float = 1.0, sleep=time.sleep):
+        self.senders = list(senders)
+        self.on_status = on_status
+        self.coalesce_seconds = coalesce_seconds
+        self.max_batch_size = max_batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self._sleep = sleep
+        self._queue = queue.Queue()
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def submit(self, event_id, event: dict):
+        """
+        Queues an alert for delivery and returns immediately.
+        """
+        with self._idle:
+            self._pending += 1
+        self._ensure_started()
+        self._queue.put((event_id, event))
+
+    def _ensure_started(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+                self._thread.start()
+
+    def drain(self, timeout: float = None):
+        """
+        Waits until every submitted alert has been delivered or has failed.
+        Returns False if the timeout expired first.
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.coalesce_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._deliver(batch)
+            except Exception:
+                logging.exception("Alert dispatcher failed to process a batch")
+            finally:
+                with self._idle:
+                    self._pending -= len(batch)
+                    self._idle.notify_all()
+
+    def _deliver(self, batch):
+        event_ids = [event_id for event_id, _ in batch if event_id is not None]
+        events = [event for _, event in batch]
+        status = "Sent"
+        for sender in self.senders:
+            if not self._send_with_retry(sender, events):
+                status = "Failed"
+        logging.info(f"Dispatched {len(events)} alert(s) in one batch: {status}")
+        if self.on_status and event_ids:
+            self.on_status(event_ids, status)
+
+    def _send_with_retry(self, sender, events):
+        name = getattr(sender, "__name__", repr(sender))
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                sender(events)
+                return True
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    logging.error(f"Alert sender {name} failed after {attempt} attempts: {e}")
+                    return False
+                delay = self.backoff_seconds * 2 ** (attempt - 1)
+                logging.warning(f"Alert sender {name} failed (attempt {attempt}), retrying in {delay:.1f}s: {e}")
+                self._sleep(delay)
+        return False
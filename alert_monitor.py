@@ -0,0 +1,94 @@
+import datetime
+import logging
+import threading
+
+from alert_store import get_alert_store
+
+# Seconds between two polls of the alert store by the background worker
+ALERT_POLL_SECONDS = 2.0
+# Newest alerts kept in the shared snapshot
+ALERT_SNAPSHOT_NEWEST = 10
+
+
+class AlertSnapshotWorker:
+    """
+    Single background worker per server process keeping a snapshot of the alerts.
+
+    Every poll_seconds it syncs the alert store with alerts.log (an offset
+    read, so only new lines are parsed) and rebuilds a small snapshot: the
+    total and last-24-hour counts from the rollups and the newest alerts.
+    The version is bumped only when the snapshot changed, so sessions can
+    compare versions and re-render only when there is something new.
+    """
+
+    def __init__(self, poll_seconds: float = ALERT_POLL_SECONDS, newest: int = ALERT_SNAPSHOT_NEWEST):
+        self.poll_seconds = poll_seconds
+        self.newest = newest
+        self._current = (0, None)
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+
+    def start(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self.poll()
+                self._thread = threading.Thread(target=self._run, name="alert-snapshot", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.poll()
+            except Exception:
+                logging.exception("Alert snapshot refresh failed")
+
+    def poll(self):
+        """
+        Syncs the store and rebuilds the snapshot; returns True if it changed.
+        """
+        with self._poll_lock:
+            return self._poll()
+
+    def _poll(self):
+        store = get_alert_store()
+        store.sync()
+        type_counts = {}
+        for _, alert_type, count in store.rollup_counts("day"):
+            type_counts[alert_type] = type_counts.get(alert_type, 0) + count
+        since = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y-%m-%dT%H")
+        snapshot = {
+            "total": sum(type_counts.values()),
+            "last_24h": sum(count for _, _, count in store.rollup_counts("hour", since=since)),
+            "type_counts": type_counts,
+            "newest": store.query(limit=self.newest),
+        }
+        version, current = self._current
+        if snapshot == current:
+            return False
+        # Replaced as a whole, so readers never see a half-built snapshot or a mismatched version
+        self._current = (version + 1, snapshot)
+        return True
+
+    def current(self):
+        """Returns (version, snapshot)."""
+        return self._current
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_alert_snapshot_worker():
+    """Returns the process-wide snapshot worker, starting it on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = AlertSnapshotWorker()
+        return _worker.start()
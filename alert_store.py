@@ -0,0 +1,987 @@
+import os
+import atexit
+import contextlib
+import datetime
+import hashlib
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+
+import perf
+from alert_dispatch import AlertDispatcher
+from alert_writer import AlertLogWriter, alert_log_lock, list_alert_log_segments
+from metric_series import record_alert_metrics
+
+# Alert log file name
+ALERTS_LOG_FILE = "alert/alerts.log" # Ensure this path is correct
+# Indexed alert database used by the dashboard
+ALERTS_DB_FILE = "alert/alerts.db"
+# Storage backend for alerts: "sqlite" (indexed, filters pushed down) or "jsonl" (plain alerts.log).
+# Both append through the shared alerts.log writer, so any number of processes can log alerts
+ALERT_STORAGE = "sqlite"
+# Repeats of the same alert within this many seconds are counted, not logged (0 disables)
+ALERT_SUPPRESSION_SECONDS = 3600
+# Seconds a process waits at exit for queued alert notifications to be delivered
+ALERT_DISPATCH_EXIT_TIMEOUT_SECONDS = 30
+# Maximum number of alert fingerprints kept in memory for suppression
+ALERT_FINGERPRINT_INDEX_SIZE = 10000
+# Group commit thresholds for alerts.log: pending events or seconds, whichever comes first
+ALERT_LOG_FLUSH_EVENTS = 100
+ALERT_LOG_FLUSH_SECONDS = 1.0
+# "commit" fsyncs every group commit, "never" leaves it to the OS
+ALERT_LOG_FSYNC = "commit"
+# alerts.log is rotated past this size (None disables) and/or at the first write of each day
+ALERT_LOG_ROTATE_BYTES = 64 * 1024 * 1024
+ALERT_LOG_ROTATE_DAILY = False
+
+
+def _read_complete_lines(path: str, offset: int, size: int = None):
+    """
+    Reads the complete lines of path between offset and size (default: end of file).
+
+    A trailing partial line is left for the next read, the writer may still be
+    on it. Returns the decoded non-empty lines and the offset after the last one.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read() if size is None else f.read(max(size - offset, 0))
+    except FileNotFoundError:
+        # A rotated segment may have been pruned already
+        return [], offset
+    end = chunk.rfind(b"\n") + 1
+    lines = [line.strip() for line in chunk[:end].decode("utf-8").splitlines()]
+    return [line for line in lines if line], offset + end
+
+
+def _find_segment(path: str, inode):
+    """Returns the path of the rotated segment of path with the given inode, if any."""
+    for segment in list_alert_log_segments(path):
+        if segment.get("inode") == inode:
+            return os.path.join(os.path.dirname(path), segment["file"])
+    return None
+
+
+def _event_order(event):
+    """Sort key of the reader: timestamp, ties broken by id like the (timestamp, id) query cursor."""
+    return event['timestamp'], event.get('id') or ''
+
+
+class AlertLogReader:
+    """
+    Incremental reader for a JSON-lines alert log.
+
+    Remembers the byte offset and inode of the last read, so each refresh
+    only parses lines appended since then. Segments rotated away by
+    AlertLogWriter are found through the log manifest: the first refresh
+    loads them before the live log, and lines appended to a segment just
+    before its rotation are still picked up. A shrunken file (truncation)
+    or an unknown new inode triggers a full re-read. Parsed events are kept
+    sorted by timestamp, oldest first; events() walks them newest first
+    without copying, and the alert types and timestamp bounds are kept up to
+    date as events are merged.
+
+    Lines recording a suppressed repeat ({"duplicate_of": id, "timestamp": ...})
+    or a delivery status ({"status_of": [ids], "status": ...}) are not events;
+    they update hit_count and last_seen, or status, of the events with those ids.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._offset = 0
+        self._inode = None
+        self._loaded_segments = False
+        self._events = []
+        self._events_by_id = {}
+        self._alert_types = set()
+        self._bounds = (None, None)
+
+    def refresh(self):
+        """
+        Parses lines appended since the last refresh and returns how many events were added.
+        """
+        with self._lock:
+            new_events, records = self._parse(self._read_new_lines())
+            self._merge(new_events)
+            self._apply_records(records)
+            return len(new_events)
+
+    def _read_new_lines(self):
+        """Collects the lines not read yet (caller holds the lock)."""
+        with alert_log_lock(self.path):
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                stat = None
+
+            lines = []
+            if self._inode is not None and (stat is None or stat.st_ino != self._inode or stat.st_size < self._offset):
+                segments = list_alert_log_segments(self.path)
+                inodes = [segment.get("inode") for segment in segments]
+                if self._inode in inodes and (stat is None or stat.st_ino != self._inode):
+                    # Rotated: finish the old segment and any rotated after it, then read the new log
+                    segment_offset = self._offset
+                    for segment in segments[inodes.index(self._inode):]:
+                        lines.extend(_read_complete_lines(self._segment_path(segment), segment_offset)[0])
+                        segment_offset = 0
+                    self._offset = 0
+                else:
+                    logging.info(f"{self.path} was truncated or replaced, re-reading it from the start")
+                    self._reset()
+
+            if not self._loaded_segments:
+                for segment in list_alert_log_segments(self.path):
+                    lines.extend(_read_complete_lines(self._segment_path(segment), 0)[0])
+                self._loaded_segments = True
+
+            self._inode = stat.st_ino if stat is not None else None
+            if stat is not None and stat.st_size > self._offset:
+                new_lines, self._offset = _read_complete_lines(self.path, self._offset, stat.st_size)
+                lines.extend(new_lines)
+            return lines
+
+    def _segment_path(self, segment):
+        return os.path.join(os.path.dirname(self.path), segment["file"])
+
+    def _parse(self, lines):
+        """Returns (events, duplicate and status records) parsed from lines."""
+        events, records = [], []
+        for line in lines:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                logging.warning(f"Skipping malformed log line in {self.path}: {line}")
+                continue
+            if 'duplicate_of' in event or 'status_of' in event:
+                records.append(event)
+                continue
+            if 'status' not in event: # Compatibility for old log lines if they exist
+                event['status'] = 'N/A'
+            events.append(event)
+        return events, records
+
+    def _apply_records(self, records):
+        """Applies duplicate and status records to their events, in log order (caller holds the lock)."""
+        for record in records:
+            if 'duplicate_of' in record:
+                event = self._events_by_id.get(record['duplicate_of'])
+                if event is None:
+                    # The original alert is in a segment that was pruned already
+                    continue
+                event['hit_count'] = event.get('hit_count', 1) + 1
+                event['last_seen'] = max(event.get('last_seen') or '', record['timestamp'])
+            else:
+                for event_id in record['status_of']:
+                    event = self._events_by_id.get(event_id)
+                    if event is not None:
+                        event['status'] = record['status']
+
+    def _merge(self, new_events):
+        """Merges new events into the sorted store (caller holds the lock)."""
+        if not new_events:
+            return
+        self._events_by_id.update((event['id'], event) for event in new_events if 'id' in event)
+        self._alert_types.update(event['alert_type'] for event in new_events)
+        new_events.sort(key=_event_order)
+        first, last = self._bounds
+        self._bounds = (min(first or new_events[0]['timestamp'], new_events[0]['timestamp']),
+                        max(last or new_events[-1]['timestamp'], new_events[-1]['timestamp']))
+        if not self._events or _event_order(new_events[0]) >= _event_order(self._events[-1]):
+            # Common case: appended events are newer than everything already loaded
+            self._events.extend(new_events)
+        else:
+            # A new list, so iterators handed out by events() keep walking the old one
+            self._events = sorted(itertools.chain(self._events, new_events), key=_event_order)
+
+    def events(self):
+        """
+        Returns an iterator over the loaded events, newest first.
+        Events merged while it is consumed are not included.
+        """
+        with self._lock:
+            events, count = self._events, len(self._events)
+        return (events[position] for position in range(count - 1, -1, -1))
+
+    def alert_types(self):
+        """Returns the set of alert types of the loaded events."""
+        with self._lock:
+            return set(self._alert_types)
+
+    def timestamp_bounds(self):
+        """Returns the (oldest, newest) timestamps of the loaded events, (None, None) if there are none."""
+        with self._lock:
+            return self._bounds
+
+
+# One reader per log file, shared by every session of the server process
+_readers = {}
+_readers_lock = threading.Lock()
+
+
+def get_alert_log_reader(path: str = None):
+    path = path or ALERTS_LOG_FILE
+    with _readers_lock:
+        if path not in _readers:
+            _readers[path] = AlertLogReader(path)
+        return _readers[path]
+
+
+# One buffered writer per log file, shared by every session of the server process
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_alert_log_writer(path: str = None):
+    path = path or ALERTS_LOG_FILE
+    with _writers_lock:
+        if path not in _writers:
+            _writers[path] = AlertLogWriter(
+                path,
+                flush_events=ALERT_LOG_FLUSH_EVENTS,
+                flush_seconds=ALERT_LOG_FLUSH_SECONDS,
+                fsync=ALERT_LOG_FSYNC,
+                rotate_bytes=ALERT_LOG_ROTATE_BYTES,
+                rotate_daily=ALERT_LOG_ROTATE_DAILY
+            )
+        return _writers[path]
+
+
+def rollups_path(path: str):
+    """Per-day and per-hour alert counts of the log segments deleted by the retention job."""
+    return path + ".rollups.json"
+
+
+def _load_rollups(path: str):
+    try:
+        with open(rollups_path(path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"covered_until": None, "day": {}, "hour": {}}
+
+
+def fold_alert_segments(path: str, segment_paths):
+    """
+    Adds the per-day and per-hour counts of each alert type in the given
+    segments of a log to its rollups file, so they outlive the segments.
+    covered_until records the newest folded timestamp; events up to it are
+    counted from the rollups only. The caller holds the log lock.
+    """
+    rollups = _load_rollups(path)
+    for segment_path in segment_paths:
+        with open(segment_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                    timestamp, alert_type = event["timestamp"], event["alert_type"]
+                except (json.JSONDecodeError, KeyError):
+                    # Malformed lines, duplicate and status records are not alerts
+                    continue
+                for granularity, width in (("day", 10), ("hour", 13)):
+                    bucket = rollups[granularity].setdefault(timestamp[:width], {})
+                    bucket[alert_type] = bucket.get(alert_type, 0) + 1
+                rollups["covered_until"] = max(rollups["covered_until"] or timestamp, timestamp)
+    tmp_path = rollups_path(path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(rollups, f, sort_keys=True)
+    os.replace(tmp_path, rollups_path(path))
+
+
+def _date_upper_bound(end_date):
+    """Exclusive timestamp bound for an inclusive end date."""
+    return (end_date + datetime.timedelta(days=1)).isoformat()
+
+
+class JsonlAlertStore:
+    """
+    Alert store backed by the JSON-lines alerts.log, filtered in memory.
+    """
+
+    def __init__(self, path: str = ALERTS_LOG_FILE):
+        self.path = path
+        self.reader = get_alert_log_reader(path)
+        self._rollups = (None, _load_rollups(path))
+
+    def rollups(self):
+        """Returns the rollups of the deleted segments, re-read when the retention job changed them."""
+        try:
+            stat = os.stat(rollups_path(self.path))
+            key = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            key = None
+        if key != self._rollups[0]:
+            self._rollups = (key, _load_rollups(self.path))
+        return self._rollups[1]
+
+    def append(self, event: dict):
+        """Appends an event under a new random id, which is returned."""
+        event_id = uuid.uuid4().hex
+        get_alert_log_writer(self.path).write({"id": event_id, **event})
+        return event_id
+
+    def update_status(self, event_ids, status: str):
+        """
+        Records the delivery status of the given alerts as a status record,
+        which readers apply to the events. Returns the number of alerts.
+        """
+        event_ids = list(event_ids)
+        if not event_ids:
+            return 0
+        get_alert_log_writer(self.path).write({
+            "timestamp": datetime.datetime.now().isoformat(), "status_of": event_ids, "status": status
+        })
+        return len(event_ids)
+
+    def find_recent(self, fingerprint: str, since: str):
+        """
+        Returns (id, timestamp) of the newest alert with this fingerprint logged at or after since.
+        """
+        self.reader.refresh()
+        for event in self.reader.events():
+            if event['timestamp'] < since:
+                break
+            if 'id' in event and alert_fingerprint(event['alert_type'], event.get('details')) == fingerprint:
+                return event['id'], event['timestamp']
+        return None
+
+    def record_duplicate(self, event_id, seen_at: str):
+        """
+        Counts a suppressed repeat of an alert by appending a duplicate record,
+        which readers add to the hit counter of the original event.
+        """
+        get_alert_log_writer(self.path).write({"timestamp": seen_at, "duplicate_of": event_id})
+
+    def compact(self, before_date, dry_run: bool = False):
+        # The log itself is the store; old segments are compacted by the retention job
+        return 0
+
+    def absorb_segments(self, segment_paths):
+        """Folds log segments about to be deleted into the rollups file (caller holds the log lock)."""
+        fold_alert_segments(self.path, segment_paths)
+
+    def sync(self):
+        # Commit this process's buffered events first so they show up immediately
+        get_alert_log_writer(self.path).flush()
+        self.reader.refresh()
+
+    def alert_types(self):
+        rolled_up = {alert_type for counts in self.rollups()["day"].values() for alert_type in counts}
+        return sorted(self.reader.alert_types() | rolled_up)
+
+    def date_bounds(self):
+        # Days of deleted segments stay selectable through the rollups
+        first, last = self.reader.timestamp_bounds()
+        days = [day[:10] for day in (first, last) if day] + list(self.rollups()["day"])
+        if not days:
+            return None, None
+        return datetime.date.fromisoformat(min(days)), datetime.date.fromisoformat(max(days))
+
+    def query(self, alert_types=None, start_date=None, end_date=None, keyword=None, limit=None, before=None):
+        """
+        Returns the alerts matching all given filters, newest first.
+
+        before is an optional (timestamp, id) cursor taken from the last row of
+        the previous page; only older rows are returned, so pages never overlap.
+        """
+        events = iter(self.reader.events())
+        if before:
+            cursor = (before[0], before[1] or '')
+            events = (e for e in events if _event_order(e) < cursor)
+        if alert_types is not None:
+            alert_types = set(alert_types)
+            events = (e for e in events if e['alert_type'] in alert_types)
+        if start_date:
+            events = (e for e in events if e['timestamp'] >= start_date.isoformat())
+        if end_date:
+            events = (e for e in events if e['timestamp'] < _date_upper_bound(end_date))
+        if keyword:
+            keyword = keyword.lower()
+            events = (e for e in events if keyword in json.dumps(e['details'], ensure_ascii=False).lower())
+        return list(itertools.islice(events, limit)) if limit else list(events)
+
+    def rollup_counts(self, granularity: str, alert_types=None, start_date=None, end_date=None, since=None):
+        """
+        Same contract as SQLiteAlertStore.rollup_counts, counted from the in-memory
+        events plus the rollups of the segments deleted by the retention job.
+        """
+        width = {"day": 10, "hour": 13}[granularity]
+        rollups = self.rollups()
+        covered_until = rollups["covered_until"]
+        type_filter = None if alert_types is None else set(alert_types)
+        counts = {}
+        for bucket, type_counts in rollups[granularity].items():
+            if ((start_date and bucket < start_date.isoformat()) or (end_date and bucket >= _date_upper_bound(end_date))
+                    or (since and bucket < since)):
+                continue
+            for alert_type, count in type_counts.items():
+                if type_filter is None or alert_type in type_filter:
+                    counts[(bucket, alert_type)] = counts.get((bucket, alert_type), 0) + count
+        for event in self.query(alert_types=type_filter, start_date=start_date, end_date=end_date):
+            if covered_until and event['timestamp'] <= covered_until:
+                # Still loaded by this reader, but already counted in the rollups
+                continue
+            bucket = event['timestamp'][:width]
+            if since and bucket < since:
+                continue
+            counts[(bucket, event['alert_type'])] = counts.get((bucket, event['alert_type']), 0) + 1
+        return [(bucket, alert_type, count) for (bucket, alert_type), count in sorted(counts.items())]
+
+
+class SQLiteAlertStore:
+    """
+    Alert store backed by SQLite with indexes on timestamp and alert_type
+    and a trigram FTS5 index over details, so dashboard filters run in the
+    database and only matching rows are loaded.
+
+    Appends go through the shared AlertLogWriter of alerts.log like those of
+    every other process, so all writers share its group commit, file lock
+    and rotation; the database is filled by import_jsonl(), which remembers
+    how far it got, so calling it again only picks up newly appended lines.
+    Events are identified by the random id written with them in the log
+    ("uid" in the database); duplicate and status records refer to it.
+    """
+
+    def __init__(self, path: str = ALERTS_DB_FILE, log_path: str = ALERTS_LOG_FILE):
+        self.path = path
+        self.log_path = log_path
+        self.has_fts = False
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id INTEGER PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    alert_type TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'N/A',
+                    details TEXT NOT NULL DEFAULT '{}',
+                    fingerprint TEXT,
+                    hit_count INTEGER NOT NULL DEFAULT 1,
+                    last_seen TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts (timestamp);
+                CREATE INDEX IF NOT EXISTS idx_alerts_type_timestamp ON alerts (alert_type, timestamp);
+                CREATE TABLE IF NOT EXISTS import_state (
+                    source TEXT PRIMARY KEY,
+                    inode INTEGER,
+                    offset INTEGER NOT NULL
+                );
+            """)
+            self._migrate(conn)
+            self._create_rollups(conn)
+            try:
+                conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS alerts_fts USING fts5(
+                        details, content='alerts', content_rowid='id', tokenize='trigram'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS alerts_fts_insert AFTER INSERT ON alerts BEGIN
+                        INSERT INTO alerts_fts (rowid, details) VALUES (new.id, new.details);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS alerts_fts_delete AFTER DELETE ON alerts BEGIN
+                        INSERT INTO alerts_fts (alerts_fts, rowid, details) VALUES ('delete', old.id, old.details);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS alerts_fts_update AFTER UPDATE OF details ON alerts BEGIN
+                        INSERT INTO alerts_fts (alerts_fts, rowid, details) VALUES ('delete', old.id, old.details);
+                        INSERT INTO alerts_fts (rowid, details) VALUES (new.id, new.details);
+                    END;
+                """)
+                self.has_fts = True
+            except sqlite3.OperationalError as e:
+                # Older SQLite builds lack FTS5 or the trigram tokenizer; keyword search falls back to LIKE
+                logging.warning(f"Full-text index unavailable for {path}: {e}")
+
+    @staticmethod
+    def _migrate(conn):
+        """Adds columns introduced after a database was created."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(alerts)")}
+        if "fingerprint" not in columns:
+            conn.execute("ALTER TABLE alerts ADD COLUMN fingerprint TEXT")
+            conn.create_function(
+                "alert_fingerprint", 2,
+                lambda alert_type, details: alert_fingerprint(alert_type, json.loads(details))
+            )
+            conn.execute("UPDATE alerts SET fingerprint = alert_fingerprint(alert_type, details)")
+        if "hit_count" not in columns:
+            conn.execute("ALTER TABLE alerts ADD COLUMN hit_count INTEGER NOT NULL DEFAULT 1")
+        if "last_seen" not in columns:
+            conn.execute("ALTER TABLE alerts ADD COLUMN last_seen TEXT")
+        if "uid" not in columns:
+            conn.execute("ALTER TABLE alerts ADD COLUMN uid TEXT")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_alerts_uid ON alerts (uid) WHERE uid IS NOT NULL")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_alerts_fingerprint ON alerts (fingerprint, timestamp)")
+
+    @staticmethod
+    def _create_rollups(conn):
+        """
+        Creates the per-(day, alert_type) and per-(hour, alert_type) count tables.
+
+        Triggers keep them in step with every insert and delete on alerts, so
+        the statistics and trend charts never have to scan raw events.
+        """
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS alert_daily_counts (
+                day TEXT NOT NULL,
+                alert_type TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (day, alert_type)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS alert_hourly_counts (
+                hour TEXT NOT NULL,
+                alert_type TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (hour, alert_type)
+            ) WITHOUT ROWID;
+            CREATE TRIGGER IF NOT EXISTS alert_rollups_insert AFTER INSERT ON alerts BEGIN
+                INSERT INTO alert_daily_counts (day, alert_type, count)
+                VALUES (substr(new.timestamp, 1, 10), new.alert_type, 1)
+                ON CONFLICT (day, alert_type) DO UPDATE SET count = count + 1;
+                INSERT INTO alert_hourly_counts (hour, alert_type, count)
+                VALUES (substr(new.timestamp, 1, 13), new.alert_type, 1)
+                ON CONFLICT (hour, alert_type) DO UPDATE SET count = count + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS alert_rollups_delete AFTER DELETE ON alerts BEGIN
+                UPDATE alert_daily_counts SET count = count - 1
+                WHERE day = substr(old.timestamp, 1, 10) AND alert_type = old.alert_type;
+                UPDATE alert_hourly_counts SET count = count - 1
+                WHERE hour = substr(old.timestamp, 1, 13) AND alert_type = old.alert_type;
+            END;
+        """)
+        # Backfill databases created before the rollup tables existed
+        has_rollups = conn.execute("SELECT 1 FROM alert_daily_counts LIMIT 1").fetchone()
+        has_alerts = conn.execute("SELECT 1 FROM alerts LIMIT 1").fetchone()
+        if has_alerts and not has_rollups:
+            conn.executescript("""
+                INSERT INTO alert_daily_counts (day, alert_type, count)
+                SELECT substr(timestamp, 1, 10), alert_type, COUNT(*) FROM alerts GROUP BY 1, 2;
+                INSERT INTO alert_hourly_counts (hour, alert_type, count)
+                SELECT substr(timestamp, 1, 13), alert_type, COUNT(*) FROM alerts GROUP BY 1, 2;
+            """)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Yields a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(event: dict):
+        return (
+            event['timestamp'],
+            event['alert_type'],
+            event.get('status', 'N/A'),
+            json.dumps(event.get('details') or {}, ensure_ascii=False),
+            alert_fingerprint(event['alert_type'], event.get('details')),
+            event.get('id'),
+        )
+
+    def append(self, event: dict):
+        """
+        Appends an event to alerts.log under a new random id, which is returned;
+        it shows up in the database with the next sync().
+        """
+        event_id = uuid.uuid4().hex
+        get_alert_log_writer(self.log_path).write({"id": event_id, **event})
+        return event_id
+
+    def update_status(self, event_ids, status: str):
+        """
+        Records the delivery status of the given alerts as a status record in
+        alerts.log, applied by the next import. Returns the number of alerts.
+        """
+        event_ids = list(event_ids)
+        if not event_ids:
+            return 0
+        get_alert_log_writer(self.log_path).write({
+            "timestamp": datetime.datetime.now().isoformat(), "status_of": event_ids, "status": status
+        })
+        return len(event_ids)
+
+    def find_recent(self, fingerprint: str, since: str):
+        """
+        Returns (id, timestamp) of the newest alert with this fingerprint logged at or after since.
+        """
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT uid, timestamp FROM alerts WHERE fingerprint = ? AND timestamp >= ? AND uid IS NOT NULL "
+                "ORDER BY timestamp DESC LIMIT 1",
+                (fingerprint, since)
+            ).fetchone()
+
+    def record_duplicate(self, event_id, seen_at: str):
+        """
+        Counts a suppressed repeat of an alert by appending a duplicate record,
+        which the import adds to the hit counter of the stored alert.
+        """
+        get_alert_log_writer(self.log_path).write({"timestamp": seen_at, "duplicate_of": event_id})
+
+    def import_jsonl(self, path: str = ALERTS_LOG_FILE):
+        """
+        Imports lines appended to a JSON-lines alert log since the last import.
+        Segments rotated away since then are read through the log manifest.
+        Returns the number of imported events.
+        """
+        source = os.path.abspath(path)
+        with self._connect() as conn:
+            # Take the write lock up front so concurrent importers cannot import the same lines twice
+            conn.execute("BEGIN IMMEDIATE")
+            state = conn.execute("SELECT inode, offset FROM import_state WHERE source = ?", (source,)).fetchone()
+            if state is None and not os.path.exists(path):
+                return 0
+
+            with alert_log_lock(path):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    stat = None
+
+                lines, offset = [], 0
+                if state and stat is not None and state[0] == stat.st_ino and state[1] <= stat.st_size:
+                    offset = state[1]
+                else:
+                    # First import, or the log was rotated since: catch up on the segments first
+                    segments = list_alert_log_segments(path)
+                    inodes = [segment.get("inode") for segment in segments]
+                    start, segment_offset = 0, 0
+                    if state and state[0] in inodes:
+                        start, segment_offset = inodes.index(state[0]), state[1]
+                    elif state:
+                        start = len(segments)
+                    for segment in segments[start:]:
+                        segment_path = os.path.join(os.path.dirname(path), segment["file"])
+                        lines.extend(_read_complete_lines(segment_path, segment_offset)[0])
+                        segment_offset = 0
+
+                if stat is not None and stat.st_size > offset:
+                    new_lines, offset = _read_complete_lines(path, offset, stat.st_size)
+                    lines.extend(new_lines)
+
+            rows, duplicates, statuses = [], [], []
+            for line in lines:
+                try:
+                    event = json.loads(line)
+                    if "duplicate_of" in event:
+                        duplicates.append((event["timestamp"], event["duplicate_of"]))
+                    elif "status_of" in event:
+                        statuses.extend((event["status"], event_id) for event_id in event["status_of"])
+                    else:
+                        rows.append(self._row(event))
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    logging.warning(f"Skipping malformed log line in {path}: {line}")
+            conn.executemany(
+                "INSERT OR IGNORE INTO alerts (timestamp, alert_type, status, details, fingerprint, uid) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            # Duplicate and status records always follow the event they refer to
+            conn.executemany(
+                "UPDATE alerts SET hit_count = hit_count + 1, last_seen = MAX(COALESCE(last_seen, ''), ?) WHERE uid = ?",
+                duplicates
+            )
+            conn.executemany("UPDATE alerts SET status = ? WHERE uid = ?", statuses)
+            conn.execute(
+                "INSERT OR REPLACE INTO import_state (source, inode, offset) VALUES (?, ?, ?)",
+                (source, stat.st_ino if stat is not None else None, offset)
+            )
+        if rows:
+            logging.info(f"Imported {len(rows)} alert events from {path} into {self.path}")
+        return len(rows)
+
+    def sync(self):
+        # Commit this process's buffered events first so they show up immediately
+        get_alert_log_writer(self.log_path).flush()
+        self.import_jsonl(self.log_path)
+
+    def absorb_segments(self, segment_paths):
+        # sync() imported the segments, and the rollup tables keep their counts after compact()
+        pass
+
+    def alert_types(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT alert_type FROM alert_daily_counts WHERE count > 0 ORDER BY alert_type"
+            )]
+
+    def rollup_counts(self, granularity: str, alert_types=None, start_date=None, end_date=None, since=None):
+        """
+        Returns (bucket, alert_type, count) rows from the "day" or "hour" rollup.
+
+        Buckets are "YYYY-MM-DD" for days and "YYYY-MM-DDTHH" for hours;
+        since is an optional lower bound on the bucket string.
+        """
+        table, column = {"day": ("alert_daily_counts", "day"), "hour": ("alert_hourly_counts", "hour")}[granularity]
+        clauses, params = ["count > 0"], []
+        if alert_types is not None:
+            alert_types = list(alert_types)
+            if not alert_types:
+                return []
+            clauses.append(f"alert_type IN ({', '.join('?' * len(alert_types))})")
+            params.extend(alert_types)
+        if start_date:
+            clauses.append(f"{column} >= ?")
+            params.append(start_date.isoformat())
+        if end_date:
+            clauses.append(f"{column} < ?")
+            params.append(_date_upper_bound(end_date))
+        if since:
+            clauses.append(f"{column} >= ?")
+            params.append(since)
+        sql = f"SELECT {column}, alert_type, count FROM {table} WHERE {' AND '.join(clauses)} ORDER BY {column}"
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def date_bounds(self):
+        # From the daily rollup, so days whose raw alerts were compacted stay selectable
+        with self._connect() as conn:
+            first, last = conn.execute("SELECT MIN(day), MAX(day) FROM alert_daily_counts WHERE count > 0").fetchone()
+        if first is None:
+            return None, None
+        return datetime.date.fromisoformat(first), datetime.date.fromisoformat(last)
+
+    def query(self, alert_types=None, start_date=None, end_date=None, keyword=None, limit=None, before=None):
+        """
+        Returns the alerts matching all given filters, newest first.
+
+        before is an optional (timestamp, id) cursor taken from the last row of
+        the previous page; only older rows are returned, so pages never overlap.
+        """
+        clauses, params = [], []
+        if before:
+            clauses.append("(timestamp, id) < (?, ?)")
+            params.extend(before)
+        if alert_types is not None:
+            alert_types = list(alert_types)
+            if not alert_types:
+                return []
+            clauses.append(f"alert_type IN ({', '.join('?' * len(alert_types))})")
+            params.extend(alert_types)
+        if start_date:
+            clauses.append("timestamp >= ?")
+            params.append(start_date.isoformat())
+        if end_date:
+            clauses.append("timestamp < ?")
+            params.append(_date_upper_bound(end_date))
+        if keyword:
+            if self.has_fts and len(keyword) >= 3:
+                # A quoted phrase over trigrams is a case-insensitive substring match
+                clauses.append("id IN (SELECT rowid FROM alerts_fts WHERE alerts_fts MATCH ?)")
+                params.append('"' + keyword.replace('"', '""') + '"')
+            else:
+                clauses.append("details LIKE ? ESCAPE '\\'")
+                params.append("%" + keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        sql = "SELECT id, timestamp, alert_type, status, details, hit_count, last_seen FROM alerts"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC, id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [
+            {
+                "id": row[0], "timestamp": row[1], "alert_type": row[2], "status": row[3],
+                "details": json.loads(row[4]), "hit_count": row[5], "last_seen": row[6],
+            }
+            for row in rows
+        ]
+
+    def compact(self, before_date, dry_run: bool = False):
+        """
+        Deletes raw alerts older than before_date while keeping their daily and
+        hourly rollups, so statistics and trend charts still cover those days.
+        Returns the number of alerts deleted (or that would be deleted).
+        """
+        bound = before_date.isoformat()
+        with self._connect() as conn:
+            if dry_run:
+                return conn.execute("SELECT COUNT(*) FROM alerts WHERE timestamp < ?", (bound,)).fetchone()[0]
+            conn.execute("BEGIN IMMEDIATE")
+            # The delete trigger decrements the rollups; restore the counts of the compacted buckets afterwards
+            daily = conn.execute("SELECT day, alert_type, count FROM alert_daily_counts WHERE day < ?", (bound,)).fetchall()
+            hourly = conn.execute("SELECT hour, alert_type, count FROM alert_hourly_counts WHERE hour < ?", (bound,)).fetchall()
+            deleted = conn.execute("DELETE FROM alerts WHERE timestamp < ?", (bound,)).rowcount
+            conn.executemany("INSERT OR REPLACE INTO alert_daily_counts (day, alert_type, count) VALUES (?, ?, ?)", daily)
+            conn.executemany("INSERT OR REPLACE INTO alert_hourly_counts (hour, alert_type, count) VALUES (?, ?, ?)", hourly)
+        if deleted:
+            logging.info(f"Compacted {deleted} alerts older than {bound} from {self.path} into rollups")
+        return deleted
+
+
+def alert_fingerprint(alert_type: str, details: dict = None):
+    """
+    Identifies repeats of the same alert by its type and the name and description of its details.
+    """
+    details = details or {}
+    if "name" in details or "description" in details:
+        key = [alert_type, details.get("name"), details.get("description")]
+    else:
+        key = [alert_type, details]
+    return hashlib.sha1(json.dumps(key, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class AlertDeduplicator:
+    """
+    Bounded index of recently logged alert fingerprints.
+
+    An alert whose fingerprint was stored less than window_seconds ago is a
+    duplicate: the stored alert's hit counter and last-seen time are updated
+    instead of appending a new event, and no notification is sent. Only the
+    max_fingerprints most recently seen fingerprints are kept in memory;
+    older ones are looked up in the store when it supports it.
+    """
+
+    def __init__(self, window_seconds: float = ALERT_SUPPRESSION_SECONDS, max_fingerprints: int = ALERT_FINGERPRINT_INDEX_SIZE):
+        self.window_seconds = window_seconds
+        self.max_fingerprints = max_fingerprints
+        self.lock = threading.Lock()
+        self._index = OrderedDict()  # fingerprint -> (event_id, first_seen)
+        self.suppressed = 0
+
+    def match(self, store, fingerprint: str, now: datetime.datetime):
+        """
+        Returns the id of the stored alert that fingerprint duplicates, or None.
+        Callers hold self.lock so the check and the following write are atomic.
+        """
+        if not self.window_seconds:
+            return None
+        window_start = now - datetime.timedelta(seconds=self.window_seconds)
+        entry = self._index.get(fingerprint)
+        if entry is None:
+            recent = store.find_recent(fingerprint, window_start.isoformat())
+            if recent is not None:
+                entry = (recent[0], datetime.datetime.fromisoformat(recent[1]))
+                self.remember(fingerprint, *entry)
+        if entry is None or entry[1] < window_start:
+            return None
+        self._index.move_to_end(fingerprint)
+        self.suppressed += 1
+        return entry[0]
+
+    def remember(self, fingerprint: str, event_id, first_seen: datetime.datetime):
+        self._index[fingerprint] = (event_id, first_seen)
+        self._index.move_to_end(fingerprint)
+        while len(self._index) > self.max_fingerprints:
+            self._index.popitem(last=False)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_alert_store(storage: str = None):
+    """
+    Returns the shared alert store for the configured ALERT_STORAGE backend.
+    The SQLite store imports alerts.log on first use.
+    """
+    storage = storage or ALERT_STORAGE
+    with _stores_lock:
+        if storage not in _stores:
+            if storage == "sqlite":
+                store = SQLiteAlertStore(ALERTS_DB_FILE, ALERTS_LOG_FILE)
+                store.import_jsonl(ALERTS_LOG_FILE)
+            elif storage == "jsonl":
+                store = JsonlAlertStore(ALERTS_LOG_FILE)
+            else:
+                raise ValueError(f"Unknown alert storage backend: {storage}")
+            _stores[storage] = store
+        return _stores[storage]
+
+
+# Dispatcher delivering logged alerts to notification senders, None until configured
+_dispatcher = None
+
+
+def configure_alert_dispatcher(senders, **options):
+    """
+    Starts routing logged alerts through an AlertDispatcher with the given senders.
+    Delivery statuses are written back to the configured alert store.
+    Calling it again replaces the senders of the existing dispatcher.
+    At exit the process waits up to ALERT_DISPATCH_EXIT_TIMEOUT_SECONDS for
+    queued alerts, so short-lived processes still deliver what they logged.
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = AlertDispatcher(
+            senders,
+            on_status=lambda event_ids, status: get_alert_store().update_status(event_ids, status),
+            **options
+        )
+        atexit.register(_drain_alert_dispatcher, _dispatcher)
+    else:
+        _dispatcher.senders = list(senders)
+    return _dispatcher
+
+
+def _drain_alert_dispatcher(dispatcher):
+    if not dispatcher.drain(ALERT_DISPATCH_EXIT_TIMEOUT_SECONDS):
+        logging.warning(f"Exiting with alert notifications still queued after {ALERT_DISPATCH_EXIT_TIMEOUT_SECONDS} s")
+    # The delivery statuses are buffered by the log writers, whose own exit flush may already have run
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.flush()
+
+
+def get_alert_dispatcher():
+    return _dispatcher
+
+
+# Repeats of an alert within ALERT_SUPPRESSION_SECONDS are counted instead of logged
+alert_deduplicator = AlertDeduplicator()
+
+
+def log_alert_event(alert_type: str, details: dict = None):
+    """
+    Logs an alert event to the configured alert store.
+    If an alert dispatcher is configured, the alert is queued for notification
+    with status "Pending" and updated once delivery finishes.
+    A repeat of an alert logged within the suppression window only bumps the
+    hit counter of the stored alert.
+    """
+    now = datetime.datetime.now()
+    event_data = {
+        "timestamp": now.isoformat(),
+        "alert_type": alert_type,
+        "details": details if details else {}
+    }
+    store = get_alert_store()
+    fingerprint = alert_fingerprint(alert_type, event_data["details"])
+    with alert_deduplicator.lock:
+        duplicate_of = alert_deduplicator.match(store, fingerprint, now)
+        if duplicate_of is not None:
+            store.record_duplicate(duplicate_of, event_data["timestamp"])
+            logging.info(f"Suppressed duplicate alert event: Type='{alert_type}'")
+            return
+        if _dispatcher is not None:
+            event_data["status"] = "Pending"
+        event_id = store.append(event_data)
+        alert_deduplicator.remember(fingerprint, event_id, now)
+    if _dispatcher is not None:
+        _dispatcher.submit(event_id, event_data)
+    try:
+        # Metric values in the details (e.g. "Actual value 0.543", PSI) feed the trend page
+        record_alert_metrics(event_data)
+    except sqlite3.Error as e:
+        logging.warning(f"Could not record the metrics of alert '{alert_type}': {e}")
+    logging.info(f"Logged alert event: Type='{alert_type}'")
+
+
+@perf.timed("alerts.load_alert_events")
+def load_alert_events():
+    """
+    Reads all alert events from the ALERTS_LOG_FILE.
+    Only lines appended since the previous call are parsed.
+    """
+    reader = get_alert_log_reader(ALERTS_LOG_FILE)
+    reader.refresh()
+    return list(reader.events())
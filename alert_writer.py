@@ -0,0 +1,180 @@
+import atexit
+import contextlib
+import datetime
+import json
+import logging
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+FSYNC_POLICIES = ("never", "commit")
+
+
+@contextlib.contextmanager
+def _file_lock(lock_path: str):
+    """Holds an exclusive inter-process lock on lock_path."""
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def alert_log_lock(path: str):
+    """
+    Returns a context manager holding the inter-process lock of an alert log.
+    Readers hold it too, so they never observe a rotation halfway through.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return _file_lock(path + ".lock")
+
+
+def manifest_path(path: str):
+    return path + ".manifest.json"
+
+
+def list_alert_log_segments(path: str):
+    """
+    Returns the rotated segments of an alert log recorded in its manifest, oldest first.
+    Each entry has the segment "file" (relative to the log's folder), its "inode",
+    "size" and the "rotated_at" timestamp.
+    """
+    try:
+        with open(manifest_path(path), "r", encoding="utf-8") as f:
+            return json.load(f).get("segments", [])
+    except FileNotFoundError:
+        return []
+
+
+class AlertLogWriter:
+    """
+    Buffered, process-safe writer for the JSON-lines alert log.
+
+    Events are buffered in memory and written as one group commit when
+    flush_events are pending or flush_seconds have passed, whichever comes
+    first. Each commit holds an exclusive lock on "<path>.lock", so several
+    processes can append without interleaving lines. With fsync="commit"
+    every group commit is fsynced.
+
+    The log is rotated before a commit that would grow it past rotate_bytes,
+    or on the first commit of a new day when rotate_daily is set. Rotated
+    segments are renamed to "<path>.<YYYYmmdd-HHMMSS>" and listed in
+    "<path>.manifest.json" so readers can find them.
+    """
+
+    def __init__(self, path: str, flush_events: int = 100, flush_seconds: float = 1.0, fsync: str = "commit",
+                 rotate_bytes: int = None, rotate_daily: bool = False):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.path = path
+        self.flush_events = flush_events
+        self.flush_seconds = flush_seconds
+        self.fsync = fsync
+        self.rotate_bytes = rotate_bytes
+        self.rotate_daily = rotate_daily
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def write(self, event: dict):
+        """
+        Buffers an event; it reaches the file with the next group commit.
+        """
+        line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._buffer.append(line)
+            full = len(self._buffer) >= self.flush_events
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all buffered events in one locked append and returns how many were written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not lines:
+                return 0
+            data = b"".join(lines)
+            with alert_log_lock(self.path):
+                self._rotate_if_needed(len(data))
+                with open(self.path, "ab") as f:
+                    f.write(data)
+                    f.flush()
+                    if self.fsync == "commit":
+                        os.fsync(f.fileno())
+            return len(lines)
+
+    def _rotate_if_needed(self, incoming_bytes: int):
+        """Rotates the log if the next commit is due in a new segment (caller holds the file lock)."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_size == 0:
+            return
+        too_big = self.rotate_bytes is not None and stat.st_size + incoming_bytes > self.rotate_bytes
+        new_day = self.rotate_daily and datetime.date.fromtimestamp(stat.st_mtime) != datetime.date.today()
+        if too_big or new_day:
+            self._rotate()
+
+    def rotate(self):
+        """
+        Flushes pending events, then moves the current log to a timestamped
+        segment recorded in the manifest. Returns the segment path, or None if
+        the log is empty.
+        """
+        self.flush()
+        with alert_log_lock(self.path):
+            if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+                return None
+            return self._rotate()
+
+    def _rotate(self):
+        """Rotates the log (caller holds the file lock)."""
+        now = datetime.datetime.now()
+        segment = f"{self.path}.{now.strftime('%Y%m%d-%H%M%S')}"
+        suffix = 1
+        while os.path.exists(segment):
+            segment = f"{self.path}.{now.strftime('%Y%m%d-%H%M%S')}-{suffix}"
+            suffix += 1
+        stat = os.stat(self.path)
+        os.replace(self.path, segment)
+
+        segments = list_alert_log_segments(self.path)
+        segments.append({
+            "file": os.path.basename(segment),
+            "inode": stat.st_ino,
+            "size": stat.st_size,
+            "rotated_at": now.isoformat(),
+        })
+        tmp_path = manifest_path(self.path) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"log": os.path.basename(self.path), "segments": segments}, f, indent=2)
+        os.replace(tmp_path, manifest_path(self.path))
+        logging.info(f"Rotated {self.path} to {segment} ({stat.st_size} bytes)")
+        return segment
@@ -0,0 +1,283 @@
+"""
+Benchmarks of the dashboard hot paths on synthetic data.
+
+Generates an alerts.log, a reports/ tree and a results CSV of the requested
+size in a scratch workspace, times each path by calling the loaders
+directly (and optionally by rendering the pages headlessly with Streamlit's
+AppTest), and appends one JSON object per measurement to the output file,
+so runs of different commits can be compared line by line.
+
+    python bench/bench_dashboard.py --size small
+    python bench/bench_dashboard.py --alerts 1000000 --reports 500 --rows 2000000 --apptest
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# Number of alerts, reports and result rows of each preset
+SIZES = {
+    "small": {"alerts": 10_000, "reports": 10, "rows": 1_000},
+    "medium": {"alerts": 100_000, "reports": 100, "rows": 100_000},
+    "large": {"alerts": 10_000_000, "reports": 10_000, "rows": 10_000_000},
+}
+# Bytes of filler per synthetic report; real Evidently reports are about 3.5 MB
+REPORT_BYTES = 256 * 1024
+REPORT_TYPES = ("Data Drift", "Dataset Summary", "Model Drift")
+ALERT_TYPES = ("Drift Detected", "Data Drift Detected", "Prediction Drift Detected", "Test Failed")
+METRICS = ("Accuracy", "Precision", "Recall", "F1")
+WORDS = ("market", "shares", "election", "football", "film", "music", "bank", "growth", "minister", "phone",
+         "league", "award", "profit", "software", "court", "season", "album", "economy", "player", "internet")
+
+
+def generate_alerts_log(path: str, lines: int, days: int = 90, seed: int = 0):
+    """Writes an alerts.log of the given number of lines spread over the last days."""
+    rng = random.Random(seed)
+    start = datetime.datetime.now() - datetime.timedelta(days=days)
+    step = days * 86400 / max(lines, 1)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            metric = rng.choice(METRICS)
+            actual = rng.random()
+            event = {
+                "timestamp": (start + datetime.timedelta(seconds=i * step)).isoformat(),
+                "alert_type": rng.choice(ALERT_TYPES),
+                "status": "Sent",
+                "details": {
+                    "name": f"{metric} metric: Equal Reference ± 0.167",
+                    "description": f"{metric} metric: Actual value {actual:.3f} , but expected 0.836 ± 0.167",
+                },
+            }
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+def generate_reports(base_dir: str, count: int, report_bytes: int = REPORT_BYTES, seed: int = 0):
+    """Writes count reports with an embedded Evidently-style metric JSON, spread over the report types."""
+    rng = random.Random(seed)
+    filler = "<!-- " + "x" * max(report_bytes - 2048, 0) + " -->\n"
+    start = datetime.datetime.now() - datetime.timedelta(days=max(count // 10, 1))
+    for i in range(count):
+        report_type = REPORT_TYPES[i % len(REPORT_TYPES)]
+        folder = os.path.join(base_dir, report_type)
+        os.makedirs(folder, exist_ok=True)
+        timestamp = start + datetime.timedelta(minutes=i * 7)
+        counters = [{"value": f"{rng.random():.3f}", "label": metric} for metric in METRICS]
+        counters.append({"value": str(rng.randint(0, 3)), "label": "FAIL"})
+        report = {"name": "Report", "widgets": [{"type": "counter", "params": {"counters": counters}, "widgets": []}]}
+        with open(os.path.join(folder, f"report_{timestamp:%d_%m_%Y_%H_%M_%S}.html"), "w", encoding="utf-8") as f:
+            f.write("<html><head></head><body>\n" + filler)
+            f.write(f"<script>\n    var metric_{i:032x} = {json.dumps(report)};\n</script>\n</body></html>\n")
+
+
+def generate_results_csv(path: str, rows: int, classes: int = 5, accuracy: float = 0.85, seed: int = 0):
+    """Writes a text,label,prediction CSV where about accuracy of the predictions are right."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    chunk = 1_000_000
+    words = np.array(WORDS)
+    for first in range(0, rows, chunk):
+        n = min(chunk, rows - first)
+        labels = rng.integers(0, classes, n).astype(float)
+        wrong = rng.random(n) > accuracy
+        predictions = np.where(wrong, rng.integers(0, classes, n), labels).astype(float)
+        lengths = rng.integers(3, 15, n)
+        text = [" ".join(words[rng.integers(0, len(words), length)]) for length in lengths]
+        pd.DataFrame({"text": text, "label": labels, "prediction": predictions}).to_csv(
+            path, mode="w" if first == 0 else "a", header=first == 0, index=False
+        )
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Recorder:
+    """Times benchmark cases and appends their results as JSON lines."""
+
+    def __init__(self, output: str, sizes: dict, repeats: int):
+        self.output = output
+        self.repeats = repeats
+        self.meta = {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "run_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "sizes": sizes,
+        }
+
+    def time(self, case: str, func, setup=None, repeats: int = None):
+        """Runs func repeats times (after setup, untimed) and records the best and median seconds."""
+        timings = []
+        for _ in range(repeats or self.repeats):
+            if setup is not None:
+                setup()
+            gc.collect()
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        result = dict(self.meta, case=case, best_seconds=round(timings[0], 6),
+                      median_seconds=round(timings[len(timings) // 2], 6), repeats=len(timings))
+        with open(self.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+        print(f"{case:<40} best {timings[0] * 1000:10.1f} ms   median {timings[len(timings) // 2] * 1000:10.1f} ms")
+        return result
+
+
+def bench_alerts(recorder: Recorder, workspace: str):
+    import alert_store
+    from alert_store import AlertLogReader, SQLiteAlertStore
+
+    log_path = os.path.join(workspace, alert_store.ALERTS_LOG_FILE)
+    db_path = os.path.join(workspace, alert_store.ALERTS_DB_FILE)
+
+    def remove_db():
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    recorder.time("alerts.jsonl_full_load", lambda: AlertLogReader(log_path).refresh())
+    reader = AlertLogReader(log_path)
+    reader.refresh()
+    recorder.time("alerts.jsonl_incremental_refresh", reader.refresh)
+    recorder.time("alerts.sqlite_import", lambda: SQLiteAlertStore(db_path).import_jsonl(log_path), setup=remove_db,
+                  repeats=1)
+
+    store = SQLiteAlertStore(db_path)
+    start_date = datetime.date.today() - datetime.timedelta(days=7)
+    filters = {"alert_types": ["Drift Detected", "Test Failed"], "start_date": start_date, "end_date": datetime.date.today()}
+    recorder.time("alerts.sqlite_first_page", lambda: store.query(limit=50, **filters))
+    recorder.time("alerts.sqlite_keyword_search", lambda: store.query(keyword="precision metric", **filters))
+    recorder.time("alerts.sqlite_rollup_stats", lambda: (store.rollup_counts("day", **filters),
+                                                         store.rollup_counts("hour", **filters)))
+    recorder.time("alerts.sqlite_metadata", lambda: (store.alert_types(), store.date_bounds()))
+
+
+def bench_reports(recorder: Recorder, workspace: str):
+    from report_index import ReportIndex
+    from report_store import ReportCache, list_reports
+
+    base_dir = os.path.join(workspace, "reports")
+    index_path = os.path.join(workspace, "index.db")
+
+    def remove_index():
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(index_path + suffix):
+                os.remove(index_path + suffix)
+
+    recorder.time("reports.index_cold_scan", lambda: ReportIndex(index_path, base_dir).refresh(), setup=remove_index,
+                  repeats=1)
+    index = ReportIndex(index_path, base_dir)
+    index.refresh()
+    recorder.time("reports.index_warm_scan", index.refresh)
+    recorder.time("reports.index_query", lambda: index.query("Model Drift", metric="Accuracy", min_value=0.5))
+    recorder.time("reports.list_type", lambda: list_reports(os.path.join(base_dir, "Model Drift")))
+
+    newest = index.query("Model Drift")[0]["path"]
+    cache = ReportCache()
+    recorder.time("reports.read_cold", lambda: cache.get(newest), setup=cache.clear)
+    recorder.time("reports.read_cached", lambda: cache.get(newest))
+
+
+def bench_results(recorder: Recorder, workspace: str):
+    from quality_metrics import ConfusionMatrix, apply_editor_changes
+    from results_store import read_results_csv
+
+    csv_path = os.path.join(workspace, "results", "results.csv")
+    recorder.time("results.read_csv", lambda: read_results_csv(csv_path), repeats=1)
+    df = read_results_csv(csv_path)
+    labels = df["label"].cat.categories[:2].tolist()
+    recorder.time("results.filter_labels", lambda: df[df["label"].isin(labels)])
+    recorder.time("results.confusion_matrix", lambda: ConfusionMatrix.from_arrays(df["label"], df["prediction"]).metrics())
+
+    base = ConfusionMatrix.from_arrays(df["label"], df["prediction"])
+    edits = {"edited_rows": {i: {"prediction": labels[0]} for i in range(0, min(len(df), 10_000), 10)},
+             "added_rows": [], "deleted_rows": []}
+    recorder.time("results.apply_1k_edits", lambda: apply_editor_changes(base, df, edits, "label", "prediction"))
+    recorder.time("results.export_csv", lambda: df.to_csv(index=False).encode("utf-8"), repeats=1)
+
+
+def bench_apptest(recorder: Recorder, workspace: str):
+    """Renders each page headlessly from the workspace, as a logged-in user would see it."""
+    from streamlit.testing.v1 import AppTest
+
+    app_path = os.path.join(REPO_DIR, "app.py")
+    pages = {"📊 Model Monitoring Reports": "apptest.reports_page", "🚨 Alerts": "apptest.alerts_page",
+             "📁 Validate Results": "apptest.results_page"}
+    cwd = os.getcwd()
+    os.chdir(workspace)
+    try:
+        for menu, case in pages.items():
+            def render():
+                at = AppTest.from_file(app_path, default_timeout=600)
+                at.session_state["logged_in"] = True
+                at.run()
+                at.sidebar.radio[0].set_value(menu).run()
+                if at.exception:
+                    raise RuntimeError(f"{menu} raised: {at.exception[0].value}")
+            recorder.time(case, render, repeats=1)
+    finally:
+        os.chdir(cwd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard hot paths on synthetic data.")
+    parser.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--alerts", type=int, help="alerts.log lines (overrides --size)")
+    parser.add_argument("--reports", type=int, help="number of reports (overrides --size)")
+    parser.add_argument("--rows", type=int, help="results CSV rows (overrides --size)")
+    parser.add_argument("--report-bytes", type=int, default=REPORT_BYTES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--only", choices=("alerts", "reports", "results", "apptest"), action="append")
+    parser.add_argument("--apptest", action="store_true", help="also time full page renders through AppTest")
+    parser.add_argument("--workspace", help="reuse or keep the generated data in this folder")
+    parser.add_argument("--output", default=os.path.join(REPO_DIR, "bench_output.txt"))
+    args = parser.parse_args()
+
+    sizes = dict(SIZES[args.size])
+    for key in ("alerts", "reports", "rows"):
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+    groups = args.only or ["alerts", "reports", "results"] + (["apptest"] if args.apptest else [])
+
+    workspace = args.workspace or tempfile.mkdtemp(prefix="dashboard-bench-")
+    try:
+        started = time.perf_counter()
+        if not os.path.exists(os.path.join(workspace, "alert", "alerts.log")):
+            generate_alerts_log(os.path.join(workspace, "alert", "alerts.log"), sizes["alerts"])
+        if not os.path.isdir(os.path.join(workspace, "reports")):
+            generate_reports(os.path.join(workspace, "reports"), sizes["reports"], args.report_bytes)
+        if not os.path.exists(os.path.join(workspace, "results", "results.csv")):
+            generate_results_csv(os.path.join(workspace, "results", "results.csv"), sizes["rows"])
+        print(f"Synthetic data ready in {workspace} ({time.perf_counter() - started:.1f} s): {sizes}")
+
+        recorder = Recorder(args.output, sizes, args.repeats)
+        benchmarks = {"alerts": bench_alerts, "reports": bench_reports, "results": bench_results, "apptest": bench_apptest}
+        for group in groups:
+            benchmarks[group](recorder, workspace)
+        print(f"Results appended to {args.output}")
+    finally:
+        if not args.workspace:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
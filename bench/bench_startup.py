@@ -0,0 +1,99 @@
+"""
+Cold-start benchmark of the dashboard.
+
+Every case runs in a fresh interpreter, so nothing is served from modules
+already imported by an earlier case. It times `import app`, breaks the
+import down with `python -X importtime` (the slowest modules and whether a
+heavy library leaked into the login path) and renders the login page
+headlessly with Streamlit's AppTest. Results are appended as JSON lines to
+the same output file as bench_dashboard.py.
+
+    python bench/bench_startup.py
+    python bench/bench_startup.py --repeats 10 --budget-ms 1500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from bench_dashboard import REPO_DIR, Recorder
+
+# Libraries that only the pages need; importing app must not load any of them
+HEAVY_MODULES = ("pandas", "matplotlib", "plotly.express")
+# Slowest modules (by cumulative import time) kept in the importtime record
+IMPORTTIME_TOP_MODULES = 15
+
+LOGIN_RENDER_SCRIPT = """
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=60)
+at.run()
+assert not at.exception, at.exception
+"""
+
+
+def _run_python(*args):
+    subprocess.run([sys.executable, *args], cwd=REPO_DIR, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def parse_importtime(stderr: str):
+    """
+    Parses `python -X importtime` output into {module: (self us, cumulative us)}.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def importtime_breakdown():
+    """Imports app once under -X importtime and summarizes where the time went."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=REPO_DIR,
+                               check=True, capture_output=True, text=True)
+    modules = parse_importtime(completed.stderr)
+    slowest = sorted(modules.items(), key=lambda item: -item[1][1])[:IMPORTTIME_TOP_MODULES]
+    return {
+        "total_ms": round(sum(self_us for self_us, _ in modules.values()) / 1000, 1),
+        "app_ms": round(modules.get("app", (0, 0))[1] / 1000, 1),
+        "modules": len(modules),
+        "heavy_modules": [name for name in HEAVY_MODULES if name in modules],
+        "slowest": [{"module": name, "cumulative_ms": round(cumulative_us / 1000, 1)}
+                    for name, (_, cumulative_us) in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard cold start and login page render.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, help="exit non-zero if the best `import app` is slower")
+    parser.add_argument("--output", default=os.path.join(REPO_DIR, "bench_output.txt"))
+    args = parser.parse_args()
+
+    recorder = Recorder(args.output, {}, args.repeats)
+    recorder.time("startup.interpreter", lambda: _run_python("-c", "pass"))
+    import_result = recorder.time("startup.import_app", lambda: _run_python("-c", "import app"))
+    recorder.time("startup.login_render", lambda: _run_python("-c", LOGIN_RENDER_SCRIPT))
+
+    breakdown = importtime_breakdown()
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(dict(recorder.meta, case="startup.importtime", **breakdown)) + "\n")
+    print(f"{'startup.importtime':<40} {breakdown['total_ms']:.1f} ms over {breakdown['modules']} modules")
+    for row in breakdown["slowest"]:
+        print(f"    {row['module']:<50} {row['cumulative_ms']:10.1f} ms")
+
+    failed = False
+    if breakdown["heavy_modules"]:
+        print(f"importing app loads {', '.join(breakdown['heavy_modules'])}; import them inside the page that uses them")
+        failed = True
+    if args.budget_ms is not None and import_result["best_seconds"] * 1000 > args.budget_ms:
+        print(f"import app took {import_result['best_seconds'] * 1000:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
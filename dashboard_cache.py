@@ -0,0 +1,125 @@
+import streamlit as st
+import os
+import datetime
+
+from alert_store import get_alert_store
+from metric_series import get_metric_series_store
+from report_index import get_report_index
+from report_summary import summarize_report_file
+from results_store import RESULTS_DIR
+
+# Seconds a cached alert read is served before the store is consulted again
+ALERT_CACHE_TTL_SECONDS = 30
+# Seconds a cached report listing is served before the reports tree is rescanned
+REPORT_CACHE_TTL_SECONDS = 120
+# Seconds the listing of the results folder is served from cache
+RESULTS_LISTING_TTL_SECONDS = 60
+# Seconds a metric series query is served from cache
+METRIC_SERIES_CACHE_TTL_SECONDS = 60
+
+# st.cache_data entries live in the server process, so every session shares them:
+# N users viewing the same filters cost one store query per TTL, not N per rerun.
+
+
+@st.cache_data(ttl=ALERT_CACHE_TTL_SECONDS, show_spinner=False)
+def load_alert_metadata():
+    """
+    Syncs the alert store with alerts.log and returns (alert types, (first date, last date)).
+    """
+    alert_store = get_alert_store()
+    alert_store.sync()
+    return alert_store.alert_types(), alert_store.date_bounds()
+
+
+@st.cache_data(ttl=ALERT_CACHE_TTL_SECONDS, show_spinner=False)
+def load_alert_rollups(granularity: str, alert_types=None, start_date=None, end_date=None, since=None):
+    return get_alert_store().rollup_counts(granularity, alert_types, start_date, end_date, since=since)
+
+
+@st.cache_data(ttl=ALERT_CACHE_TTL_SECONDS, show_spinner=False)
+def query_alerts(alert_types=None, start_date=None, end_date=None, keyword=None, limit=None, before=None):
+    return get_alert_store().query(
+        alert_types=alert_types, start_date=start_date, end_date=end_date, keyword=keyword, limit=limit, before=before
+    )
+
+
+def clear_alert_caches():
+    """Drops every cached alert read, e.g. after an alert was logged or on "Refresh Dashboard"."""
+    load_alert_metadata.clear()
+    load_alert_rollups.clear()
+    query_alerts.clear()
+
+
+@st.cache_data(ttl=REPORT_CACHE_TTL_SECONDS, show_spinner=False)
+def load_report_types():
+    """
+    Refreshes the report index from the reports tree and returns the report types.
+    """
+    report_index = get_report_index()
+    report_index.refresh()
+    return report_index.report_types()
+
+
+@st.cache_data(ttl=REPORT_CACHE_TTL_SECONDS, show_spinner=False)
+def load_report_filters(report_type: str):
+    """Returns ((first date, last date), metric names) of a report type."""
+    report_index = get_report_index()
+    return report_index.date_bounds(report_type), report_index.metric_names(report_type)
+
+
+@st.cache_data(ttl=REPORT_CACHE_TTL_SECONDS, show_spinner=False)
+def query_reports(report_type: str, start_date=None, end_date=None, metric=None, min_value=None, max_value=None):
+    return get_report_index().query(report_type, start_date, end_date, metric, min_value, max_value)
+
+
+@st.cache_data(ttl=REPORT_CACHE_TTL_SECONDS, show_spinner=False)
+def load_report_summary(path: str, sha256: str):
+    """
+    Returns the pre-rendered summary of a report. A report the pre-render stage
+    has not reached yet is summarized here once and stored for everyone else.
+    The sha256 argument keys the cache entry to the report's content.
+    """
+    report_index = get_report_index()
+    summary = report_index.summary(path)
+    if summary is None:
+        _, content_sha256, summary = summarize_report_file(path)
+        if summary is not None:
+            report_index.store_summary(path, content_sha256, summary)
+    return summary
+
+
+def clear_report_caches():
+    load_report_types.clear()
+    load_report_filters.clear()
+    query_reports.clear()
+    load_report_summary.clear()
+
+
+@st.cache_data(ttl=REPORT_CACHE_TTL_SECONDS, show_spinner=False)
+def load_metric_series_names():
+    """
+    Feeds reports indexed since the last call into the metric series store
+    and returns the names of all series.
+    """
+    report_index = get_report_index()
+    report_index.refresh()
+    series_store = get_metric_series_store()
+    series_store.sync_reports(report_index)
+    return series_store.series_names()
+
+
+@st.cache_data(ttl=METRIC_SERIES_CACHE_TTL_SECONDS, show_spinner=False)
+def load_metric_series_bounds(series: tuple):
+    return get_metric_series_store().date_bounds(series)
+
+
+@st.cache_data(ttl=METRIC_SERIES_CACHE_TTL_SECONDS, show_spinner=False)
+def query_metric_series(series: str, start_date, end_date):
+    """Returns (resolution, rows) of a series over [start_date, end_date], both days included."""
+    return get_metric_series_store().query(series, start_date, end_date + datetime.timedelta(days=1))
+
+
+@st.cache_data(ttl=RESULTS_LISTING_TTL_SECONDS, show_spinner=False)
+def list_results_files(results_dir: str = RESULTS_DIR):
+    """Returns the CSV file names of the results folder."""
+    return sorted(f for f in os.listdir(results_dir) if f.endswith(".csv"))
@@ -0,0 +1,335 @@
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from alert_senders import configure_default_alert_dispatcher
+from alert_store import log_alert_event
+from quality_metrics import LABEL_COLUMNS, PREDICTION_COLUMNS, find_column
+from request_log import REQUEST_LOG_FILE, RequestLogTailer
+
+# Stored reference profile the live traffic is compared against
+DRIFT_REFERENCE_FILE = "drift/reference.json"
+# Histogram bins per numeric feature, taken from reference quantiles
+NUMERIC_BINS = 10
+# Distinct values tracked per categorical feature; the rest are counted as "__other__"
+MAX_CATEGORIES = 50
+# Rows per comparison window, and the alert thresholds
+DRIFT_WINDOW_ROWS = 1000
+PSI_THRESHOLD = 0.2
+JS_THRESHOLD = 0.1
+OTHER_CATEGORY = "__other__"
+# Seconds between polls of the request log when following it
+REQUEST_POLL_SECONDS = 5
+
+
+def population_stability_index(expected, actual, eps: float = 1e-4):
+    """PSI between two count vectors over the same bins."""
+    expected = np.asarray(expected, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    p = np.clip(expected / max(expected.sum(), 1), eps, None)
+    q = np.clip(actual / max(actual.sum(), 1), eps, None)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def jensen_shannon_divergence(expected, actual):
+    """Jensen-Shannon divergence (base 2, between 0 and 1) between two count vectors."""
+    p = np.asarray(expected, dtype=float)
+    q = np.asarray(actual, dtype=float)
+    p = p / max(p.sum(), 1)
+    q = q / max(q.sum(), 1)
+    m = (p + q) / 2
+
+    def kl(a, b):
+        mask = a > 0
+        return np.sum(a[mask] * np.log2(a[mask] / b[mask]))
+
+    return float((kl(p, m) + kl(q, m)) / 2)
+
+
+class NumericSketch:
+    """Fixed-bin histogram of a numeric feature; memory is one counter per bin."""
+
+    kind = "numeric"
+
+    def __init__(self, edges, counts=None):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def from_values(cls, values, bins: int = NUMERIC_BINS):
+        values = pd.to_numeric(pd.Series(values), errors="coerce").dropna().to_numpy(dtype=float)
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])) if len(values) else np.array([])
+        sketch = cls(edges)
+        sketch.update(values)
+        return sketch
+
+    def empty_like(self):
+        return NumericSketch(self.edges)
+
+    def update(self, values):
+        values = pd.to_numeric(pd.Series(values), errors="coerce").dropna().to_numpy(dtype=float)
+        if len(values):
+            self.counts += np.bincount(np.searchsorted(self.edges, values, side="right"), minlength=len(self.counts))
+
+    def to_dict(self):
+        return {"kind": self.kind, "edges": self.edges.tolist(), "counts": self.counts.tolist()}
+
+
+class CategoricalSketch:
+    """Bounded value counts of a categorical feature such as the label or the prediction."""
+
+    kind = "categorical"
+
+    def __init__(self, categories, counts=None):
+        self.categories = [str(category) for category in categories]
+        if OTHER_CATEGORY not in self.categories:
+            self.categories.append(OTHER_CATEGORY)
+        self._positions = {category: i for i, category in enumerate(self.categories)}
+        self.counts = np.zeros(len(self.categories), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def from_values(cls, values, max_categories: int = MAX_CATEGORIES):
+        values = _categorical_values(values)
+        sketch = cls(values.value_counts().index[:max_categories].tolist())
+        sketch.update(values)
+        return sketch
+
+    def empty_like(self):
+        return CategoricalSketch(self.categories)
+
+    def update(self, values):
+        values = _categorical_values(values)
+        if len(values):
+            positions = values.map(self._positions).fillna(self._positions[OTHER_CATEGORY]).to_numpy(dtype=np.int64)
+            self.counts += np.bincount(positions, minlength=len(self.counts))
+
+    def to_dict(self):
+        return {"kind": self.kind, "categories": self.categories, "counts": self.counts.tolist()}
+
+
+def _categorical_values(values):
+    """Normalizes category values to strings, so 2, 2.0 and "2" count as one class."""
+    values = pd.Series(values).dropna()
+    numeric = pd.to_numeric(values, errors="coerce")
+    if len(values) and numeric.notna().all():
+        return numeric.astype(float).astype(str)
+    return values.astype(str)
+
+
+def _sketch_from_dict(data):
+    if data["kind"] == NumericSketch.kind:
+        return NumericSketch(data["edges"], data["counts"])
+    return CategoricalSketch(data["categories"], data["counts"])
+
+
+def extract_features(batch):
+    """
+    Turns a batch of result rows (DataFrame or list of dicts) into feature columns:
+    text_length and word_count from the text, plus the label and prediction.
+    """
+    if not isinstance(batch, pd.DataFrame):
+        batch = pd.DataFrame.from_records(list(batch))
+    features = {}
+    if "text" in batch.columns:
+        text = batch["text"].fillna("").astype(str)
+        features["text_length"] = text.str.len()
+        features["word_count"] = text.str.split().str.len()
+    label_column = find_column(batch, LABEL_COLUMNS)
+    if label_column:
+        features["label"] = batch[label_column]
+    prediction_column = find_column(batch, PREDICTION_COLUMNS)
+    if prediction_column:
+        features["prediction"] = batch[prediction_column]
+    return features
+
+
+class DriftProfile:
+    """One sketch per feature; serves both as the stored reference and as a live window."""
+
+    def __init__(self, sketches):
+        self.sketches = sketches
+
+    @classmethod
+    def from_batch(cls, batch):
+        sketches = {}
+        for name, values in extract_features(batch).items():
+            if name in ("label", "prediction"):
+                sketches[name] = CategoricalSketch.from_values(values)
+            else:
+                sketches[name] = NumericSketch.from_values(values)
+        return cls(sketches)
+
+    def empty_like(self):
+        return DriftProfile({name: sketch.empty_like() for name, sketch in self.sketches.items()})
+
+    def update(self, batch):
+        for name, values in extract_features(batch).items():
+            if name in self.sketches:
+                self.sketches[name].update(values)
+
+    def rows(self):
+        return max((int(sketch.counts.sum()) for sketch in self.sketches.values()), default=0)
+
+    def save(self, path: str = DRIFT_REFERENCE_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({name: sketch.to_dict() for name, sketch in self.sketches.items()}, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str = DRIFT_REFERENCE_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls({name: _sketch_from_dict(data) for name, data in json.load(f).items()})
+
+
+class StreamingDriftDetector:
+    """
+    Compares tumbling windows of live result rows against a reference profile.
+
+    Batches are folded into fixed-size sketches as they arrive, so memory
+    does not grow with traffic. Each time window_rows rows have been seen, every
+    feature whose PSI or Jensen-Shannon divergence crosses its threshold is
+    logged through log_alert_event with the numeric values in its details,
+    and a new window starts.
+    """
+
+    def __init__(self, reference: DriftProfile, window_rows: int = DRIFT_WINDOW_ROWS,
+                 psi_threshold: float = PSI_THRESHOLD, js_threshold: float = JS_THRESHOLD, alert=log_alert_event):
+        self.reference = reference
+        self.window_rows = window_rows
+        self.psi_threshold = psi_threshold
+        self.js_threshold = js_threshold
+        self.alert = alert
+        self.window = reference.empty_like()
+
+    def update(self, batch):
+        """
+        Folds a batch (DataFrame or list of dicts) into the current window, split
+        at window boundaries so every window holds exactly window_rows rows.
+        Returns the drift results of each window closed by the batch, oldest first.
+        """
+        if not isinstance(batch, pd.DataFrame):
+            batch = pd.DataFrame.from_records(list(batch))
+        closed = []
+        start = 0
+        while start < len(batch):
+            end = start + self.window_rows - self.window.rows()
+            self.window.update(batch.iloc[start:end])
+            start = end
+            if self.window.rows() >= self.window_rows:
+                closed.append(self.check())
+        return closed
+
+    def compare(self):
+        """
+        Returns per-feature PSI and JS divergence of the current window against the reference.
+        """
+        results = []
+        for name, reference_sketch in self.reference.sketches.items():
+            window_counts = self.window.sketches[name].counts
+            if window_counts.sum() == 0:
+                continue
+            psi = population_stability_index(reference_sketch.counts, window_counts)
+            js = jensen_shannon_divergence(reference_sketch.counts, window_counts)
+            results.append({
+                "feature": name,
+                "psi": round(psi, 4),
+                "js_divergence": round(js, 4),
+                "drifted": psi > self.psi_threshold or js > self.js_threshold,
+            })
+        return results
+
+    def check(self):
+        """
+        Logs an alert for each drifted feature of the current window, then starts a new window.
+        """
+        rows = self.window.rows()
+        results = self.compare()
+        for result in results:
+            if not result["drifted"]:
+                continue
+            alert_type = "Prediction Drift Detected" if result["feature"] == "prediction" else "Data Drift Detected"
+            self.alert(alert_type, {
+                "name": f"{result['feature']} drift: PSI < {self.psi_threshold:.3f}, JS < {self.js_threshold:.3f}",
+                "description": (
+                    f"{result['feature']} drift: Actual PSI {result['psi']:.3f}, JS {result['js_divergence']:.3f}, "
+                    f"but expected PSI < {self.psi_threshold:.3f}, JS < {self.js_threshold:.3f}"
+                ),
+                "feature": result["feature"],
+                "psi": result["psi"],
+                "js_divergence": result["js_divergence"],
+                "psi_threshold": self.psi_threshold,
+                "js_threshold": self.js_threshold,
+                "window_rows": rows,
+            })
+        self.window = self.reference.empty_like()
+        return results
+
+
+def feed_results_csv(detector: StreamingDriftDetector, path: str, chunk_rows: int = 10_000):
+    """
+    Streams a results CSV through the detector in chunks and returns the results of every closed window.
+    """
+    results = []
+    for chunk in pd.read_csv(path, chunksize=chunk_rows):
+        results.extend(detector.update(chunk))
+    return results
+
+
+def feed_request_log(detector: StreamingDriftDetector, tailer: RequestLogTailer):
+    """
+    Streams the request log records appended since the tailer's last read
+    through the detector and returns the results of every closed window.
+    """
+    results = []
+    for records in tailer.read_batches():
+        results.extend(detector.update(records))
+    return results
+
+
+def _log_window_results(window_results):
+    logging.info(f"Drift window results: {json.dumps(window_results)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming drift detection over model result files.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    reference_parser = subparsers.add_parser("reference", help="Build the reference profile from a results CSV")
+    reference_parser.add_argument("csv")
+    check_parser = subparsers.add_parser("check", help="Stream results CSVs against the reference profile")
+    check_parser.add_argument("csv", nargs="+")
+    check_parser.add_argument("--window-rows", type=int, default=DRIFT_WINDOW_ROWS)
+    requests_parser = subparsers.add_parser("requests", help="Stream the inference request log against the reference profile")
+    requests_parser.add_argument("--log", default=REQUEST_LOG_FILE)
+    requests_parser.add_argument("--window-rows", type=int, default=DRIFT_WINDOW_ROWS)
+    requests_parser.add_argument("--follow", action="store_true", help="Keep tailing the log for new requests")
+    args = parser.parse_args()
+
+    if args.command == "reference":
+        DriftProfile.from_batch(pd.read_csv(args.csv)).save(DRIFT_REFERENCE_FILE)
+        logging.info(f"Saved reference profile of {args.csv} to {DRIFT_REFERENCE_FILE}")
+        return
+    # Drift alerts logged by the check are delivered like the dashboard's
+    configure_default_alert_dispatcher()
+    detector = StreamingDriftDetector(DriftProfile.load(DRIFT_REFERENCE_FILE), window_rows=args.window_rows)
+    if args.command == "check":
+        for path in args.csv:
+            for window_results in feed_results_csv(detector, path):
+                _log_window_results(window_results)
+        return
+    tailer = RequestLogTailer(args.log)
+    while True:
+        for window_results in feed_request_log(detector, tailer):
+            _log_window_results(window_results)
+        if not args.follow:
+            break
+        time.sleep(REQUEST_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,342 @@
+import argparse
+import calendar
+import contextlib
+import datetime
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+# SQLite store of the metric time series
+METRIC_SERIES_FILE = "metrics/series.db"
+# Raw points older than this are dropped by compact(); their buckets are kept
+RAW_RETENTION_DAYS = 30
+# Downsampling tiers as (name, bucket seconds, days kept or None for ever), finest first
+SERIES_TIERS = (
+    ("hour", 3600, 365),
+    ("day", 86400, None),
+    ("week", 7 * 86400, None),
+)
+# Upper bound of the points returned by one query; the finest complete tier under it is used
+SERIES_MAX_POINTS = 500
+# Numeric alert details recorded as series (per feature for drift alerts)
+ALERT_METRIC_KEYS = ("psi", "js_divergence")
+# Points written per transaction when backfilling from the alert log
+BACKFILL_BATCH_POINTS = 10_000
+
+# Evidently test descriptions: "<metric> metric: Actual value 0.543 , but expected 0.836 ± 0.167"
+_ACTUAL_VALUE_PATTERN = re.compile(r"^(.+?) metric: Actual value (-?[\d.]+(?:[eE][-+]?\d+)?)")
+# 1970-01-01 was a Thursday; weekly buckets start on Mondays
+_WEEK_OFFSET_SECONDS = 4 * 86400
+
+
+def _epoch(timestamp):
+    """Seconds since the epoch of a naive datetime or ISO string, read as UTC so buckets follow its calendar days."""
+    if isinstance(timestamp, str):
+        timestamp = datetime.datetime.fromisoformat(timestamp)
+    elif not isinstance(timestamp, datetime.datetime):
+        timestamp = datetime.datetime.combine(timestamp, datetime.time())
+    return calendar.timegm(timestamp.timetuple())
+
+
+def _from_epoch(ts: int):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _bucket_start(ts: int, seconds: int):
+    offset = _WEEK_OFFSET_SECONDS if seconds % (7 * 86400) == 0 else 0
+    return (ts - offset) // seconds * seconds + offset
+
+
+def alert_metric_points(event: dict):
+    """
+    Returns the (series, timestamp, value) points carried by an alert event:
+    the "Actual value" of Evidently test alerts and the PSI/JS values of drift alerts.
+    """
+    details = event.get("details") or {}
+    points = []
+    match = _ACTUAL_VALUE_PATTERN.match(str(details.get("description", "")))
+    if match:
+        points.append((f"alerts/{match.group(1)}", event["timestamp"], float(match.group(2))))
+    feature = details.get("feature")
+    for key in ALERT_METRIC_KEYS:
+        value = details.get(key)
+        if isinstance(value, (int, float)):
+            points.append((f"alerts/{feature} {key}" if feature else f"alerts/{key}", event["timestamp"], float(value)))
+    return points
+
+
+class MetricSeriesStore:
+    """
+    SQLite store of metric time series with downsampling.
+
+    Every point is kept raw and folded into min/mean/max buckets of each
+    tier (hourly, daily, weekly) as it is added. compact() drops raw points
+    after RAW_RETENTION_DAYS and hourly buckets after their retention, so
+    the store grows with the number of days rather than the number of points.
+    query() picks the finest resolution that is complete for the range and
+    returns at most SERIES_MAX_POINTS rows, so a year costs the same as a day.
+    """
+
+    def __init__(self, path: str = METRIC_SERIES_FILE):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS series_points (
+                    series TEXT NOT NULL,
+                    ts INTEGER NOT NULL,
+                    value REAL NOT NULL,
+                    PRIMARY KEY (series, ts)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS series_buckets (
+                    series TEXT NOT NULL,
+                    tier TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    total REAL NOT NULL,
+                    min REAL NOT NULL,
+                    max REAL NOT NULL,
+                    PRIMARY KEY (series, tier, bucket)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS series_state (
+                    tier TEXT PRIMARY KEY,
+                    pruned_before INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS fed_reports (
+                    path TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL
+                );
+            """)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Yields a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _add(conn, points):
+        added = skipped = 0
+        row = conn.execute("SELECT pruned_before FROM series_state WHERE tier = 'raw'").fetchone()
+        raw_pruned = row[0] if row else 0
+        for series, timestamp, value in points:
+            ts = _epoch(timestamp)
+            if ts < raw_pruned:
+                # The raw point was compacted away and its buckets already count a value for it
+                skipped += 1
+                continue
+            previous = conn.execute("SELECT value FROM series_points WHERE series = ? AND ts = ?", (series, ts)).fetchone()
+            # A point already recorded (e.g. a report fed twice) must not be counted again in the buckets
+            if previous is not None and previous[0] == value:
+                continue
+            conn.execute("""
+                INSERT INTO series_points VALUES (?, ?, ?)
+                ON CONFLICT (series, ts) DO UPDATE SET value = excluded.value
+            """, (series, ts, value))
+            if previous is None:
+                conn.executemany("""
+                    INSERT INTO series_buckets (series, tier, bucket, count, total, min, max) VALUES (?, ?, ?, 1, ?, ?, ?)
+                    ON CONFLICT (series, tier, bucket) DO UPDATE SET
+                        count = count + 1, total = total + excluded.total,
+                        min = MIN(min, excluded.min), max = MAX(max, excluded.max)
+                """, [(series, tier, _bucket_start(ts, seconds), value, value, value) for tier, seconds, _ in SERIES_TIERS])
+                added += 1
+                continue
+            # A changed report keeps its timestamp: rebuild the buckets holding the replaced value
+            for tier, seconds, _ in SERIES_TIERS:
+                bucket = _bucket_start(ts, seconds)
+                if bucket >= raw_pruned:
+                    conn.execute("""
+                        UPDATE series_buckets SET (count, total, min, max) = (
+                            SELECT COUNT(*), SUM(value), MIN(value), MAX(value) FROM series_points
+                            WHERE series = ? AND ts >= ? AND ts < ?
+                        ) WHERE series = ? AND tier = ? AND bucket = ?
+                    """, (series, bucket, bucket + seconds, series, tier, bucket))
+                else:
+                    # Some raw points of the bucket were compacted: swap the value in the total,
+                    # the old value can no longer be taken out of min/max
+                    conn.execute("""
+                        UPDATE series_buckets SET total = total + ?, min = MIN(min, ?), max = MAX(max, ?)
+                        WHERE series = ? AND tier = ? AND bucket = ?
+                    """, (value - previous[0], value, value, series, tier, bucket))
+            added += 1
+        if skipped:
+            logging.warning(f"Metric series: skipped {skipped} points older than the raw retention")
+        return added
+
+    def add_points(self, points):
+        """
+        Adds (series, timestamp, value) points; returns how many were new or changed.
+        Points older than the raw points dropped by compact() are skipped.
+        """
+        with self._connect() as conn:
+            return self._add(conn, points)
+
+    def sync_reports(self, report_index):
+        """
+        Feeds the metrics of every indexed report that was not fed yet (or changed since)
+        as "<report type>/<metric>" series. Returns the number of reports fed.
+        """
+        with self._connect() as conn:
+            fed = dict(conn.execute("SELECT path, sha256 FROM fed_reports"))
+        reports = {}
+        for path, sha256, report_type, timestamp, metric, value in report_index.metric_rows():
+            if fed.get(path) != sha256:
+                reports.setdefault((path, sha256), []).append((f"{report_type}/{metric}", timestamp, value))
+        if not reports:
+            return 0
+        with self._connect() as conn:
+            for (path, sha256), points in reports.items():
+                self._add(conn, points)
+                conn.execute("INSERT OR REPLACE INTO fed_reports VALUES (?, ?)", (path, sha256))
+        logging.info(f"Metric series: fed {len(reports)} reports")
+        return len(reports)
+
+    def series_names(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT series FROM series_buckets WHERE tier = ? ORDER BY series", (SERIES_TIERS[-1][0],)
+            )]
+
+    def date_bounds(self, series):
+        """Returns the (first, last) date with points in any of the series, or (None, None)."""
+        series = list(series)
+        with self._connect() as conn:
+            first, last = conn.execute(f"""
+                SELECT MIN(bucket), MAX(bucket) FROM series_buckets
+                WHERE tier = 'day' AND series IN ({', '.join('?' * len(series))})
+            """, series).fetchone()
+        if first is None:
+            return None, None
+        return (_from_epoch(first).date(), _from_epoch(last).date())
+
+    def _pruned_before(self, conn, tier):
+        row = conn.execute("SELECT pruned_before FROM series_state WHERE tier = ?", (tier,)).fetchone()
+        return row[0] if row else None
+
+    def query(self, series: str, start, end, max_points: int = SERIES_MAX_POINTS):
+        """
+        Returns (resolution, rows) for series between start and end (dates or datetimes, end exclusive).
+
+        Raw points are returned if the range still has all of them and there
+        are at most max_points; otherwise the finest tier with at most
+        max_points buckets over the range. Each row is a dict with time,
+        mean, min, max and count.
+        """
+        start_ts, end_ts = _epoch(start), _epoch(end)
+        with self._connect() as conn:
+            raw_pruned = self._pruned_before(conn, "raw")
+            if raw_pruned is None or start_ts >= raw_pruned:
+                rows = conn.execute("""
+                    SELECT ts, value FROM series_points WHERE series = ? AND ts >= ? AND ts < ? ORDER BY ts LIMIT ?
+                """, (series, start_ts, end_ts, max_points + 1)).fetchall()
+                if len(rows) <= max_points:
+                    return "raw", [{"time": _from_epoch(ts), "mean": value, "min": value,
+                                    "max": value, "count": 1} for ts, value in rows]
+            tier, seconds, _ = SERIES_TIERS[-1]
+            for name, bucket_seconds, _ in SERIES_TIERS:
+                pruned = self._pruned_before(conn, name)
+                if (pruned is None or start_ts >= pruned) and (end_ts - start_ts) / bucket_seconds <= max_points:
+                    tier, seconds = name, bucket_seconds
+                    break
+            rows = conn.execute("""
+                SELECT bucket, total / count, min, max, count FROM series_buckets
+                WHERE series = ? AND tier = ? AND bucket >= ? AND bucket < ? ORDER BY bucket LIMIT ?
+            """, (series, tier, _bucket_start(start_ts, seconds), end_ts, max_points)).fetchall()
+        return tier, [{"time": _from_epoch(bucket), "mean": mean, "min": low, "max": high,
+                       "count": count} for bucket, mean, low, high, count in rows]
+
+    def compact(self, now=None, dry_run: bool = False):
+        """
+        Drops raw points older than RAW_RETENTION_DAYS and buckets of tiers past
+        their retention. Returns the number of rows deleted (or that would be).
+        """
+        now_ts = _epoch(now or datetime.datetime.now())
+        cutoffs = [("raw", "series_points", "ts", now_ts - RAW_RETENTION_DAYS * 86400)]
+        cutoffs += [(tier, "series_buckets", "bucket", _bucket_start(now_ts - days * 86400, seconds))
+                    for tier, seconds, days in SERIES_TIERS if days is not None]
+        deleted = 0
+        with self._connect() as conn:
+            for tier, table, column, cutoff in cutoffs:
+                where = f"{column} < ?" + ("" if table == "series_points" else " AND tier = ?")
+                params = (cutoff,) if table == "series_points" else (cutoff, tier)
+                if dry_run:
+                    deleted += conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0]
+                    continue
+                deleted += conn.execute(f"DELETE FROM {table} WHERE {where}", params).rowcount
+                # Queries starting before the cutoff fall back to a coarser tier
+                conn.execute("""
+                    INSERT INTO series_state (tier, pruned_before) VALUES (?, ?)
+                    ON CONFLICT (tier) DO UPDATE SET pruned_before = MAX(pruned_before, excluded.pruned_before)
+                """, (tier, cutoff))
+        if deleted and not dry_run:
+            logging.info(f"Compacted {deleted} metric series rows from {self.path}")
+        return deleted
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_metric_series_store(path: str = None):
+    """Returns the metric series store shared by every session of the server process."""
+    path = path or METRIC_SERIES_FILE
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = MetricSeriesStore(path)
+        return _stores[path]
+
+
+def record_alert_metrics(event: dict):
+    """Adds the metric values carried by a logged alert to the series store."""
+    points = alert_metric_points(event)
+    if points:
+        get_metric_series_store().add_points(points)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance of the metric time series store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("sync-reports", help="Feed the metrics of new reports from the report index")
+    alerts_parser = subparsers.add_parser("backfill-alerts", help="Feed the metric values of logged alerts")
+    alerts_parser.add_argument("--log", help="alert log to read (default: the alert store's log)")
+    compact_parser = subparsers.add_parser("compact", help="Drop raw points and buckets past their retention")
+    compact_parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    store = get_metric_series_store()
+    if args.command == "sync-reports":
+        from report_index import get_report_index
+        report_index = get_report_index()
+        report_index.refresh()
+        store.sync_reports(report_index)
+    elif args.command == "backfill-alerts":
+        from alert_store import ALERTS_LOG_FILE
+        added, points = 0, []
+        with open(args.log or ALERTS_LOG_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    points.extend(alert_metric_points(json.loads(line)))
+                except (json.JSONDecodeError, KeyError):
+                    continue
+                if len(points) >= BACKFILL_BATCH_POINTS:
+                    added += store.add_points(points)
+                    points = []
+        added += store.add_points(points)
+        logging.info(f"Metric series: added {added} points from alerts")
+    elif args.command == "compact":
+        count = store.compact(dry_run=args.dry_run)
+        logging.info(f"{'Would delete' if args.dry_run else 'Deleted'} {count} metric series rows")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,188 @@
+import contextlib
+import cProfile
+import datetime
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+from collections import deque
+
+# Instrumentation is off unless DASHBOARD_PROFILING is set; the Performance page can toggle it at runtime
+PROFILING_ENABLED = os.environ.get("DASHBOARD_PROFILING", "") not in ("", "0")
+# Per-rerun profiler: None, "cprofile" or "pyinstrument" (if installed)
+PROFILER = os.environ.get("DASHBOARD_PROFILER") or None
+# Reruns kept for the Performance page
+PERF_HISTORY_RERUNS = 200
+# Functions listed in a captured cProfile report
+PROFILE_TOP_FUNCTIONS = 25
+
+logger = logging.getLogger("perf")
+
+_enabled = PROFILING_ENABLED
+_profiler = PROFILER
+_history = deque(maxlen=PERF_HISTORY_RERUNS)
+_history_lock = threading.Lock()
+# Each Streamlit session reruns its script in its own thread
+_local = threading.local()
+_disabled_span = contextlib.nullcontext()
+
+
+def configure(enabled: bool = None, profiler: str = None):
+    """Switches instrumentation and the per-rerun profiler on or off for the whole process."""
+    global _enabled, _profiler
+    if enabled is not None:
+        _enabled = enabled
+    if profiler is not None:
+        _profiler = profiler or None
+
+
+def is_enabled():
+    return _enabled
+
+
+def profiler():
+    return _profiler
+
+
+def span(name: str):
+    """
+    Times a block as a named span of the current rerun and logs it.
+    When instrumentation is off this returns a shared no-op context manager.
+    """
+    if not _enabled:
+        return _disabled_span
+    return _timed_span(name)
+
+
+@contextlib.contextmanager
+def _timed_span(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        record = getattr(_local, "rerun", None)
+        if record is not None:
+            record["spans"][name] = record["spans"].get(name, 0.0) + duration_ms
+        logger.info(f"span {name} {duration_ms:.1f} ms", extra={"span": name, "duration_ms": round(duration_ms, 3)})
+
+
+def timed(name: str = None):
+    """Decorator wrapping every call of a function in a span (named after the function by default)."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _timed_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def rerun(page: str):
+    """
+    Records one script rerun: its total time, its spans and, if a profiler
+    is configured, the profile captured while it ran.
+    """
+    if not _enabled or getattr(_local, "rerun", None) is not None:
+        yield
+        return
+    record = {"page": page, "started_at": datetime.datetime.now().isoformat(timespec="seconds"),
+              "spans": {}, "profile": None}
+    _local.rerun = record
+    capture = _start_profiler()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["total_ms"] = (time.perf_counter() - started) * 1000
+        record["profile"] = _stop_profiler(capture)
+        _local.rerun = None
+        with _history_lock:
+            _history.append(record)
+        # The message carries the span breakdown too: the dashboard's log format only shows %(message)s
+        spans = ", ".join(f"{name} {ms:.1f} ms" for name, ms in record["spans"].items())
+        logger.info(
+            f"rerun {page} {record['total_ms']:.1f} ms" + (f" (spans: {spans})" if spans else ""),
+            extra={"page": page, "duration_ms": round(record["total_ms"], 3),
+                   "spans": {name: round(ms, 3) for name, ms in record["spans"].items()}}
+        )
+
+
+def _start_profiler():
+    if _profiler == "cprofile":
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active in this thread
+            return None
+        return profile
+    if _profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("pyinstrument is not installed; reruns are not profiled")
+            return None
+        profile = Profiler()
+        profile.start()
+        return profile
+    return None
+
+
+def _stop_profiler(capture):
+    if capture is None:
+        return None
+    if isinstance(capture, cProfile.Profile):
+        capture.disable()
+        out = io.StringIO()
+        pstats.Stats(capture, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        return out.getvalue()
+    capture.stop()
+    return capture.output_text(unicode=True)
+
+
+def recent_reruns():
+    """Returns the recorded reruns, newest first."""
+    with _history_lock:
+        return list(_history)[::-1]
+
+
+def clear_history():
+    with _history_lock:
+        _history.clear()
+
+
+def span_stats(page: str = None):
+    """
+    Returns one row per span (plus "total") with its count, p50, p95 and max in ms
+    over the recorded reruns, optionally of a single page.
+    """
+    durations = {}
+    for record in recent_reruns():
+        if page is not None and record["page"] != page:
+            continue
+        durations.setdefault("total", []).append(record["total_ms"])
+        for name, ms in record["spans"].items():
+            durations.setdefault(name, []).append(ms)
+    import numpy as np
+
+    rows = []
+    for name, values in durations.items():
+        values = np.asarray(values)
+        rows.append({
+            "Span": name,
+            "Reruns": len(values),
+            "p50 (ms)": round(float(np.percentile(values, 50)), 1),
+            "p95 (ms)": round(float(np.percentile(values, 95)), 1),
+            "Max (ms)": round(float(values.max()), 1),
+        })
+    rows.sort(key=lambda row: -row["p95 (ms)"])
+    return rows
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+import weakref
+
+# Column names accepted for the true label and the model prediction
+LABEL_COLUMNS = ("label", "Label")
+PREDICTION_COLUMNS = ("prediction", "Prediction")
+
+
+def find_column(df, candidates):
+    """Returns the first of candidates present in df, or None."""
+    return next((column for column in candidates if column in df.columns), None)
+
+
+def encode_classes(labels, predictions, classes=None):
+    """
+    Maps label and prediction values onto shared class codes in one vectorized pass.
+    Rows where either value is missing get code -1.
+    """
+    labels = pd.Series(labels).reset_index(drop=True)
+    predictions = pd.Series(predictions).reset_index(drop=True)
+    if (classes is None and isinstance(labels.dtype, pd.CategoricalDtype)
+            and labels.dtype == predictions.dtype):
+        # Unordered categoricals compare equal whatever the order of their categories,
+        # so the codes only line up once both sides use the same category order
+        if not labels.cat.categories.equals(predictions.cat.categories):
+            predictions = predictions.cat.set_categories(labels.cat.categories)
+        return (labels.cat.codes.to_numpy(np.int64), predictions.cat.codes.to_numpy(np.int64),
+                pd.Index(labels.cat.categories))
+    if classes is None:
+        classes = pd.Index(pd.unique(pd.concat([labels.dropna(), predictions.dropna()]).to_numpy())).sort_values()
+    return classes.get_indexer(labels), classes.get_indexer(predictions), pd.Index(classes)
+
+
+def coerce_edited_value(value, series):
+    """Converts an edited cell value to the value type of series (the editor may send strings)."""
+    if value is None or pd.isna(value):
+        return None
+    dtype = series.dtype.categories.dtype if isinstance(series.dtype, pd.CategoricalDtype) else series.dtype
+    if pd.api.types.is_numeric_dtype(dtype) and isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        # Integer columns stay integers, so they are written back as 1 rather than 1.0
+        return int(number) if pd.api.types.is_integer_dtype(dtype) and number.is_integer() else number
+    return value
+
+
+class ConfusionMatrix:
+    """
+    Confusion matrix over a fixed list of classes (rows: label, columns: prediction).
+
+    Built with a single np.bincount over the encoded label/prediction pairs,
+    and updated in O(changed rows) as rows are edited, added or deleted.
+    """
+
+    def __init__(self, classes, matrix):
+        self.classes = pd.Index(classes)
+        self.matrix = matrix
+
+    @classmethod
+    def from_arrays(cls, labels, predictions, classes=None):
+        label_codes, prediction_codes, classes = encode_classes(labels, predictions, classes)
+        k = len(classes)
+        valid = (label_codes >= 0) & (prediction_codes >= 0)
+        matrix = np.bincount(label_codes[valid] * k + prediction_codes[valid], minlength=k * k).reshape(k, k)
+        return cls(classes, matrix.astype(np.int64))
+
+    def updated(self, removed_pairs=(), added_pairs=()):
+        """
+        Returns a new matrix with the (label, prediction) pairs of removed
+        rows subtracted and those of added rows counted. Values not seen before
+        become new classes.
+        """
+        removed_pairs, added_pairs = list(removed_pairs), list(added_pairs)
+        values = [value for pair in removed_pairs + added_pairs for value in pair if not pd.isna(value)]
+        new_classes = [value for value in pd.unique(pd.Series(values, dtype=object)) if value not in self.classes]
+        classes, matrix = self.classes, self.matrix.copy()
+        if new_classes:
+            classes = self.classes.append(pd.Index(new_classes))
+            grown = np.zeros((len(classes), len(classes)), dtype=np.int64)
+            grown[:len(self.classes), :len(self.classes)] = matrix
+            matrix = grown
+        for pairs, step in ((removed_pairs, -1), (added_pairs, 1)):
+            for label, prediction in pairs:
+                if pd.isna(label) or pd.isna(prediction):
+                    continue
+                matrix[classes.get_loc(label), classes.get_loc(prediction)] += step
+        return ConfusionMatrix(classes, matrix)
+
+    def metrics(self):
+        """
+        Returns accuracy, macro precision/recall/F1 and a per-class table.
+        Classes without predictions or without labels score 0 for the undefined ratio.
+        """
+        matrix = self.matrix
+        total = matrix.sum()
+        true_positives = np.diag(matrix).astype(float)
+        predicted = matrix.sum(axis=0)
+        support = matrix.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(predicted > 0, true_positives / predicted, 0.0)
+            recall = np.where(support > 0, true_positives / support, 0.0)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+        # Macro averages only over classes present in the labels or the predictions
+        present = (support + predicted) > 0
+        per_class = pd.DataFrame({
+            "Class": self.classes,
+            "Precision": precision,
+            "Recall": recall,
+            "F1": f1,
+            "Support": support,
+        })
+        return {
+            "rows": int(total),
+            "accuracy": float(true_positives.sum() / total) if total else 0.0,
+            "precision": float(precision[present].mean()) if present.any() else 0.0,
+            "recall": float(recall[present].mean()) if present.any() else 0.0,
+            "f1": float(f1[present].mean()) if present.any() else 0.0,
+            "per_class": per_class[present].reset_index(drop=True),
+        }
+
+    def to_frame(self):
+        return pd.DataFrame(self.matrix, index=self.classes, columns=self.classes)
+
+
+# Base matrices of the cached result frames, dropped when a frame is garbage collected
+_base_matrices = {}
+
+
+def base_confusion_matrix(df, label_column: str, prediction_column: str):
+    """
+    Returns the confusion matrix of df, computed once per frame object.
+    """
+    key = (id(df), label_column, prediction_column)
+    if key not in _base_matrices:
+        _base_matrices[key] = ConfusionMatrix.from_arrays(df[label_column], df[prediction_column])
+        weakref.finalize(df, _base_matrices.pop, key, None)
+    return _base_matrices[key]
+
+
+def apply_editor_changes(base, view, editor_state, label_column: str, prediction_column: str):
+    """
+    Updates base (the matrix of the full results frame) with the edits
+    recorded by st.data_editor for view, the row subset shown in the editor,
+    in time proportional to the number of edits.
+
+    editor_state is the data editor's session state entry with
+    "edited_rows" (position -> {column: value}), "added_rows" and
+    "deleted_rows" (positions in view).
+    """
+    if not editor_state:
+        return base
+    edited_rows = editor_state.get("edited_rows", {})
+    deleted_rows = set(editor_state.get("deleted_rows", []))
+    removed_pairs, added_pairs = [], []
+    label_position = view.columns.get_loc(label_column)
+    prediction_position = view.columns.get_loc(prediction_column)
+
+    for position in deleted_rows:
+        removed_pairs.append((view.iat[position, label_position], view.iat[position, prediction_position]))
+    for position, changes in edited_rows.items():
+        position = int(position)
+        if position in deleted_rows or not ({label_column, prediction_column} & set(changes)):
+            continue
+        old_pair = (view.iat[position, label_position], view.iat[position, prediction_position])
+        removed_pairs.append(old_pair)
+        added_pairs.append((
+            coerce_edited_value(changes[label_column], view[label_column])
+            if label_column in changes else old_pair[0],
+            coerce_edited_value(changes[prediction_column], view[prediction_column])
+            if prediction_column in changes else old_pair[1],
+        ))
+    for row in editor_state.get("added_rows", []):
+        added_pairs.append((coerce_edited_value(row.get(label_column), view[label_column]),
+                            coerce_edited_value(row.get(prediction_column), view[prediction_column])))
+
+    if not removed_pairs and not added_pairs:
+        return base
+    return base.updated(removed_pairs, added_pairs)
@@ -0,0 +1,295 @@
+import contextlib
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+from report_store import REPORTS_DIR, list_report_types, list_reports, parse_report_timestamp, read_report_bytes
+
+# SQLite index of the reports tree, kept next to the reports it describes
+REPORT_INDEX_FILE = os.path.join(REPORTS_DIR, "index.db")
+
+# Evidently embeds the report definition as "var metric_<id> = {...};"
+_EVIDENTLY_METRIC_PATTERN = re.compile(r"var metric_[0-9a-f]+ = ")
+
+
+def _walk_widgets(widgets):
+    for widget in widgets or []:
+        yield widget
+        yield from _walk_widgets(widget.get("widgets"))
+
+
+def load_evidently_report(html: str):
+    """
+    Parses the JSON definition Evidently embeds in a report and returns all of
+    its widgets, nested ones included, in document order. Returns None if the
+    report has no embedded JSON or it cannot be parsed.
+    """
+    match = _EVIDENTLY_METRIC_PATTERN.search(html)
+    if not match:
+        return None
+    try:
+        report, _ = json.JSONDecoder().raw_decode(html, match.end())
+    except json.JSONDecodeError as e:
+        logging.warning(f"Could not parse embedded report JSON: {e}")
+        return None
+    return list(_walk_widgets(report.get("widgets")))
+
+
+def extract_report_metrics(html: str):
+    """
+    Extracts the headline metrics of an Evidently report from its embedded JSON.
+
+    Numeric counters (e.g. "Accuracy", "Drifted Columns", or the "SUCCESS" and
+    "FAIL" test counts) are returned by label, together with "Dataset Drift"
+    (1 if detected, 0 if not).
+    """
+    metrics = {}
+    for widget in load_evidently_report(html) or []:
+        params = widget.get("params") or {}
+        for counter in params.get("counters") or []:
+            label, value = str(counter.get("label", "")), counter.get("value")
+            if not label:
+                continue
+            if value == "Dataset Drift":
+                metrics["Dataset Drift"] = 0.0 if "NOT detected" in label else 1.0
+                continue
+            try:
+                metrics.setdefault(label, float(value))
+            except (TypeError, ValueError):
+                continue
+    return metrics
+
+
+class ReportIndex:
+    """
+    Persistent SQLite index of the reports tree.
+
+    Each report is recorded once with its type, the timestamp parsed from
+    its name, size on disk, the SHA-256 of its HTML and the metrics extracted from its embedded
+    Evidently JSON. refresh() compares the directory entries' mtime and size
+    with the index and only opens new or changed files, so the dashboard can
+    sort, filter and chart reports without reading their HTML. The summaries
+    pre-rendered by report_summary.py are kept alongside and dropped with their report.
+    """
+
+    def __init__(self, path: str = REPORT_INDEX_FILE, base_dir: str = REPORTS_DIR):
+        self.path = path
+        self.base_dir = base_dir
+        self._refresh_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS reports (
+                    path TEXT PRIMARY KEY,
+                    report_type TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    timestamp TEXT,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_reports_type_timestamp ON reports (report_type, timestamp);
+                CREATE TABLE IF NOT EXISTS report_metrics (
+                    path TEXT NOT NULL REFERENCES reports (path) ON DELETE CASCADE,
+                    metric TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    PRIMARY KEY (path, metric)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_report_metrics_metric ON report_metrics (metric, value);
+                CREATE TABLE IF NOT EXISTS report_summaries (
+                    path TEXT PRIMARY KEY REFERENCES reports (path) ON DELETE CASCADE,
+                    summary TEXT NOT NULL
+                );
+            """)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Yields a connection that commits on success and is always closed."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA foreign_keys=ON")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def refresh(self, executor=None):
+        """
+        Brings the index in line with the reports tree by an mtime/size scan.
+        New or changed reports are parsed through executor.map if an executor is given.
+        Returns the number of reports (re)indexed and removed.
+        """
+        with self._refresh_lock:
+            with self._connect() as conn:
+                known = {path: (mtime_ns, size) for path, mtime_ns, size
+                         in conn.execute("SELECT path, mtime_ns, size FROM reports")}
+            seen, changed = set(), []
+            for report_type in list_report_types(self.base_dir):
+                for report in list_reports(os.path.join(self.base_dir, report_type)):
+                    seen.add(report["path"])
+                    if known.get(report["path"]) != (report["mtime_ns"], report["size"]):
+                        changed.append((report_type, report))
+            removed = [path for path in known if path not in seen]
+
+            # Parse outside the write transaction, readers keep working meanwhile
+            if executor is not None and changed:
+                rows = list(executor.map(self._index_row, *zip(*changed)))
+            else:
+                rows = [self._index_row(report_type, report) for report_type, report in changed]
+            with self._connect() as conn:
+                conn.executemany("DELETE FROM reports WHERE path = ?", [(path,) for path in removed])
+                for row, metrics in rows:
+                    conn.execute("DELETE FROM reports WHERE path = ?", (row[0],))
+                    conn.execute("INSERT INTO reports VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+                    conn.executemany(
+                        "INSERT INTO report_metrics (path, metric, value) VALUES (?, ?, ?)",
+                        [(row[0], metric, value) for metric, value in metrics.items()]
+                    )
+            if rows or removed:
+                logging.info(f"Report index: {len(rows)} reports indexed, {len(removed)} removed")
+            return len(rows), len(removed)
+
+    @staticmethod
+    def _index_row(report_type: str, report: dict):
+        data = read_report_bytes(report["path"])
+        timestamp = parse_report_timestamp(report["name"])
+        metrics = extract_report_metrics(data.decode("utf-8", errors="replace"))
+        row = (
+            report["path"],
+            report_type,
+            report["name"],
+            timestamp.isoformat() if timestamp else None,
+            report["size"],
+            report["mtime_ns"],
+            hashlib.sha256(data).hexdigest(),
+        )
+        return row, metrics
+
+    def report_types(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT report_type FROM reports ORDER BY report_type")]
+
+    def date_bounds(self, report_type: str):
+        """Returns the (first, last) report date of a type, or (None, None)."""
+        with self._connect() as conn:
+            first, last = conn.execute(
+                "SELECT MIN(timestamp), MAX(timestamp) FROM reports WHERE report_type = ? AND timestamp IS NOT NULL",
+                (report_type,)
+            ).fetchone()
+        if first is None:
+            return None, None
+        return datetime.date.fromisoformat(first[:10]), datetime.date.fromisoformat(last[:10])
+
+    def metric_names(self, report_type: str):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("""
+                SELECT DISTINCT m.metric FROM report_metrics m JOIN reports r ON r.path = m.path
+                WHERE r.report_type = ? ORDER BY m.metric
+            """, (report_type,))]
+
+    def query(self, report_type: str, start_date=None, end_date=None, metric: str = None,
+              min_value: float = None, max_value: float = None):
+        """
+        Returns the reports of a type, newest first, optionally limited to a date
+        range and to reports whose metric lies within [min_value, max_value].
+        Each report dict carries its parsed "timestamp" and its "metrics".
+        """
+        clauses, params = ["r.report_type = ?"], [report_type]
+        if start_date:
+            clauses.append("r.timestamp >= ?")
+            params.append(start_date.isoformat())
+        if end_date:
+            clauses.append("r.timestamp < ?")
+            params.append((end_date + datetime.timedelta(days=1)).isoformat())
+        if metric:
+            condition = "SELECT 1 FROM report_metrics m WHERE m.path = r.path AND m.metric = ?"
+            params.append(metric)
+            if min_value is not None:
+                condition += " AND m.value >= ?"
+                params.append(min_value)
+            if max_value is not None:
+                condition += " AND m.value <= ?"
+                params.append(max_value)
+            clauses.append(f"EXISTS ({condition})")
+
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                SELECT r.path, r.name, r.timestamp, r.size, r.sha256 FROM reports r
+                WHERE {' AND '.join(clauses)}
+                ORDER BY r.timestamp IS NULL, r.timestamp DESC, r.name DESC
+            """, params).fetchall()
+            metrics = {}
+            for path, metric_name, value in conn.execute("""
+                SELECT m.path, m.metric, m.value FROM report_metrics m JOIN reports r ON r.path = m.path
+                WHERE r.report_type = ?
+            """, (report_type,)):
+                metrics.setdefault(path, {})[metric_name] = value
+        return [{
+            "path": path,
+            "name": name,
+            "timestamp": datetime.datetime.fromisoformat(timestamp) if timestamp else None,
+            "size": size,
+            "sha256": sha256,
+            "metrics": metrics.get(path, {}),
+        } for path, name, timestamp, size, sha256 in rows]
+
+    def metric_rows(self):
+        """
+        Yields (path, sha256, report type, timestamp, metric, value) for every
+        metric of the reports with a parsed timestamp, oldest first.
+        """
+        with self._connect() as conn:
+            yield from conn.execute("""
+                SELECT r.path, r.sha256, r.report_type, r.timestamp, m.metric, m.value
+                FROM reports r JOIN report_metrics m ON m.path = r.path
+                WHERE r.timestamp IS NOT NULL ORDER BY r.timestamp
+            """).fetchall()
+
+    def summary(self, path: str):
+        """Returns the pre-rendered summary of a report, or None if it has none yet."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT summary FROM report_summaries WHERE path = ?", (path,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def unsummarized_paths(self):
+        """Returns the paths of the indexed reports that have no summary, newest first."""
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("""
+                SELECT r.path FROM reports r LEFT JOIN report_summaries s ON s.path = r.path
+                WHERE s.path IS NULL ORDER BY r.timestamp DESC
+            """)]
+
+    def store_summary(self, path: str, sha256: str, summary: dict):
+        """
+        Stores the summary of a report if the index still holds the content it was built from.
+        A re-indexed report drops its old summary (ON DELETE CASCADE), so a summary is never stale.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                INSERT OR REPLACE INTO report_summaries (path, summary)
+                SELECT path, ? FROM reports WHERE path = ? AND sha256 = ?
+            """, (json.dumps(summary), path, sha256))
+            return cursor.rowcount > 0
+
+    def clear_summaries(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM report_summaries")
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_report_index(path: str = None):
+    """Returns the report index shared by every session of the server process."""
+    path = path or REPORT_INDEX_FILE
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = ReportIndex(path)
+        return _indexes[path]
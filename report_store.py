@@ -0,0 +1,289 @@
+import argparse
+import datetime
+import gzip
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import perf
+
+# Root folder holding one sub-folder per report type (e.g. "Model Drift")
+REPORTS_DIR = "reports"
+# Number of reports offered per page in the report browser
+REPORTS_PAGE_SIZE = 50
+# Upper bound for the HTML kept in memory by the shared report cache
+REPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Reports are plain HTML or gzip-compressed HTML; new reports are written compressed
+REPORT_EXTENSIONS = (".html.gz", ".html")
+COMPRESS_REPORTS = True
+REPORT_COMPRESSION_LEVEL = 6
+# report_dd_mm_yyyy or report_dd_mm_yyyy_HH_MM_SS
+_REPORT_NAME_PATTERN = re.compile(r"(\d{2})_(\d{2})_(\d{4})(?:_(\d{2})_(\d{2})_(\d{2}))?$")
+
+
+def report_name(file_name: str):
+    """Returns the report name of a file name, without its .html or .html.gz extension."""
+    for extension in REPORT_EXTENSIONS:
+        if file_name.endswith(extension):
+            return file_name[:-len(extension)]
+    return None
+
+
+def read_report_bytes(path: str):
+    """
+    Returns the raw HTML bytes of a report, decompressing .html.gz files.
+    """
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            return f.read()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def save_report(html: str, report_dir: str, name: str, compress: bool = COMPRESS_REPORTS):
+    """
+    Writes a report atomically as <name>.html.gz (or <name>.html) and
+    returns its path. An older copy of the report in the other format is removed.
+    """
+    os.makedirs(report_dir, exist_ok=True)
+    data = html.encode("utf-8") if isinstance(html, str) else html
+    path = os.path.join(report_dir, name + (".html.gz" if compress else ".html"))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        if compress:
+            # mtime=0 keeps the compressed bytes identical for identical reports
+            with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=REPORT_COMPRESSION_LEVEL, mtime=0) as gz:
+                gz.write(data)
+        else:
+            f.write(data)
+    os.replace(tmp_path, path)
+    other_path = os.path.join(report_dir, name + (".html" if compress else ".html.gz"))
+    if os.path.exists(other_path):
+        os.remove(other_path)
+    return path
+
+
+def parse_report_timestamp(name: str):
+    """
+    Returns the datetime encoded in a report name such as
+    "report_02_06_2025_04_47_30" (or "report_27_05_2025"), or None.
+    """
+    match = _REPORT_NAME_PATTERN.search(name)
+    if not match:
+        return None
+    day, month, year, hour, minute, second = match.groups()
+    try:
+        return datetime.datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0))
+    except ValueError:
+        return None
+
+
+def list_report_types(base_dir: str = REPORTS_DIR):
+    """
+    Returns the sorted names of the report type sub-folders of base_dir.
+    """
+    if not os.path.isdir(base_dir):
+        return []
+    with os.scandir(base_dir) as entries:
+        return sorted(entry.name for entry in entries if entry.is_dir())
+
+
+def _report_order(report):
+    timestamp = parse_report_timestamp(report["name"]) or datetime.datetime.fromtimestamp(report["mtime"])
+    return timestamp, report["file"]
+
+
+def list_reports(report_path: str):
+    """
+    Lists the HTML reports (plain or gzip-compressed) of one report type from file metadata only.
+
+    The files themselves are never opened; size and mtime come from the
+    directory entry, so listing stays cheap however large the reports are.
+    Newest reports come first, by the timestamp in their name or, for names
+    without one, by their mtime.
+    """
+    reports = []
+    if not os.path.isdir(report_path):
+        return reports
+    with os.scandir(report_path) as entries:
+        for entry in entries:
+            name = report_name(entry.name)
+            if not entry.is_file() or name is None:
+                continue
+            stat = entry.stat()
+            reports.append({
+                "name": name,
+                "compressed": entry.name.endswith(".gz"),
+                "file": entry.name,
+                "path": entry.path,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "mtime_ns": stat.st_mtime_ns,
+            })
+    reports.sort(key=_report_order, reverse=True)
+    return reports
+
+
+class ReportCache:
+    """
+    Process-wide LRU cache of report HTML, shared by every Streamlit session.
+
+    Entries are looked up by (path, mtime, size), so a rewritten file is
+    read again, and stored by the SHA-256 of their decompressed content, so
+    identical reports share a single copy whether or not they are compressed.
+    The LRU is bounded by max_bytes of decompressed content.
+    """
+
+    def __init__(self, max_bytes: int = REPORT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._contents = OrderedDict()  # digest -> (html, size), least recently used first
+        self._digest_by_key = {}        # (path, mtime_ns, size) -> digest
+        self._key_by_path = {}          # path -> current (path, mtime_ns, size)
+        self._keys_by_digest = {}       # digest -> set of keys pointing at it
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.dedup_hits = 0
+        self.evictions = 0
+
+    def get(self, path: str):
+        """
+        Returns the HTML of the report at path, reading it from disk on a miss.
+        """
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._digest_by_key.get(key)
+            if digest is not None:
+                self._contents.move_to_end(digest)
+                self.hits += 1
+                return self._contents[digest][0]
+
+        # Read, decompress and hash outside the lock so other sessions are not blocked on disk I/O
+        data = read_report_bytes(path)
+        digest = hashlib.sha256(data).hexdigest()
+        html = data.decode("utf-8")
+
+        with self._lock:
+            self.misses += 1
+            self._forget_path(path)
+            if digest in self._contents:
+                self.dedup_hits += 1
+                self._contents.move_to_end(digest)
+                html = self._contents[digest][0]
+            elif len(data) <= self.max_bytes:
+                self._contents[digest] = (html, len(data))
+                self._bytes += len(data)
+                self._keys_by_digest[digest] = set()
+                self._evict()
+            else:
+                return html
+            self._digest_by_key[key] = digest
+            self._key_by_path[path] = key
+            self._keys_by_digest[digest].add(key)
+        return html
+
+    def _forget_path(self, path):
+        """Drops the key of an older version of path (caller holds the lock)."""
+        old_key = self._key_by_path.pop(path, None)
+        if old_key is None:
+            return
+        digest = self._digest_by_key.pop(old_key, None)
+        if digest in self._keys_by_digest:
+            self._keys_by_digest[digest].discard(old_key)
+
+    def _evict(self):
+        """Evicts least recently used content until under max_bytes (caller holds the lock)."""
+        while self._bytes > self.max_bytes and self._contents:
+            digest, (_, size) = self._contents.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            for key in self._keys_by_digest.pop(digest, ()):
+                self._digest_by_key.pop(key, None)
+                if self._key_by_path.get(key[0]) == key:
+                    del self._key_by_path[key[0]]
+            logging.debug(f"Evicted report content {digest[:12]} ({size} bytes) from cache")
+
+    def clear(self):
+        with self._lock:
+            self._contents.clear()
+            self._digest_by_key.clear()
+            self._key_by_path.clear()
+            self._keys_by_digest.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Returns the cache counters and current occupancy.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "dedup_hits": self.dedup_hits,
+                "evictions": self.evictions,
+                "entries": len(self._contents),
+                "paths": len(self._digest_by_key),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Module state lives as long as the server process, so all sessions share this cache
+report_cache = ReportCache()
+
+
+@perf.timed("reports.read_report")
+def read_report(path: str):
+    """
+    Reads the HTML content of a single report through the shared report cache.
+    """
+    return report_cache.get(path)
+
+
+def compress_reports(base_dir: str = REPORTS_DIR, dry_run: bool = False):
+    """
+    Rewrites every plain .html report under base_dir as .html.gz.
+    Returns (reports compressed, bytes before, bytes after); a dry run only
+    estimates the compressed size.
+    """
+    compressed, bytes_before, bytes_after = 0, 0, 0
+    for report_type in list_report_types(base_dir):
+        report_dir = os.path.join(base_dir, report_type)
+        for report in list_reports(report_dir):
+            if report["compressed"]:
+                continue
+            data = read_report_bytes(report["path"])
+            bytes_before += report["size"]
+            if dry_run:
+                bytes_after += len(gzip.compress(data, compresslevel=REPORT_COMPRESSION_LEVEL, mtime=0))
+            else:
+                bytes_after += os.path.getsize(save_report(data, report_dir, report["name"], compress=True))
+            compressed += 1
+    return compressed, bytes_before, bytes_after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintenance of the stored monitoring reports.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compress_parser = subparsers.add_parser("compress", help="Convert plain HTML reports to gzip")
+    compress_parser.add_argument("--base-dir", default=REPORTS_DIR)
+    compress_parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "compress":
+        count, before, after = compress_reports(args.base_dir, dry_run=args.dry_run)
+        verb = "Would compress" if args.dry_run else "Compressed"
+        logging.info(
+            f"{verb} {count} reports: {before / 1_048_576:.1f} MB -> {after / 1_048_576:.1f} MB "
+            f"({(before - after) / 1_048_576:.1f} MB reclaimed)"
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
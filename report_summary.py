@@ -0,0 +1,210 @@
+import argparse
+import hashlib
+import html
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from report_index import REPORT_INDEX_FILE, get_report_index, load_evidently_report
+from report_store import read_report_bytes
+
+# Rows kept from each table of a report (the full table stays in the interactive report)
+REPORT_SUMMARY_TABLE_ROWS = 50
+# Static charts kept per summary
+REPORT_SUMMARY_MAX_CHARTS = 6
+# Bars drawn per chart
+CHART_MAX_BARS = 20
+CHART_WIDTH = 360
+CHART_BAR_HEIGHT = 16
+# Colours of the Evidently test states and of the reference/current series
+TEST_STATE_COLORS = {"SUCCESS": "#2e7d32", "WARNING": "#f9a825", "FAIL": "#c62828", "ERROR": "#6a1b9a"}
+REFERENCE_COLOR = "#9e9e9e"
+CURRENT_COLOR = "#ed0400"
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _bar_chart_svg(title: str, bars, colors=None):
+    """
+    Draws labelled horizontal bars as a small standalone SVG.
+    bars is a list of (label, value); colors optionally maps labels to colours.
+    """
+    bars = bars[:CHART_MAX_BARS]
+    label_width, value_width = 130, 50
+    top = 24
+    height = top + len(bars) * (CHART_BAR_HEIGHT + 4) + 4
+    scale = max((abs(value) for _, value in bars), default=0) or 1
+    bar_space = CHART_WIDTH - label_width - value_width
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{CHART_WIDTH}" height="{height}" font-family="sans-serif" font-size="11">',
+        f'<text x="0" y="14" font-weight="bold">{html.escape(title)}</text>',
+    ]
+    for i, (label, value) in enumerate(bars):
+        y = top + i * (CHART_BAR_HEIGHT + 4)
+        color = (colors or {}).get(label, CURRENT_COLOR)
+        parts.append(f'<text x="0" y="{y + 12}">{html.escape(str(label)[:22])}</text>')
+        parts.append(f'<rect x="{label_width}" y="{y}" width="{bar_space * abs(value) / scale:.1f}" '
+                     f'height="{CHART_BAR_HEIGHT}" fill="{color}"/>')
+        parts.append(f'<text x="{CHART_WIDTH - value_width + 4}" y="{y + 12}">{value:g}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def _distribution_svg(title: str, reference: dict, current: dict):
+    """
+    Draws the reference and current distributions of a column as paired vertical bars.
+    Each distribution is Evidently's {"x": [...], "y": [...]}.
+    """
+    reference_counts = dict(zip(reference.get("x") or [], reference.get("y") or []))
+    current_counts = dict(zip(current.get("x") or [], current.get("y") or []))
+    buckets = list(dict.fromkeys(list(reference_counts) + list(current_counts)))[:CHART_MAX_BARS]
+    height, top, bottom = 120, 20, 100
+    # Shares rather than counts, so a small current window is comparable with the reference
+    reference_total = sum(reference_counts.values()) or 1
+    current_total = sum(current_counts.values()) or 1
+    shares = [(reference_counts.get(b, 0) / reference_total, current_counts.get(b, 0) / current_total) for b in buckets]
+    scale = max((max(pair) for pair in shares), default=0) or 1
+    slot = CHART_WIDTH / max(len(buckets), 1)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{CHART_WIDTH}" height="{height}" font-family="sans-serif" font-size="11">',
+        f'<text x="0" y="14" font-weight="bold">{html.escape(title)}</text>',
+    ]
+    for i, (reference_share, current_share) in enumerate(shares):
+        x = i * slot
+        for offset, share, color in ((0.1, reference_share, REFERENCE_COLOR), (0.5, current_share, CURRENT_COLOR)):
+            bar_height = (bottom - top) * share / scale
+            parts.append(f'<rect x="{x + slot * offset:.1f}" y="{bottom - bar_height:.1f}" width="{slot * 0.4:.1f}" '
+                         f'height="{bar_height:.1f}" fill="{color}"/>')
+        parts.append(f'<text x="{x + slot * 0.1:.1f}" y="{bottom + 14}">{html.escape(str(buckets[i])[:8])}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def build_report_summary(report_html: str):
+    """
+    Builds the lightweight summary of an Evidently report from its embedded JSON.
+
+    The summary holds the counters grouped by widget (key metrics, drift
+    verdicts, test counts), the test suite as title/description/state rows,
+    the per-column drift table, the first rows of plain tables and a few small
+    static SVG charts. Returns None if the report has no embedded JSON.
+    """
+    widgets = load_evidently_report(report_html)
+    if widgets is None:
+        return None
+
+    summary = {"counters": [], "tests": [], "columns": [], "tables": [], "charts": []}
+    distributions = []
+    for widget in widgets:
+        params = widget.get("params") or {}
+        title = widget.get("title") or ""
+        if widget.get("type") == "counter":
+            values = []
+            for counter in params.get("counters") or []:
+                label, value = str(counter.get("label", "")), str(counter.get("value", ""))
+                if not value:
+                    # Value-less counters are section headings
+                    continue
+                number = _number(value)
+                if number is None:
+                    # e.g. value "Dataset Drift" with the verdict as its label
+                    values.append([value, label])
+                else:
+                    values.append([label or title, number])
+            if values:
+                summary["counters"].append({"title": title, "values": values, "tests": "v2_test" in params})
+        elif widget.get("type") == "test_suite":
+            summary["tests"].extend(
+                {"title": test.get("title", ""), "description": test.get("description", ""),
+                 "state": str(test.get("state", "")).upper()}
+                for test in params.get("tests") or []
+            )
+        elif widget.get("type") == "big_table":
+            for row in params.get("data") or []:
+                if "column_name" not in row:
+                    continue
+                summary["columns"].append({
+                    "column": row.get("column_name"),
+                    "type": row.get("column_type"),
+                    "stat_test": row.get("stattest_name"),
+                    "drift_score": _number(row.get("drift_score")),
+                    "drift": row.get("data_drift"),
+                })
+                if row.get("reference_distribution") and row.get("current_distribution"):
+                    distributions.append((row["column_name"], row["reference_distribution"], row["current_distribution"]))
+        elif widget.get("type") == "table" and params.get("header"):
+            summary["tables"].append({
+                "title": title,
+                "header": params["header"],
+                "data": (params.get("data") or [])[:REPORT_SUMMARY_TABLE_ROWS],
+            })
+
+    charts = summary["charts"]
+    for group in summary["counters"]:
+        numeric = [(label, value) for label, value in group["values"] if isinstance(value, float)]
+        if group["tests"]:
+            charts.append({"title": "Tests", "svg": _bar_chart_svg("Tests", numeric, TEST_STATE_COLORS)})
+        elif len(numeric) > 1:
+            charts.append({"title": group["title"], "svg": _bar_chart_svg(group["title"] or "Metrics", numeric)})
+    for column, reference, current in distributions:
+        charts.append({"title": f"{column} distribution",
+                       "svg": _distribution_svg(f"{column}: reference vs current", reference, current)})
+    del charts[REPORT_SUMMARY_MAX_CHARTS:]
+    return summary
+
+
+def summarize_report_file(path: str):
+    """
+    Reads one report and returns (path, sha256 of its HTML, summary).
+    Runs in the pre-render worker processes, so it only touches the file.
+    """
+    data = read_report_bytes(path)
+    return path, hashlib.sha256(data).hexdigest(), build_report_summary(data.decode("utf-8", errors="replace"))
+
+
+def prerender_reports(index_path: str = REPORT_INDEX_FILE, workers: int = None, force: bool = False):
+    """
+    Refreshes the report index and summarizes every report without a summary
+    across a pool of worker processes (one per core by default).
+    Returns the number of summaries written.
+    """
+    report_index = get_report_index(index_path)
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # New reports are parsed for the index by the same pool
+        report_index.refresh(executor=executor)
+        if force:
+            report_index.clear_summaries()
+        paths = report_index.unsummarized_paths()
+        if not paths:
+            return 0
+        # A few chunks per worker keeps every core busy without one task per report
+        chunksize = max(1, len(paths) // (workers * 4))
+        written = 0
+        for path, sha256, summary in executor.map(summarize_report_file, paths, chunksize=chunksize):
+            if summary is not None and report_index.store_summary(path, sha256, summary):
+                written += 1
+    logging.info(f"Pre-rendered {written} of {len(paths)} report summaries with {workers} workers "
+                 f"in {time.perf_counter() - started:.1f} s")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render lightweight summaries of the monitoring reports.")
+    parser.add_argument("--index", default=REPORT_INDEX_FILE)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--force", action="store_true", help="re-render summaries that already exist")
+    args = parser.parse_args()
+    prerender_reports(args.index, workers=args.workers, force=args.force)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,263 @@
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+# Inference request log written by the serving side, one JSON record per line:
+# {"timestamp": ..., "text": ..., "prediction": ..., "latency_ms": ...}
+REQUEST_LOG_FILE = "logs/requests.jsonl"
+# Lines parsed per batch while catching up on the log
+REQUEST_BATCH_LINES = 5000
+# Seconds of per-second history kept in the ring buffer
+REQUEST_HISTORY_SECONDS = 3600
+# Prediction classes tracked individually; later ones are counted as "other"
+MAX_TRACKED_CLASSES = 16
+# Text length histogram bin edges (characters)
+TEXT_LENGTH_EDGES = np.array([16, 32, 64, 128, 256, 512, 1024, 2048, 4096])
+# Latency histogram bin edges (milliseconds), log-spaced from 1 ms to 60 s
+LATENCY_EDGES_MS = np.logspace(0, np.log10(60_000), 48)
+
+
+def _record_time(record, default: float):
+    """Returns the record timestamp as epoch seconds, falling back to default."""
+    value = record.get("timestamp")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return default
+
+
+def _record_latency(record):
+    """Returns the record latency in milliseconds, NaN if it is missing or not a number."""
+    try:
+        return float(record.get("latency_ms", np.nan))
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class RequestLogTailer:
+    """
+    Tails a JSON-lines request log from a remembered byte offset.
+    A new inode (rotation) or a shrunken file (truncation) restarts from the beginning.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self.inode = None
+
+    def read_batches(self, batch_lines: int = REQUEST_BATCH_LINES):
+        """
+        Yields lists of parsed records appended since the last call, batch_lines at a time.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.offset, self.inode = 0, stat.st_ino
+        if stat.st_size == self.offset:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            batch = []
+            while True:
+                line = f.readline()
+                # Stop at a trailing partial line, the writer may still be on it
+                if not line or not line.endswith(b"\n"):
+                    break
+                self.offset += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    batch.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping malformed request log line in {self.path}: {line[:200]!r}")
+                    continue
+                if len(batch) >= batch_lines:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+
+class RequestWindowAggregates:
+    """
+    Per-second request aggregates in fixed-size ring buffers.
+
+    Each of history_seconds slots holds the request count, prediction class
+    counts, a text length histogram and a latency histogram for one second,
+    so memory is constant however many requests arrive. Sliding windows sum
+    the slots of the last N seconds; tumbling windows group slots into
+    fixed buckets.
+    """
+
+    def __init__(self, history_seconds: int = REQUEST_HISTORY_SECONDS, max_classes: int = MAX_TRACKED_CLASSES):
+        self.history_seconds = history_seconds
+        self.classes = []
+        self.max_classes = max_classes
+        self.slot_second = np.full(history_seconds, -1, dtype=np.int64)
+        self.requests = np.zeros(history_seconds, dtype=np.int64)
+        self.class_counts = np.zeros((history_seconds, max_classes + 1), dtype=np.int64)
+        self.length_counts = np.zeros((history_seconds, len(TEXT_LENGTH_EDGES) + 1), dtype=np.int64)
+        self.latency_counts = np.zeros((history_seconds, len(LATENCY_EDGES_MS) + 1), dtype=np.int64)
+        self.latest_second = 0
+        self.total_requests = 0
+
+    def _class_position(self, prediction):
+        if prediction is None:
+            return self.max_classes
+        key = str(prediction)
+        if key in self.classes:
+            return self.classes.index(key)
+        if len(self.classes) < self.max_classes:
+            self.classes.append(key)
+            return len(self.classes) - 1
+        return self.max_classes
+
+    def add_batch(self, records, now: float = None):
+        """
+        Folds a batch of request records into the per-second slots.
+        Records older than the history are ignored.
+        """
+        now = time.time() if now is None else now
+        seconds = np.array([int(_record_time(record, now)) for record in records], dtype=np.int64)
+        if not len(seconds):
+            return 0
+        self.latest_second = max(self.latest_second, int(seconds.max()))
+        keep = seconds > self.latest_second - self.history_seconds
+        slots = seconds % self.history_seconds
+
+        # Reset slots that still hold an older second before reusing them
+        stale_slots = np.unique(slots[keep][self.slot_second[slots[keep]] != seconds[keep]])
+        self.requests[stale_slots] = 0
+        self.class_counts[stale_slots] = 0
+        self.length_counts[stale_slots] = 0
+        self.latency_counts[stale_slots] = 0
+        self.slot_second[slots[keep]] = seconds[keep]
+
+        kept_records = [record for record, kept in zip(records, keep) if kept]
+        kept_slots = slots[keep]
+        np.add.at(self.requests, kept_slots, 1)
+
+        class_positions = np.array(
+            [self._class_position(record.get("prediction")) for record in kept_records], dtype=np.int64
+        )
+        np.add.at(self.class_counts, (kept_slots, class_positions), 1)
+
+        lengths = np.array([len(str(record.get("text") or "")) for record in kept_records])
+        np.add.at(self.length_counts, (kept_slots, np.searchsorted(TEXT_LENGTH_EDGES, lengths, side="right")), 1)
+
+        latencies = np.array([_record_latency(record) for record in kept_records], dtype=float)
+        has_latency = np.isfinite(latencies)
+        np.add.at(
+            self.latency_counts,
+            (kept_slots[has_latency], np.searchsorted(LATENCY_EDGES_MS, latencies[has_latency], side="right")),
+            1
+        )
+        self.total_requests += len(kept_records)
+        return len(kept_records)
+
+    def _window_mask(self, seconds: int, end: int = None):
+        end = int(time.time()) if end is None else end
+        return (self.slot_second > end - seconds) & (self.slot_second <= end)
+
+    def sliding(self, seconds: int, end: int = None):
+        """
+        Aggregates over the last `seconds` seconds up to end (default: now),
+        so the rates drop to zero when traffic stops.
+        """
+        mask = self._window_mask(seconds, end)
+        latency = self.latency_counts[mask].sum(axis=0)
+        class_counts = self.class_counts[mask].sum(axis=0)
+        requests = int(self.requests[mask].sum())
+        return {
+            "requests": requests,
+            "rate_per_second": requests / seconds if seconds else 0.0,
+            "class_mix": {name: int(count) for name, count in zip(self.classes + ["other"], class_counts) if count},
+            "text_length_counts": self.length_counts[mask].sum(axis=0),
+            "latency_p50_ms": _histogram_percentile(latency, 50),
+            "latency_p95_ms": _histogram_percentile(latency, 95),
+            "latency_p99_ms": _histogram_percentile(latency, 99),
+        }
+
+    def tumbling(self, window_seconds: int, windows: int, end: int = None):
+        """
+        Request counts of the last `windows` tumbling windows of window_seconds each,
+        oldest first, as (window start epoch second, count) pairs; the last window holds end (default: now).
+        """
+        end = int(time.time()) if end is None else end
+        last_start = end - end % window_seconds
+        starts = last_start - window_seconds * np.arange(windows - 1, -1, -1)
+        valid = self.slot_second >= 0
+        positions = (self.slot_second[valid] - starts[0]) // window_seconds
+        counts = np.zeros(windows, dtype=np.int64)
+        in_range = (positions >= 0) & (positions < windows)
+        np.add.at(counts, positions[in_range], self.requests[valid][in_range])
+        return list(zip(starts.tolist(), counts.tolist()))
+
+
+def _histogram_percentile(counts, percentile: float):
+    """Upper bin edge (ms) below which `percentile` percent of the latencies fall, or None."""
+    total = counts.sum()
+    if not total:
+        return None
+    position = int(np.searchsorted(np.cumsum(counts), total * percentile / 100))
+    return float(LATENCY_EDGES_MS[min(position, len(LATENCY_EDGES_MS) - 1)])
+
+
+class RequestMonitor:
+    """Tailer plus window aggregates for one request log; poll() ingests whatever is new."""
+
+    def __init__(self, path: str = REQUEST_LOG_FILE):
+        self.tailer = RequestLogTailer(path)
+        self.aggregates = RequestWindowAggregates()
+        self.lock = threading.Lock()
+
+    def poll(self):
+        """
+        Ingests newly appended records batch by batch and returns how many were added.
+        """
+        added = 0
+        with self.lock:
+            for batch in self.tailer.read_batches():
+                added += self.aggregates.add_batch(batch)
+        return added
+
+    def snapshot(self, window_seconds: int, end: int = None):
+        """
+        Returns the totals, the sliding window of window_seconds and the one-minute
+        tumbling windows over the whole history, all read under the lock so a
+        poll() from another session cannot change the ring buffers in between.
+        """
+        with self.lock:
+            aggregates = self.aggregates
+            return {
+                "total_requests": aggregates.total_requests,
+                "latest_second": aggregates.latest_second,
+                "window": aggregates.sliding(window_seconds, end),
+                "per_minute": aggregates.tumbling(60, aggregates.history_seconds // 60, end),
+            }
+
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def get_request_monitor(path: str = None):
+    """Returns the request monitor of path shared by every session of the server process."""
+    path = path or REQUEST_LOG_FILE
+    with _monitors_lock:
+        if path not in _monitors:
+            _monitors[path] = RequestMonitor(path)
+        return _monitors[path]
@@ -0,0 +1,237 @@
+import datetime
+import json
+import logging
+import os
+import threading
+
+import pandas as pd
+
+from quality_metrics import coerce_edited_value
+from results_store import RESULTS_DIR
+
+# Edit logs of the results files, one JSON-lines file per results CSV
+RESULTS_EDITS_DIR = os.path.join(RESULTS_DIR, ".edits")
+
+
+def editor_change_set(view, editor_state):
+    """
+    Converts the state of st.data_editor over view into a change set keyed by
+    the rows' index labels in the full frame, so it stays valid whatever
+    filter the editor was showing. Returns None if nothing was changed.
+    """
+    if not editor_state:
+        return None
+    edited = {
+        int(view.index[int(position)]): dict(changes)
+        for position, changes in editor_state.get("edited_rows", {}).items() if changes
+    }
+    deleted = [int(view.index[position]) for position in editor_state.get("deleted_rows", [])]
+    added = [dict(row) for row in editor_state.get("added_rows", []) if row]
+    if not (edited or deleted or added):
+        return None
+    return {"edited": edited, "deleted": deleted, "added": added}
+
+
+def change_set_size(change_set):
+    return len(change_set["edited"]) + len(change_set["deleted"]) + len(change_set["added"])
+
+
+def _widen_categories(frame, column, values):
+    """Adds the values missing from the categories of a categorical column."""
+    new_categories = [value for value in dict.fromkeys(values)
+                      if value is not None and value not in frame[column].cat.categories]
+    if new_categories:
+        frame[column] = frame[column].cat.add_categories(new_categories)
+
+
+def _set_column_values(frame, column, labels, values):
+    values = [coerce_edited_value(value, frame[column]) for value in values]
+    if isinstance(frame[column].dtype, pd.CategoricalDtype):
+        _widen_categories(frame, column, values)
+    frame.loc[labels, column] = values
+
+
+def apply_change_sets(df, change_sets):
+    """
+    Returns a new frame with the change sets applied to df, in order; df itself is not modified.
+
+    Added rows get the index labels following the largest label of df in the
+    order they were added, the same labels they had when later change sets
+    were recorded against a merged frame.
+    """
+    if not change_sets:
+        return df
+    next_label = int(df.index.max()) + 1 if len(df) else 0
+    updates, deleted, added = {}, set(), {}
+    for change_set in change_sets:
+        for label, changes in change_set["edited"].items():
+            label = int(label)
+            (added[label] if label in added else updates.setdefault(label, {})).update(changes)
+        for label in change_set["deleted"]:
+            if added.pop(label, None) is None:
+                deleted.add(label)
+            updates.pop(label, None)
+        for row in change_set["added"]:
+            added[next_label] = dict(row)
+            next_label += 1
+
+    merged = df.drop(index=[label for label in deleted if label in df.index])
+    if not deleted:
+        merged = merged.copy()
+    columns = {}
+    for label, changes in updates.items():
+        if label not in merged.index:
+            continue
+        for column, value in changes.items():
+            if column in merged.columns:
+                column_labels, column_values = columns.setdefault(column, ([], []))
+                column_labels.append(label)
+                column_values.append(value)
+    for column, (labels, values) in columns.items():
+        _set_column_values(merged, column, labels, values)
+
+    if added:
+        added_df = pd.DataFrame.from_records(list(added.values()), index=list(added), columns=merged.columns)
+        for column in merged.columns:
+            values = [coerce_edited_value(value, merged[column]) for value in added_df[column]]
+            if isinstance(merged[column].dtype, pd.CategoricalDtype):
+                # Same categories on both sides, so the concatenated column stays categorical
+                _widen_categories(merged, column, values)
+                added_df[column] = pd.Categorical(values, dtype=merged[column].dtype)
+            else:
+                added_df[column] = values
+        merged = pd.concat([merged, added_df])
+    return merged
+
+
+class ResultsEditLog:
+    """
+    Compact diff log of the edits made to one results file.
+
+    Each saved editor change set (edited cells, deleted rows and added rows,
+    keyed by index label) is one JSON line, so relabelling a few rows of a
+    large file writes a few hundred bytes instead of the whole CSV. The
+    change sets are applied lazily: merged() builds the edited frame once per
+    log version, and the CSV is only serialized on export or when the merged
+    file is written back.
+
+    The log remembers the size and mtime of the file it was started against;
+    if the file was replaced since, the log is stale and is not applied.
+    With path None the log lives in memory only (uploaded files).
+    """
+
+    def __init__(self, path: str = None, base_signature=None):
+        self.path = path
+        self.base_signature = list(base_signature) if base_signature else None
+        self.change_sets = []
+        self.stale = False
+        self._lock = threading.Lock()
+        self._merged = None
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+        try:
+            header = json.loads(lines[0]) if lines else {}
+            change_sets = [json.loads(line) for line in lines[1:]]
+        except json.JSONDecodeError as e:
+            logging.warning(f"Ignoring unreadable edit log {self.path}: {e}")
+            self.stale = True
+            return
+        if self.base_signature is not None and header.get("base") != self.base_signature:
+            logging.warning(f"Edit log {self.path} was recorded against another version of its results file")
+            self.stale = True
+            return
+        self.change_sets = change_sets
+
+    @property
+    def version(self):
+        return len(self.change_sets)
+
+    def append(self, change_set):
+        """Records a change set and persists it as one appended line."""
+        with self._lock:
+            if self.stale:
+                raise RuntimeError("The edit log is stale; discard it before recording new edits")
+            record = {
+                "edited": {int(label): changes for label, changes in change_set["edited"].items()},
+                "deleted": [int(label) for label in change_set["deleted"]],
+                "added": change_set["added"],
+                "saved_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            }
+            if self.path:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                new_file = not os.path.exists(self.path)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    if new_file:
+                        f.write(json.dumps({"base": self.base_signature}) + "\n")
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.change_sets.append(record)
+
+    def discard(self, base_signature=None):
+        """Drops every recorded change set (and the log file); the next edits start a new log."""
+        with self._lock:
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+            self.change_sets = []
+            self.stale = False
+            self._merged = None
+            if base_signature is not None:
+                self.base_signature = list(base_signature)
+
+    def check_base(self, base_signature):
+        """
+        Marks the log stale if its results file was replaced since the log was started.
+        A log without change sets simply moves on to the new version of the file.
+        """
+        with self._lock:
+            if list(base_signature) == self.base_signature:
+                return
+            if self.change_sets:
+                self.stale = True
+            else:
+                self.base_signature = list(base_signature)
+
+    def merged(self, df):
+        """Returns df with the logged change sets applied, built once per log version."""
+        if self.stale or not self.change_sets:
+            return df
+        with self._lock:
+            cached = self._merged
+            if cached is not None and cached[0] is df and cached[1] == self.version:
+                return cached[2]
+            merged = apply_change_sets(df, self.change_sets)
+            self._merged = (df, self.version, merged)
+            return merged
+
+
+def results_signature(path: str):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def write_results_file(df, path: str):
+    """Writes a results frame to path atomically and returns its new signature."""
+    tmp_path = path + ".tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return results_signature(path)
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_results_edit_log(results_path: str):
+    """Returns the edit log of a results file, shared by every session of the server process."""
+    results_path = os.path.abspath(results_path)
+    signature = results_signature(results_path)
+    with _logs_lock:
+        if results_path not in _logs:
+            log_path = os.path.join(RESULTS_EDITS_DIR, os.path.basename(results_path) + ".edits.jsonl")
+            _logs[results_path] = ResultsEditLog(log_path, signature)
+        edit_log = _logs[results_path]
+    edit_log.check_base(signature)
+    return edit_log
@@ -0,0 +1,161 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from quality_metrics import encode_classes
+
+# Rows of a results file above which the editor shows a sample or one page instead of every row
+LARGE_RESULTS_ROWS = 50_000
+# Rows in a stratified sample, and the share of them drawn from rows where label != prediction
+SAMPLE_ROWS = 1_000
+DISAGREEMENT_SHARE = 0.5
+# Seed of the sample, so every rerun and every reviewer sees the same rows
+SAMPLE_SEED = 0
+# Rows per page when paging through a results file
+RESULTS_PAGE_ROWS = 1_000
+# Samples kept across reruns; every seed, size and label filter tried is one entry
+SAMPLE_CACHE_ENTRIES = 8
+
+
+def _strata(df, label_column: str, prediction_column: str):
+    """
+    Returns (stratum code per row, stratum table) for the (label, prediction) pairs of df.
+    Rows with a missing label or prediction share one last stratum.
+    """
+    if label_column and prediction_column:
+        label_codes, prediction_codes, classes = encode_classes(df[label_column], df[prediction_column])
+    elif label_column:
+        label_codes, _, classes = encode_classes(df[label_column], df[label_column])
+        prediction_codes = label_codes
+    else:
+        label_codes = prediction_codes = np.zeros(len(df), dtype=np.int64)
+        classes = pd.Index([None])
+    class_count = len(classes)
+    missing = (label_codes < 0) | (prediction_codes < 0)
+    codes = np.where(missing, class_count * class_count, label_codes * class_count + prediction_codes)
+    counts = np.bincount(codes, minlength=class_count * class_count + 1)
+    stratum_labels = np.repeat(np.asarray(classes, dtype=object), class_count).tolist() + [None]
+    stratum_predictions = np.tile(np.asarray(classes, dtype=object), class_count).tolist() + [None]
+    table = pd.DataFrame({
+        "label": stratum_labels,
+        "prediction": stratum_predictions if prediction_column else [None] * len(counts),
+        "rows": counts,
+    })
+    table["disagreement"] = (table["label"] != table["prediction"]) & table["label"].notna() & table["prediction"].notna()
+    return codes, table
+
+
+def _allocate(counts, budget):
+    """
+    Splits budget over strata in proportion to their counts, at least one row for every non-empty stratum.
+    The quotas add up to budget unless there are more non-empty strata than that.
+    """
+    total = counts.sum()
+    if total <= budget:
+        return counts.copy()
+    exact = counts * (budget / total)
+    quota = np.minimum(np.maximum(np.floor(exact).astype(np.int64), counts > 0), counts)
+    # Rows lost to rounding go to the strata with the largest remainders
+    shortfall = budget - int(quota.sum())
+    if shortfall > 0:
+        candidates = np.flatnonzero(quota < counts)
+        candidates = candidates[np.argsort(quota[candidates] - exact[candidates], kind="stable")][:shortfall]
+        quota[candidates] += 1
+    # Rows given to small strata by the one-row minimum are taken from the most over-allocated ones
+    excess = int(quota.sum()) - budget
+    while excess > 0:
+        candidates = np.flatnonzero(quota > 1)
+        if not len(candidates):
+            break
+        candidates = candidates[np.argsort(exact[candidates] - quota[candidates], kind="stable")][:excess]
+        quota[candidates] -= 1
+        excess -= len(candidates)
+    return quota
+
+
+def stratified_sample(df, label_column: str, prediction_column: str, rows: int = SAMPLE_ROWS,
+                      seed: int = SAMPLE_SEED, disagreement_share: float = DISAGREEMENT_SHARE):
+    """
+    Draws a deterministic sample of df stratified by (label, prediction).
+
+    disagreement_share of the rows come from the strata where label and
+    prediction differ, the rest from the others, each part spread over its
+    strata in proportion to their size (at least one row per stratum). Rows
+    are picked by a seeded random key per row, all in vectorized numpy, so
+    the same file, seed and size always give the same rows.
+
+    Returns (positions of the sampled rows in df, in file order, and a table
+    of every stratum with its row count, sampled rows and disagreement flag).
+    """
+    codes, table = _strata(df, label_column, prediction_column)
+    counts = table["rows"].to_numpy()
+    disagreement = table["disagreement"].to_numpy()
+    rows = min(rows, len(df))
+    disagreement_budget = min(int(rows * disagreement_share), int(counts[disagreement].sum()))
+    quota = (_allocate(np.where(disagreement, counts, 0), disagreement_budget)
+             + _allocate(np.where(disagreement, 0, counts), rows - disagreement_budget))
+
+    keys = np.random.default_rng(seed).random(len(df))
+    order = np.lexsort((keys, codes))
+    sorted_codes = codes[order]
+    # Rank of each row within its stratum by its random key
+    stratum_starts = np.searchsorted(sorted_codes, np.arange(len(counts)))
+    rank = np.arange(len(df)) - stratum_starts[sorted_codes]
+    positions = np.sort(order[rank < quota[sorted_codes]])
+    table["sampled"] = quota
+    return positions, table[table["rows"] > 0].reset_index(drop=True)
+
+
+# Samples of the cached result frames, least recently used first, and label counts per frame;
+# both are dropped when their frame is garbage collected
+_samples = OrderedDict()
+_samples_lock = threading.Lock()
+_label_counts = {}
+
+
+def _drop_sample(key):
+    with _samples_lock:
+        _samples.pop(key, None)
+
+
+def cached_stratified_sample(df, label_column: str, prediction_column: str, selected_labels=None, **options):
+    """
+    Returns stratified_sample() of the rows of df whose label is in selected_labels
+    (all rows if None), with positions into df; the SAMPLE_CACHE_ENTRIES most
+    recently used frames, filters and options are kept.
+    """
+    labels_key = None if selected_labels is None else tuple(sorted(map(str, selected_labels)))
+    key = (id(df), label_column, prediction_column, labels_key, tuple(sorted(options.items())))
+    with _samples_lock:
+        if key in _samples:
+            _samples.move_to_end(key)
+            return _samples[key]
+    if selected_labels is None:
+        subset_positions = None
+        subset = df
+    else:
+        subset_positions = np.flatnonzero(df[label_column].isin(selected_labels).to_numpy())
+        subset = df.iloc[subset_positions]
+    positions, table = stratified_sample(subset, label_column, prediction_column, **options)
+    if subset_positions is not None:
+        positions = subset_positions[positions]
+    with _samples_lock:
+        if key not in _samples:
+            weakref.finalize(df, _drop_sample, key)
+        _samples[key] = (positions, table)
+        _samples.move_to_end(key)
+        while len(_samples) > SAMPLE_CACHE_ENTRIES:
+            _samples.popitem(last=False)
+    return positions, table
+
+
+def label_counts(df, label_column: str):
+    """Returns {label value: row count} over the whole frame, computed once per frame object."""
+    key = (id(df), label_column)
+    if key not in _label_counts:
+        _label_counts[key] = df[label_column].value_counts(sort=False).to_dict()
+        weakref.finalize(df, _label_counts.pop, key, None)
+    return _label_counts[key]
@@ -0,0 +1,90 @@
+import streamlit as st
+import pandas as pd
+import hashlib
+import io
+import os
+
+# Folder holding model result CSVs (text,label,prediction)
+RESULTS_DIR = "results"
+# Rows parsed per chunk when streaming a results CSV
+CSV_CHUNK_ROWS = 100_000
+# Columns stored as categoricals: few distinct values repeated on every row
+CATEGORICAL_COLUMNS = ("label", "Label", "prediction", "Prediction")
+# Parsed result files kept in memory across reruns and sessions
+RESULTS_CACHE_ENTRIES = 4
+# Seconds a parsed file stays cached; entries are keyed by mtime and size, so edits show up at once
+RESULTS_CACHE_TTL_SECONDS = 3600
+
+
+def _compact_chunk(chunk):
+    """Shrinks one parsed chunk: label columns become categoricals, integers are downcast."""
+    for column in chunk.columns:
+        if column in CATEGORICAL_COLUMNS:
+            values = chunk[column]
+            if pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+                # Integer labels parse as float in chunks with missing values; keep them integers
+                values = values.astype("Int64").astype("category")
+                values = values.cat.rename_categories(values.cat.categories.astype("int64"))
+            chunk[column] = values.astype("category")
+        elif pd.api.types.is_integer_dtype(chunk[column]):
+            chunk[column] = pd.to_numeric(chunk[column], downcast="integer")
+    return chunk
+
+
+def read_results_csv(source, chunk_rows: int = CSV_CHUNK_ROWS):
+    """
+    Streams a results CSV in chunks of chunk_rows and returns one compact DataFrame.
+
+    Each chunk is compacted as soon as it is parsed, so peak memory stays
+    close to the final frame plus one raw chunk. Categorical columns get the
+    union of the categories seen in all chunks so they survive concatenation.
+    """
+    chunks = [_compact_chunk(chunk) for chunk in pd.read_csv(source, chunksize=chunk_rows)]
+    if len(chunks) == 1:
+        return chunks[0]
+
+    for column in chunks[0].columns:
+        if isinstance(chunks[0][column].dtype, pd.CategoricalDtype):
+            category_dtypes = {chunk[column].cat.categories.dtype for chunk in chunks}
+            if len(category_dtypes) > 1 and all(pd.api.types.is_numeric_dtype(dtype) for dtype in category_dtypes):
+                # Integer labels in some chunks and fractional ones in others: one float category dtype
+                for chunk in chunks:
+                    chunk[column] = chunk[column].cat.rename_categories(chunk[column].cat.categories.astype("float64"))
+            try:
+                # Sorted, so every file and both label columns get the same category order
+                categories = pd.api.types.union_categoricals(
+                    [chunk[column] for chunk in chunks], sort_categories=True
+                ).categories
+            except TypeError:
+                # Mixed value types across chunks (e.g. numbers and text): keep the column as plain objects
+                for chunk in chunks:
+                    chunk[column] = chunk[column].astype(object)
+                continue
+            for chunk in chunks:
+                chunk[column] = chunk[column].cat.set_categories(categories)
+    df = pd.concat(chunks, ignore_index=True)
+    del chunks
+    return df
+
+
+# cache_resource hands every rerun the same frame instead of a copy; callers must not mutate it
+@st.cache_resource(max_entries=RESULTS_CACHE_ENTRIES, ttl=RESULTS_CACHE_TTL_SECONDS, show_spinner="Loading CSV file...")
+def _load_results_cached(cache_key, _source):
+    return read_results_csv(_source)
+
+
+def load_results_file(path: str):
+    """
+    Loads a results CSV from disk, cached by path, mtime and size.
+    """
+    stat = os.stat(path)
+    return _load_results_cached(("file", os.path.abspath(path), stat.st_mtime_ns, stat.st_size), path)
+
+
+def load_uploaded_results(uploaded_file):
+    """
+    Loads an uploaded results CSV, cached by the hash of its content.
+    """
+    data = uploaded_file.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+    return _load_results_cached(("upload", digest), io.BytesIO(data))
@@ -0,0 +1,215 @@
+import argparse
+import datetime
+import json
+import logging
+import os
+import threading
+
+from alert_store import ALERTS_LOG_FILE, SQLiteAlertStore, get_alert_log_writer, get_alert_store
+from alert_writer import alert_log_lock, list_alert_log_segments, manifest_path
+from metric_series import get_metric_series_store
+from report_index import get_report_index
+
+# Retention policy per report type; types without an entry use "default".
+#   keep_last:        the newest N reports are always kept
+#   daily_after_days: reports older than this are thinned to the newest one per day
+#   max_age_days:     reports older than this are deleted (None: never)
+#   keep_flagged:     reports showing drift or failed tests are never deleted
+RETENTION_POLICIES = {
+    "default": {"keep_last": 30, "daily_after_days": 14, "max_age_days": None, "keep_flagged": True},
+}
+# Rotated alert log segments older than this are folded into the alert store's rollups and deleted
+ALERT_SEGMENT_RETENTION_DAYS = 30
+# Raw alerts older than this are dropped from the alert store; its rollups are kept
+ALERT_RETENTION_DAYS = 90
+# Interval of the in-process retention run; 0 disables it
+RETENTION_INTERVAL_HOURS = 0
+
+
+def _is_flagged(report, drift_alert_days):
+    """A report is flagged if it shows drift or failed tests, or a drift alert was logged that day."""
+    metrics = report["metrics"]
+    if metrics.get("Dataset Drift", 0) > 0 or metrics.get("FAIL", 0) > 0:
+        return True
+    return report["timestamp"] is not None and report["timestamp"].date().isoformat() in drift_alert_days
+
+
+def plan_report_retention(reports, policy, drift_alert_days=frozenset(), now=None):
+    """
+    Returns the reports (newest first, as returned by ReportIndex.query) that
+    the policy would delete. Reports without a parsed timestamp are kept.
+    """
+    now = now or datetime.datetime.now()
+    daily_after = datetime.timedelta(days=policy.get("daily_after_days") or 0)
+    max_age = datetime.timedelta(days=policy["max_age_days"]) if policy.get("max_age_days") else None
+    kept_days, doomed = set(), []
+    for position, report in enumerate(reports):
+        timestamp = report["timestamp"]
+        if timestamp is None:
+            continue
+        if position < policy.get("keep_last", 0) or (
+                policy.get("keep_flagged", True) and _is_flagged(report, drift_alert_days)):
+            # A report kept for either reason is the one report of its day when thinning
+            kept_days.add(timestamp.date())
+            continue
+        age = now - timestamp
+        if max_age is not None and age > max_age:
+            doomed.append(report)
+        elif policy.get("daily_after_days") is not None and age > daily_after:
+            day = timestamp.date()
+            if day in kept_days:
+                doomed.append(report)
+            else:
+                kept_days.add(day)
+    return doomed
+
+
+def _drift_alert_days(alert_store):
+    drift_types = [alert_type for alert_type in alert_store.alert_types() if "Drift" in alert_type]
+    if not drift_types:
+        return set()
+    return {day for day, _, count in alert_store.rollup_counts("day", drift_types) if count > 0}
+
+
+def prune_reports(policies=None, dry_run: bool = False, now=None):
+    """
+    Applies the retention policies to every report type.
+    Returns (reports deleted, bytes reclaimed).
+    """
+    policies = policies or RETENTION_POLICIES
+    report_index = get_report_index()
+    report_index.refresh()
+    alert_store = get_alert_store()
+    alert_store.sync()
+    drift_days = _drift_alert_days(alert_store)
+
+    deleted, reclaimed = 0, 0
+    for report_type in report_index.report_types():
+        policy = policies.get(report_type, policies["default"])
+        for report in plan_report_retention(report_index.query(report_type), policy, drift_days, now):
+            logging.info(f"{'Would delete' if dry_run else 'Deleting'} report {report['path']} ({report['size']} bytes)")
+            if not dry_run:
+                try:
+                    os.remove(report["path"])
+                except FileNotFoundError:
+                    continue
+            deleted += 1
+            reclaimed += report["size"]
+    if deleted and not dry_run:
+        report_index.refresh()
+    return deleted, reclaimed
+
+
+def compact_alert_segments(path: str = ALERTS_LOG_FILE, max_age_days: int = ALERT_SEGMENT_RETENTION_DAYS,
+                           dry_run: bool = False, now=None):
+    """
+    Compacts rotated alert log segments older than max_age_days: their
+    per-day and per-hour counts are folded into the alert store's rollups
+    (the SQLite rollup tables, or the rollups file of the jsonl store), then
+    the segments are deleted and dropped from the manifest.
+
+    With the SQLite store, the live log is rotated once it has been imported,
+    so it becomes a segment that a later run deletes instead of growing for ever.
+    Returns (segments compacted, bytes reclaimed).
+    """
+    now = now or datetime.datetime.now()
+    cutoff = now - datetime.timedelta(days=max_age_days)
+    store = get_alert_store()
+    if not dry_run:
+        # Make sure the alert store has imported everything before segments disappear
+        store.sync()
+        if isinstance(store, SQLiteAlertStore):
+            get_alert_log_writer(path).rotate()
+            # Lines appended between the import and the rotation are in the new segment
+            store.sync()
+
+    with alert_log_lock(path):
+        segments = list_alert_log_segments(path)
+        old = [segment for segment in segments if datetime.datetime.fromisoformat(segment["rotated_at"]) < cutoff]
+        folder = os.path.dirname(path)
+        reclaimed = sum(segment.get("size", 0) for segment in old)
+        if dry_run or not old:
+            return len(old), reclaimed
+
+        store.absorb_segments([os.path.join(folder, segment["file"]) for segment in old
+                               if os.path.exists(os.path.join(folder, segment["file"]))])
+        remaining = [segment for segment in segments if segment not in old]
+        tmp_path = manifest_path(path) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"log": os.path.basename(path), "segments": remaining}, f, indent=2)
+        os.replace(tmp_path, manifest_path(path))
+        for segment in old:
+            try:
+                os.remove(os.path.join(folder, segment["file"]))
+            except FileNotFoundError:
+                pass
+    logging.info(f"Compacted {len(old)} alert log segments of {path} into rollups")
+    return len(old), reclaimed
+
+
+def run_retention(dry_run: bool = False, now=None):
+    """
+    Runs the whole retention job and returns a summary dict.
+    """
+    now = now or datetime.datetime.now()
+    reports_deleted, report_bytes = prune_reports(dry_run=dry_run, now=now)
+    segments, segment_bytes = compact_alert_segments(dry_run=dry_run, now=now)
+    alerts = get_alert_store().compact((now - datetime.timedelta(days=ALERT_RETENTION_DAYS)).date(), dry_run=dry_run)
+    series_rows = get_metric_series_store().compact(now=now, dry_run=dry_run)
+    return {
+        "dry_run": dry_run,
+        "reports_deleted": reports_deleted,
+        "report_bytes": report_bytes,
+        "alert_segments_compacted": segments,
+        "alert_segment_bytes": segment_bytes,
+        "alerts_compacted": alerts,
+        "metric_series_rows_compacted": series_rows,
+        "bytes_reclaimed": report_bytes + segment_bytes,
+    }
+
+
+_schedule_thread = None
+_schedule_lock = threading.Lock()
+
+
+def schedule_retention(interval_hours: float = RETENTION_INTERVAL_HOURS):
+    """
+    Runs the retention job every interval_hours in a daemon thread of this
+    process. Does nothing if interval_hours is 0 or a schedule already runs.
+    """
+    global _schedule_thread
+    if not interval_hours:
+        return None
+    with _schedule_lock:
+        if _schedule_thread is not None:
+            return _schedule_thread
+
+        def loop():
+            stop = threading.Event()
+            while not stop.wait(interval_hours * 3600):
+                try:
+                    logging.info(f"Scheduled retention run: {run_retention()}")
+                except Exception:
+                    logging.exception("Scheduled retention run failed")
+
+        _schedule_thread = threading.Thread(target=loop, name="retention", daemon=True)
+        _schedule_thread.start()
+        return _schedule_thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune old reports and compact old alerts.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
+    args = parser.parse_args()
+    summary = run_retention(dry_run=args.dry_run)
+    verb = "Would reclaim" if args.dry_run else "Reclaimed"
+    logging.info(
+        f"{verb} {summary['bytes_reclaimed'] / 1_048_576:.1f} MB: {summary['reports_deleted']} reports, "
+        f"{summary['alert_segments_compacted']} alert log segments; {summary['alerts_compacted']} alerts compacted into rollups"
+    )
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -1,25 +1,24 @@
 import streamlit as st
 import os
 
-st.title("📊 Dashboard Tổng hợp")
+from report_store import REPORTS_DIR, REPORTS_PAGE_SIZE, list_report_types, list_reports, read_report
 
-base_dir = "reports"
-dashboard_types = sorted([name for name in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, name))])
+st.title("📊 Dashboard Tổng hợp")
 
-dashboard_tabs = st.tabs(dashboard_types)
+base_dir = REPORTS_DIR
+dashboard_types = list_report_types(base_dir)
 
-for dash_tab, dash_type in zip(dashboard_tabs, dashboard_types):
-    with dash_tab:
-        report_path = os.path.join(base_dir, dash_type)
-        report_files = sorted([f for f in os.listdir(report_path) if f.endswith(".html")], reverse=True)
-        sub_tab_names = [os.path.splitext(f)[0] for f in report_files]
+# Chỉ đọc báo cáo đang được chọn thay vì tất cả các file HTML
+dash_type = st.radio("Loại báo cáo:", dashboard_types, horizontal=True)
+report_files = list_reports(os.path.join(base_dir, dash_type))
 
-        if not report_files:
-            st.warning("Không có báo cáo nào.")
-        else:
-            sub_tabs = st.tabs(sub_tab_names)
-            for sub_tab, report_file in zip(sub_tabs, report_files):
-                with sub_tab:
-                    with open(os.path.join(report_path, report_file), "r", encoding="utf-8") as f:
-                        html_content = f.read()
-                    st.components.v1.html(html_content, height=1000, scrolling=True)
+if not report_files:
+    st.warning("Không có báo cáo nào.")
+else:
+    page_count = (len(report_files) - 1) // REPORTS_PAGE_SIZE + 1
+    page = st.number_input(f"Trang (/{page_count})", min_value=1, max_value=page_count, value=1, step=1)
+    page_reports = report_files[(page - 1) * REPORTS_PAGE_SIZE:page * REPORTS_PAGE_SIZE]
+    reports_by_name = {report["name"]: report for report in page_reports}
+    selected_name = st.selectbox("Chọn báo cáo:", options=list(reports_by_name))
+    html_content = read_report(reports_by_name[selected_name]["path"])
+    st.components.v1.html(html_content, height=1000, scrolling=True)
@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import os
 
+from report_store import REPORTS_DIR, REPORTS_PAGE_SIZE, list_report_types, list_reports, read_report
+
 # ---------- LOGIN ----------
 def login():
     st.title("🔐 Login")
@@ -18,31 +20,47 @@ def login():
 # ---------- DASHBOARD ----------
 def show_dashboard():
     st.title("📊 Model Monitoring Reports")
-    base_dir = "reports"
+    base_dir = REPORTS_DIR
     if not os.path.exists(base_dir):
         st.warning("Folder 'reports' does not exist. Please upload reports first.")
         return
 
-    dashboard_types = sorted([name for name in os.listdir(base_dir) if os.path.isdir(os.path.join(base_dir, name))])
+    dashboard_types = list_report_types(base_dir)
     if not dashboard_types:
         st.warning("No report types found in the 'reports' folder.")
         return
 
-    dashboard_tabs = st.tabs(dashboard_types)
-    for dash_tab, dash_type in zip(dashboard_tabs, dashboard_types):
-        with dash_tab:
-            report_path = os.path.join(base_dir, dash_type)
-            report_files = sorted([f for f in os.listdir(report_path) if f.endswith(".html")], reverse=True)
-            sub_tab_names = [os.path.splitext(f)[0] for f in report_files]
-            if not report_files:
-                st.warning("No reports found in this category.")
-            else:
-                sub_tabs = st.tabs(sub_tab_names)
-                for sub_tab, report_file in zip(sub_tabs, report_files):
-                    with sub_tab:
-                        with open(os.path.join(report_path, report_file), "r", encoding="utf-8") as f:
-                            html_content = f.read()
-                        st.components.v1.html(html_content, height=1000, scrolling=True)
+    # Only the selected type and report are loaded, so reruns do not read every HTML file
+    dash_type = st.radio("Report type:", dashboard_types, horizontal=True)
+    report_files = list_reports(os.path.join(base_dir, dash_type))
+    if not report_files:
+        st.warning("No reports found in this category.")
+        return
+
+    page_count = (len(report_files) - 1) // REPORTS_PAGE_SIZE + 1
+    col_report, col_page = st.columns([0.8, 0.2])
+    with col_page:
+        page = st.number_input(
+            f"Page (of {page_count})",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            step=1,
+            key=f"report_page_{dash_type}"
+        )
+    page_reports = report_files[(page - 1) * REPORTS_PAGE_SIZE:page * REPORTS_PAGE_SIZE]
+    reports_by_name = {report["name"]: report for report in page_reports}
+    with col_report:
+        selected_name = st.selectbox(
+            "Select a report:",
+            options=list(reports_by_name),
+            key=f"report_select_{dash_type}"
+        )
+
+    selected_report = reports_by_name[selected_name]
+    st.caption(f"{len(report_files)} reports in '{dash_type}' · {selected_report['size'] / 1_048_576:.1f} MB")
+    html_content = read_report(selected_report["path"])
+    st.components.v1.html(html_content, height=1000, scrolling=True)
 
 # ---------- LOAD & EDIT CSV ----------
 def csv_editor():
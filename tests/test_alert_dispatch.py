@@ -0,0 +1,93 @@
+import threading
+
+from alert_dispatch import AlertDispatcher
+from alert_store import JsonlAlertStore
+
+
+class StubSender:
+    """Records every batch it receives; fails the first `failures` calls."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, alerts):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("stub failure")
+            self.batches.append(list(alerts))
+
+
+def _event(alert_type="Data Drift", name="psi"):
+    return {"timestamp": "2025-06-01T10:00:00", "alert_type": alert_type, "details": {"name": name}}
+
+
+def _dispatcher(senders, statuses, **options):
+    options.setdefault("coalesce_seconds", 0.2)
+    return AlertDispatcher(
+        senders,
+        on_status=lambda event_ids, status: statuses.append((sorted(event_ids), status)),
+        sleep=lambda seconds: None,
+        **options
+    )
+
+
+def test_alerts_submitted_together_are_sent_as_one_batch():
+    email, pipeline, statuses = StubSender(), StubSender(), []
+    dispatcher = _dispatcher([email, pipeline], statuses)
+    for event_id, name in enumerate(["accuracy", "f1", "precision", "recall"]):
+        dispatcher.submit(event_id, _event(name=name))
+
+    assert dispatcher.drain(timeout=5)
+    assert [len(batch) for batch in email.batches] == [4]
+    assert pipeline.batches == email.batches
+    assert statuses == [([0, 1, 2, 3], "Sent")]
+
+
+def test_failed_sender_is_retried():
+    flaky, statuses = StubSender(failures=2), []
+    dispatcher = _dispatcher([flaky], statuses, max_attempts=3)
+    dispatcher.submit(1, _event())
+
+    assert dispatcher.drain(timeout=5)
+    assert len(flaky.batches) == 1
+    assert statuses == [([1], "Sent")]
+
+
+def test_batch_fails_after_max_attempts():
+    broken, healthy, statuses = StubSender(failures=10), StubSender(), []
+    dispatcher = _dispatcher([broken, healthy], statuses, max_attempts=2)
+    dispatcher.submit(1, _event())
+
+    assert dispatcher.drain(timeout=5)
+    assert broken.batches == []
+    assert len(healthy.batches) == 1
+    assert statuses == [([1], "Failed")]
+
+
+def test_drain_times_out_on_a_blocked_sender():
+    release = threading.Event()
+    statuses = []
+    dispatcher = _dispatcher([lambda alerts: release.wait(5)], statuses, coalesce_seconds=0)
+    dispatcher.submit(1, _event())
+
+    assert not dispatcher.drain(timeout=0.1)
+    release.set()
+    assert dispatcher.drain(timeout=5)
+    assert statuses == [([1], "Sent")]
+
+
+def test_statuses_are_recorded_in_the_jsonl_store(tmp_path):
+    store = JsonlAlertStore(str(tmp_path / "alerts.log"))
+    event = dict(_event(), status="Pending")
+    event_id = store.append(event)
+    dispatcher = AlertDispatcher([StubSender()], on_status=store.update_status, sleep=lambda seconds: None,
+                                 coalesce_seconds=0)
+    dispatcher.submit(event_id, event)
+
+    assert dispatcher.drain(timeout=5)
+    store.sync()
+    [alert] = store.query()
+    assert (alert["id"], alert["status"]) == (event_id, "Sent")
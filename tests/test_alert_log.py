@@ -0,0 +1,114 @@
+import json
+import os
+import subprocess
+import sys
+
+from alert_store import AlertLogReader, JsonlAlertStore, SQLiteAlertStore, alert_fingerprint
+from alert_writer import AlertLogWriter, list_alert_log_segments
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Appends events through its own writer; small commits and segments so both processes interleave and rotate
+WRITER_SCRIPT = """
+import sys
+from alert_writer import AlertLogWriter
+path, name, count = sys.argv[1], sys.argv[2], int(sys.argv[3])
+writer = AlertLogWriter(path, flush_events=10, flush_seconds=0.05, fsync="never", rotate_bytes=8192)
+for i in range(count):
+    writer.write({"id": f"{name}-{i}", "timestamp": f"2025-06-01T10:{i // 60:02d}:{i % 60:02d}",
+                  "alert_type": "Data Drift", "details": {"writer": name, "seq": i}})
+writer.flush()
+"""
+
+
+def _log_lines(path):
+    files = [os.path.join(os.path.dirname(path), segment["file"]) for segment in list_alert_log_segments(path)]
+    lines = []
+    for file_path in files + [path]:
+        with open(file_path, "r", encoding="utf-8") as f:
+            lines.extend(f.read().splitlines())
+    return lines
+
+
+def test_concurrent_appends_from_two_processes(tmp_path):
+    log_path = str(tmp_path / "alerts.log")
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    writers = [
+        subprocess.Popen([sys.executable, "-c", WRITER_SCRIPT, log_path, name, "300"], env=env)
+        for name in ("a", "b")
+    ]
+    assert [writer.wait(timeout=60) for writer in writers] == [0, 0]
+
+    # Every line is whole: commits of the two processes never interleave
+    events = [json.loads(line) for line in _log_lines(log_path)]
+    assert sorted(event["id"] for event in events) == sorted(f"{name}-{i}" for name in "ab" for i in range(300))
+
+    segments = list_alert_log_segments(log_path)
+    assert segments
+    assert all(os.path.exists(tmp_path / segment["file"]) for segment in segments)
+
+    reader = AlertLogReader(log_path)
+    assert reader.refresh() == 600
+    store = SQLiteAlertStore(str(tmp_path / "alerts.db"), log_path)
+    assert store.import_jsonl(log_path) == 600
+    assert store.import_jsonl(log_path) == 0
+
+
+def test_rotation_is_followed_through_the_manifest(tmp_path):
+    log_path = str(tmp_path / "alerts.log")
+    writer = AlertLogWriter(log_path, flush_events=100, fsync="never")
+    reader = AlertLogReader(log_path)
+    for i in range(3):
+        writer.write({"id": f"old-{i}", "timestamp": f"2025-06-01T10:00:0{i}", "alert_type": "A", "details": {}})
+    writer.flush()
+    assert reader.refresh() == 3
+
+    # Appended by another writer just before the rotation, not read yet
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "late", "timestamp": "2025-06-01T10:00:05", "alert_type": "A", "details": {}}) + "\n")
+    segment = writer.rotate()
+    assert segment is not None and not os.path.exists(log_path)
+    manifest = list_alert_log_segments(log_path)
+    assert [entry["file"] for entry in manifest] == [os.path.basename(segment)]
+    assert manifest[0]["size"] == os.path.getsize(segment)
+    assert manifest[0]["inode"] == os.stat(segment).st_ino
+
+    writer.write({"id": "new", "timestamp": "2025-06-01T10:00:09", "alert_type": "B", "details": {}})
+    writer.flush()
+    assert reader.refresh() == 2
+    assert [event["id"] for event in reader.events()] == ["new", "late", "old-2", "old-1", "old-0"]
+    assert AlertLogReader(log_path).refresh() == 5
+
+
+def test_sqlite_store_applies_duplicate_and_status_records(tmp_path):
+    log_path = str(tmp_path / "alerts.log")
+    store = SQLiteAlertStore(str(tmp_path / "alerts.db"), log_path)
+    event_id = store.append({"timestamp": "2025-06-01T10:00:00", "alert_type": "Data Drift",
+                             "status": "Pending", "details": {"name": "psi"}})
+    store.record_duplicate(event_id, "2025-06-01T10:05:00")
+    store.update_status([event_id], "Sent")
+    store.sync()
+
+    [alert] = store.query()
+    assert (alert["status"], alert["hit_count"], alert["last_seen"]) == ("Sent", 2, "2025-06-01T10:05:00")
+    fingerprint = alert_fingerprint("Data Drift", {"name": "psi"})
+    assert store.find_recent(fingerprint, "2025-06-01T00:00:00") == (event_id, "2025-06-01T10:00:00")
+
+
+def test_jsonl_pages_do_not_drop_alerts_sharing_a_timestamp(tmp_path):
+    store = JsonlAlertStore(str(tmp_path / "alerts.log"))
+    for i in range(7):
+        store.append({"timestamp": f"2025-06-01T10:00:0{i // 3}", "alert_type": "A", "details": {"seq": i}})
+    store.sync()
+
+    pages, before = [], None
+    while True:
+        page = store.query(limit=2, before=before)
+        if not page:
+            break
+        pages.append(page)
+        before = (page[-1]["timestamp"], page[-1]["id"])
+    seen = [alert["details"]["seq"] for page in pages for alert in page]
+    assert sorted(seen) == list(range(7))
+    assert [alert["timestamp"] for page in pages for alert in page] == sorted(
+        (alert["timestamp"] for alert in store.query()), reverse=True)
@@ -0,0 +1,82 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from drift_monitor import (
+    DriftProfile, StreamingDriftDetector, feed_request_log, jensen_shannon_divergence, population_stability_index,
+)
+from request_log import RequestLogTailer
+
+
+def _rows(count, seed=0, words=8, prediction="positive"):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "text": [" ".join(["word"] * int(n)) for n in rng.poisson(words, count) + 1],
+        "prediction": [prediction] * count,
+    })
+
+
+def _detector(reference, window_rows, alerts):
+    return StreamingDriftDetector(reference, window_rows=window_rows,
+                                  alert=lambda alert_type, details: alerts.append((alert_type, details)))
+
+
+def test_psi_of_known_distributions():
+    assert population_stability_index([50, 50], [50, 50]) == 0
+    expected = (0.25 - 0.5) * math.log(0.25 / 0.5) + (0.75 - 0.5) * math.log(0.75 / 0.5)
+    assert population_stability_index([50, 50], [25, 75]) == pytest.approx(expected)
+    # Count vectors are normalized, so only the shape matters
+    assert population_stability_index([5, 5], [250, 750]) == pytest.approx(expected)
+
+
+def test_js_divergence_of_known_distributions():
+    assert jensen_shannon_divergence([10, 30], [1, 3]) == pytest.approx(0)
+    assert jensen_shannon_divergence([1, 0], [0, 1]) == pytest.approx(1)
+    expected = (0.5 * math.log2(0.5 / 0.75) + 0.5 * math.log2(0.5 / 0.25) + math.log2(1 / 0.75)) / 2
+    assert jensen_shannon_divergence([50, 50], [100, 0]) == pytest.approx(expected)
+
+
+def test_sketch_size_stays_fixed_as_traffic_grows():
+    detector = _detector(DriftProfile.from_batch(_rows(2000)), 500, [])
+    sizes = {name: sketch.counts.shape for name, sketch in detector.window.sketches.items()}
+    closed = 0
+    for seed in range(1, 21):
+        batch = _rows(1000, seed=seed, words=8 + seed, prediction=f"class-{seed}")
+        closed += len(detector.update(batch))
+        assert {name: sketch.counts.shape for name, sketch in detector.window.sketches.items()} == sizes
+    assert closed == 40
+    assert detector.window.rows() == 0
+
+
+def test_windows_split_list_of_records_at_the_boundary():
+    alerts = []
+    detector = _detector(DriftProfile.from_batch(_rows(2000)), 300, alerts)
+    records = _rows(700, seed=1, words=40).to_dict("records")
+
+    closed = detector.update(records)
+    assert len(closed) == 2
+    assert detector.window.rows() == 100
+    drifted = {result["feature"] for result in closed[0] if result["drifted"]}
+    assert drifted == {"text_length", "word_count"}
+    assert {details["window_rows"] for alert_type, details in alerts} == {300}
+
+
+def test_request_log_feed_reads_only_new_records(tmp_path):
+    log_path = tmp_path / "requests.jsonl"
+    detector = _detector(DriftProfile.from_batch(_rows(2000)), 200, [])
+    tailer = RequestLogTailer(str(log_path))
+
+    def append(batch):
+        with open(log_path, "a", encoding="utf-8") as f:
+            for record in batch.to_dict("records"):
+                f.write(json.dumps({"timestamp": 1718000000, "latency_ms": 12.5, **record}) + "\n")
+
+    append(_rows(300, seed=1))
+    assert len(feed_request_log(detector, tailer)) == 1
+    assert feed_request_log(detector, tailer) == []
+    append(_rows(100, seed=2))
+    [results] = feed_request_log(detector, tailer)
+    assert {result["feature"] for result in results} == {"text_length", "word_count", "prediction"}
@@ -0,0 +1,79 @@
+import datetime
+
+import pytest
+
+from metric_series import SERIES_MAX_POINTS, MetricSeriesStore
+
+START = datetime.datetime(2025, 1, 1)
+
+
+def _tier_rows(store, tier):
+    with store._connect() as conn:
+        rows = conn.execute("""
+            SELECT bucket, count, total, min, max FROM series_buckets WHERE series = 'm' AND tier = ? ORDER BY bucket
+        """, (tier,)).fetchall()
+    return [{"bucket": bucket, "count": count, "mean": total / count, "min": low, "max": high}
+            for bucket, count, total, low, high in rows]
+
+
+def test_changed_value_rebuilds_its_buckets(tmp_path):
+    store = MetricSeriesStore(str(tmp_path / "series.db"))
+    assert store.add_points([("m", START.replace(hour=10), 1.0), ("m", START.replace(hour=10, minute=30), 3.0)]) == 2
+    # The same point fed again is not counted twice
+    assert store.add_points([("m", START.replace(hour=10), 1.0)]) == 0
+    assert store.add_points([("m", START.replace(hour=10), 5.0)]) == 1
+
+    for tier in ("hour", "day", "week"):
+        [bucket] = _tier_rows(store, tier)
+        assert (bucket["count"], bucket["mean"], bucket["min"], bucket["max"]) == (2, 4.0, 3.0, 5.0)
+
+
+def test_update_after_raw_points_were_pruned(tmp_path):
+    store = MetricSeriesStore(str(tmp_path / "series.db"))
+    wednesday, friday = START.replace(hour=10), START.replace(day=3, hour=10)
+    store.add_points([("m", wednesday, 1.0), ("m", friday, 3.0)])
+    # Raw points before Thursday are dropped, in the middle of the weekly bucket
+    assert store.compact(now=START.replace(day=2) + datetime.timedelta(days=30)) == 1
+
+    assert store.add_points([("m", friday, 5.0)]) == 1
+    assert [(bucket["count"], bucket["mean"]) for bucket in _tier_rows(store, "day")] == [(1, 1.0), (1, 5.0)]
+    # The replaced value is swapped out of the total of the partly compacted week
+    [week] = _tier_rows(store, "week")
+    assert (week["count"], week["mean"], week["min"], week["max"]) == (2, 3.0, 1.0, 5.0)
+
+    # A point whose raw value was compacted is not counted again
+    assert store.add_points([("m", wednesday, 2.0)]) == 0
+    assert [(bucket["count"], bucket["mean"]) for bucket in _tier_rows(store, "day")] == [(1, 1.0), (1, 5.0)]
+    assert _tier_rows(store, "week") == [week]
+
+
+def _half_hourly(store, count):
+    store.add_points([("m", START + datetime.timedelta(minutes=30 * i), float(i)) for i in range(count)])
+    return START + datetime.timedelta(minutes=30 * count)
+
+
+@pytest.mark.parametrize("count, resolution", [(SERIES_MAX_POINTS, "raw"), (SERIES_MAX_POINTS + 1, "hour")])
+def test_query_returns_raw_points_up_to_the_limit(tmp_path, count, resolution):
+    store = MetricSeriesStore(str(tmp_path / "series.db"))
+    end = _half_hourly(store, count)
+    tier, rows = store.query("m", START, end)
+    assert tier == resolution
+    assert sum(row["count"] for row in rows) == count
+    assert len(rows) <= SERIES_MAX_POINTS
+
+
+def test_query_picks_the_finest_tier_under_the_limit(tmp_path):
+    store = MetricSeriesStore(str(tmp_path / "series.db"))
+    _half_hourly(store, 48 * 30)
+    assert store.query("m", START, START + datetime.timedelta(hours=SERIES_MAX_POINTS))[0] == "hour"
+    assert store.query("m", START, START + datetime.timedelta(days=30))[0] == "day"
+    assert store.query("m", START, START + datetime.timedelta(days=SERIES_MAX_POINTS + 1))[0] == "week"
+
+
+def test_query_before_the_raw_retention_uses_buckets(tmp_path):
+    store = MetricSeriesStore(str(tmp_path / "series.db"))
+    _half_hourly(store, 10)
+    store.compact(now=START + datetime.timedelta(days=40))
+    tier, rows = store.query("m", START, START + datetime.timedelta(days=1))
+    assert tier == "hour"
+    assert [row["count"] for row in rows] == [2] * 5
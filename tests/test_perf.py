@@ -0,0 +1,22 @@
+import logging
+
+import perf
+
+
+def test_rerun_log_message_shows_its_spans(caplog):
+    perf.configure(enabled=True, profiler="")
+    try:
+        with caplog.at_level(logging.INFO, logger="perf"):
+            with perf.rerun("Alerts"):
+                with perf.span("alerts.query"):
+                    pass
+                with perf.span("alerts.render"):
+                    pass
+    finally:
+        perf.configure(enabled=False)
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages[0].startswith("span alerts.query ")
+    assert messages[-1].startswith("rerun Alerts ")
+    assert "(spans: alerts.query " in messages[-1] and ", alerts.render " in messages[-1]
+    assert caplog.records[-1].spans.keys() == {"alerts.query", "alerts.render"}
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from quality_metrics import ConfusionMatrix
+
+
+def _frame(matrix):
+    """Confusion matrix as a frame in a fixed class order, so matrices with other class orders compare equal."""
+    frame = matrix.to_frame()
+    order = sorted(frame.index, key=str)
+    return frame.loc[order, order]
+
+
+def test_updated_matches_a_rebuild_after_edits_additions_and_deletions():
+    labels = ["cat", "dog", "dog", "cat", "bird", None]
+    predictions = ["cat", "cat", "dog", "dog", "bird", "dog"]
+    base = ConfusionMatrix.from_arrays(labels, predictions)
+    before = base.matrix.copy()
+
+    # Row 1 edited to a correct prediction, row 4 deleted, row 5 given its label, and a row with a new class added
+    updated = base.updated(
+        removed_pairs=[(labels[1], predictions[1]), (labels[4], predictions[4]), (labels[5], predictions[5])],
+        added_pairs=[("dog", "dog"), ("dog", "dog"), ("fish", "cat")],
+    )
+    edited_labels = ["cat", "dog", "dog", "cat", "dog", "fish"]
+    edited_predictions = ["cat", "dog", "dog", "dog", "dog", "cat"]
+    rebuilt = ConfusionMatrix.from_arrays(edited_labels, edited_predictions)
+
+    assert "fish" in updated.classes
+    pd.testing.assert_frame_equal(_frame(updated).drop(index="bird", columns="bird"), _frame(rebuilt))
+    assert _frame(updated).loc["bird"].sum() == 0
+    assert updated.metrics()["accuracy"] == rebuilt.metrics()["accuracy"]
+    # The base matrix is shared by every rerun and must not change
+    assert np.array_equal(base.matrix, before)
+
+
+def test_updated_ignores_pairs_with_a_missing_value():
+    base = ConfusionMatrix.from_arrays(["a", "b"], ["a", "a"])
+    updated = base.updated(removed_pairs=[(None, "a")], added_pairs=[("b", np.nan), (pd.NA, "b")])
+    assert list(updated.classes) == list(base.classes)
+    assert np.array_equal(updated.matrix, base.matrix)
+    assert updated.metrics()["rows"] == 2
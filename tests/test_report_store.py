@@ -0,0 +1,19 @@
+import datetime
+import os
+
+from report_store import list_reports, save_report
+
+
+def test_reports_are_listed_newest_first_by_their_name_timestamp(tmp_path):
+    names = ["report_27_05_2025", "report_02_06_2025_04_47_30", "report_02_06_2025", "report_15_01_2026", "baseline"]
+    for name in names:
+        save_report("<html></html>", str(tmp_path), name, compress=name != "baseline")
+    # A name without a timestamp is placed by its mtime
+    mtime = datetime.datetime(2025, 6, 1, 12).timestamp()
+    os.utime(tmp_path / "baseline.html", (mtime, mtime))
+
+    reports = list_reports(str(tmp_path))
+    assert [report["name"] for report in reports] == [
+        "report_15_01_2026", "report_02_06_2025_04_47_30", "report_02_06_2025", "baseline", "report_27_05_2025",
+    ]
+    assert [report["compressed"] for report in reports] == [True, True, True, False, True]
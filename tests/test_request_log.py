@@ -0,0 +1,36 @@
+import json
+
+from request_log import RequestMonitor, RequestWindowAggregates
+
+NOW = 1_750_000_000
+
+
+def _record(offset=0, **fields):
+    return {"timestamp": NOW - offset, "text": "hello world", "prediction": "positive", **fields}
+
+
+def test_malformed_latencies_are_counted_without_latency():
+    aggregates = RequestWindowAggregates(history_seconds=60)
+    records = [_record(latency_ms=20), _record(latency_ms="slow"), _record(latency_ms=None),
+               _record(latency_ms=[1]), _record(latency_ms="35"), _record()]
+    assert aggregates.add_batch(records, now=NOW) == 6
+
+    window = aggregates.sliding(60, end=NOW)
+    assert window["requests"] == 6
+    assert aggregates.latency_counts.sum() == 2
+    assert window["latency_p50_ms"] is not None
+
+
+def test_snapshot_reads_the_polled_requests(tmp_path):
+    log_path = tmp_path / "requests.jsonl"
+    with open(log_path, "w", encoding="utf-8") as f:
+        for offset in range(120):
+            f.write(json.dumps(_record(offset, latency_ms=10)) + "\n")
+    monitor = RequestMonitor(str(log_path))
+    assert monitor.poll() == 120
+
+    snapshot = monitor.snapshot(60, end=NOW)
+    assert (snapshot["total_requests"], snapshot["latest_second"]) == (120, NOW)
+    assert snapshot["window"]["requests"] == 60
+    assert snapshot["window"]["class_mix"] == {"positive": 60}
+    assert sum(count for start, count in snapshot["per_minute"]) == 120
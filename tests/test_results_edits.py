@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from results_edits import ResultsEditLog, results_signature, write_results_file
+
+
+def _change_set(label=0, value="b"):
+    return {"edited": {label: {"label": value}}, "deleted": [], "added": []}
+
+
+@pytest.fixture
+def results(tmp_path):
+    df = pd.DataFrame({"text": ["x", "y"], "label": ["a", "a"]})
+    path = str(tmp_path / "results.csv")
+    write_results_file(df, path)
+    return df, path, str(tmp_path / "results.csv.edits.jsonl")
+
+
+def test_log_is_reloaded_against_the_same_file(results):
+    df, path, log_path = results
+    ResultsEditLog(log_path, results_signature(path)).append(_change_set())
+
+    edit_log = ResultsEditLog(log_path, results_signature(path))
+    assert not edit_log.stale
+    assert edit_log.merged(df)["label"].tolist() == ["b", "a"]
+
+
+def test_log_of_a_replaced_file_is_stale(results):
+    df, path, log_path = results
+    ResultsEditLog(log_path, results_signature(path)).append(_change_set())
+    signature = write_results_file(pd.concat([df, df]), path)
+
+    edit_log = ResultsEditLog(log_path, signature)
+    assert edit_log.stale
+    assert edit_log.merged(df) is df
+    with pytest.raises(RuntimeError):
+        edit_log.append(_change_set())
+    edit_log.discard(signature)
+    edit_log.append(_change_set(1, "c"))
+    assert ResultsEditLog(log_path, signature).merged(df)["label"].tolist() == ["a", "c"]
+
+
+def test_check_base_marks_a_shared_log_stale_once_the_file_is_replaced(results):
+    df, path, log_path = results
+    edit_log = ResultsEditLog(log_path, results_signature(path))
+    edit_log.append(_change_set())
+    edit_log.check_base(results_signature(path))
+    assert not edit_log.stale
+
+    edit_log.check_base(write_results_file(edit_log.merged(df).iloc[:1], path))
+    assert edit_log.stale
+
+
+def test_empty_log_moves_on_to_the_new_file(results):
+    df, path, log_path = results
+    edit_log = ResultsEditLog(log_path, results_signature(path))
+    signature = write_results_file(pd.concat([df, df]), path)
+    edit_log.check_base(signature)
+    assert not edit_log.stale
+    edit_log.append(_change_set())
+    assert not ResultsEditLog(log_path, signature).stale
+
+
+def test_unreadable_log_is_stale(results):
+    df, path, log_path = results
+    with open(log_path, "w", encoding="utf-8") as f:
+        f.write("{not json\n")
+    assert ResultsEditLog(log_path, results_signature(path)).stale
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from results_sampling import _allocate, stratified_sample
+
+
+def _results(agree=900, disagree=60, rare=1):
+    """Labels a/b predicted correctly, a few a rows predicted as b, and one rare class c."""
+    labels = ["a"] * (agree // 2) + ["b"] * (agree - agree // 2) + ["a"] * disagree + ["c"] * rare
+    predictions = labels[:agree] + ["b"] * disagree + ["c"] * rare
+    return pd.DataFrame({"text": [f"row {i}" for i in range(len(labels))], "label": labels, "prediction": predictions})
+
+
+def test_allocate_rounds_quotas_to_the_budget():
+    assert _allocate(np.array([50, 30, 20]), 10).tolist() == [5, 3, 2]
+    # Remainders of 1/3 each: the leftover row goes to the first stratum
+    assert _allocate(np.array([34, 33, 33]), 10).tolist() == [4, 3, 3]
+    assert _allocate(np.array([5, 0, 3]), 20).tolist() == [5, 0, 3]
+
+
+def test_allocate_gives_every_stratum_a_row_within_the_budget():
+    quota = _allocate(np.array([1, 1, 1, 97]), 10)
+    assert quota.tolist() == [1, 1, 1, 7]
+    quota = _allocate(np.array([0, 2, 1000, 3, 1]), 50)
+    assert quota.sum() == 50
+    assert quota[0] == 0 and (quota[1:] >= 1).all()
+
+
+def test_sample_has_every_stratum_and_the_disagreement_share():
+    df = _results()
+    positions, table = stratified_sample(df, "label", "prediction", rows=100, seed=1)
+    assert len(positions) == 100
+    assert (table["sampled"] >= 1).all()
+    assert table["sampled"].sum() == 100
+    sample = df.iloc[positions]
+    assert (sample["label"] != sample["prediction"]).sum() == 50
+    assert (sample["label"] == "c").sum() == 1
+    assert list(positions) == sorted(positions)
+
+
+def test_disagreement_share_is_capped_by_the_disagreement_rows():
+    df = _results(disagree=5)
+    positions, table = stratified_sample(df, "label", "prediction", rows=100, disagreement_share=0.5)
+    assert len(positions) == 100
+    sample = df.iloc[positions]
+    assert (sample["label"] != sample["prediction"]).sum() == 5
+
+
+def test_sample_is_deterministic_under_a_seed():
+    df = _results()
+    first, _ = stratified_sample(df, "label", "prediction", rows=100, seed=7)
+    again, _ = stratified_sample(df.copy(), "label", "prediction", rows=100, seed=7)
+    other, _ = stratified_sample(df, "label", "prediction", rows=100, seed=8)
+    assert first.tolist() == again.tolist()
+    assert first.tolist() != other.tolist()
@@ -0,0 +1 @@
+"""Dashboard pages, imported by app.py only when their menu entry is selected."""
@@ -0,0 +1,325 @@
+import streamlit as st
+import pandas as pd
+import datetime
+import json
+import plotly.express as px
+
+import perf
+from alert_monitor import get_alert_snapshot_worker
+from dashboard_cache import clear_alert_caches, load_alert_metadata, load_alert_rollups, query_alerts
+
+# Page sizes offered by the alerts log
+ALERT_LOG_PAGE_SIZES = [25, 50, 100, 200]
+# Interval of the live alert tiles; they read the shared snapshot, never the disk
+ALERT_LIVE_REFRESH_SECONDS = 5
+
+
+def _alert_stats(type_counts, daily_counts, hourly_counts, last_24h):
+    """Builds the statistics shown by the alerts dashboard from plain count mappings."""
+    type_counts_df = pd.DataFrame(
+        sorted(type_counts.items(), key=lambda item: (-item[1], item[0])),
+        columns=['Alert Type', 'Count']
+    )
+    daily_df = pd.DataFrame(sorted(daily_counts.items()), columns=['date', 'Count'])
+    daily_df['date'] = pd.to_datetime(daily_df['date'])
+    hourly_df = pd.DataFrame({'hour': range(24), 'Count': [hourly_counts.get(hour, 0) for hour in range(24)]})
+    return {
+        'total': int(sum(type_counts.values())),
+        'last_24h': int(last_24h),
+        'most_common': type_counts_df['Alert Type'].iloc[0] if len(type_counts_df) else "N/A",
+        'type_counts': type_counts_df,
+        'daily': daily_df,
+        'hourly': hourly_df,
+    }
+
+
+def _load_more_alerts(log_filters, page_size):
+    """Appends the next page of the alerts log after the last loaded row."""
+    log_rows = st.session_state.alert_log_rows
+    last_alert = log_rows[-1]
+    next_page = query_alerts(limit=page_size, before=(last_alert['timestamp'], last_alert.get('id')), **log_filters)
+    log_rows.extend(next_page)
+    st.session_state.alert_log_has_more = len(next_page) == page_size
+
+
+def alert_stats_from_rollups(alert_types, start_date, end_date):
+    """
+    Computes the dashboard statistics from the store's per-day and per-hour rollups.
+    The last-24-hours window is resolved to whole hours.
+    """
+    type_counts, daily_counts, hourly_counts = {}, {}, {}
+    for day, alert_type, count in load_alert_rollups("day", alert_types, start_date, end_date):
+        type_counts[alert_type] = type_counts.get(alert_type, 0) + count
+        daily_counts[day] = daily_counts.get(day, 0) + count
+
+    since = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y-%m-%dT%H")
+    last_24h = 0
+    for hour, _, count in load_alert_rollups("hour", alert_types, start_date, end_date, since=since):
+        hourly_counts[int(hour[11:13])] = hourly_counts.get(int(hour[11:13]), 0) + count
+        last_24h += count
+    return _alert_stats(type_counts, daily_counts, hourly_counts, last_24h)
+
+
+def alert_stats_from_events(filtered_df_alerts):
+    """
+    Computes the dashboard statistics from a frame of already filtered events.
+    """
+    if filtered_df_alerts.empty:
+        return _alert_stats({}, {}, {}, 0)
+    alerts_24h = filtered_df_alerts[filtered_df_alerts['timestamp_dt'] > (datetime.datetime.now() - datetime.timedelta(days=1))]
+    return _alert_stats(
+        filtered_df_alerts['alert_type'].value_counts().to_dict(),
+        filtered_df_alerts.groupby('date').size().to_dict(),
+        alerts_24h.groupby('hour').size().to_dict(),
+        len(alerts_24h)
+    )
+
+@st.fragment(run_every=ALERT_LIVE_REFRESH_SECONDS)
+def render_live_alerts():
+    """
+    Live KPI tiles and newest alerts from the process-wide alert snapshot.
+    The fragment reruns on its own every few seconds; the table is only
+    rebuilt when the snapshot version moved since this session last saw it.
+    """
+    version, snapshot = get_alert_snapshot_worker().current()
+    if snapshot is None or not snapshot['total']:
+        return
+
+    live_view = st.session_state.get('alert_live_view')
+    if live_view is None or live_view[0] != version:
+        if live_view is not None:
+            new_alerts = snapshot['total'] - live_view[1]
+            if new_alerts > 0:
+                st.toast(f"🚨 {new_alerts} new alert(s)")
+            # The filtered sections below are refreshed on the next full rerun
+            st.session_state.alerts_updated = True
+        newest_df = pd.DataFrame({
+            'Time': [alert['timestamp'] for alert in snapshot['newest']],
+            'Alert Type': [alert['alert_type'] for alert in snapshot['newest']],
+            'Status': [alert['status'] for alert in snapshot['newest']],
+            'Hits': [alert.get('hit_count') or 1 for alert in snapshot['newest']],
+        })
+        live_view = (version, snapshot['total'], newest_df)
+        st.session_state.alert_live_view = live_view
+
+    with st.container(border=True):
+        col_total, col_24h, col_newest, col_update = st.columns([0.2, 0.2, 0.4, 0.2])
+        col_total.metric("🔴 Live: Total Alerts", snapshot['total'])
+        col_24h.metric("Last 24 Hours", snapshot['last_24h'])
+        col_newest.metric("Newest Alert", snapshot['newest'][0]['alert_type'] if snapshot['newest'] else "N/A")
+        with col_update:
+            if st.button("Update dashboard", disabled=not st.session_state.alerts_updated):
+                st.rerun(scope="app")
+        with st.expander(f"Newest {len(snapshot['newest'])} alerts", expanded=False):
+            st.dataframe(live_view[2], hide_index=True, use_container_width=True)
+
+# Function to display the Alert Dashboard (Modified with Statistics and Filters)
+def show_alerts_dashboard():
+    st.title("🚨 Alerts Management")
+
+    if 'alerts_updated' not in st.session_state:
+        st.session_state.alerts_updated = False
+
+    col_btn_refresh, col_empty = st.columns([0.2, 0.8])
+    with col_btn_refresh:
+        if st.button("🔄 Refresh Dashboard"):
+            st.session_state.alerts_updated = True
+    # Alert reads are cached across sessions for ALERT_CACHE_TTL_SECONDS; a new alert or a refresh drops them
+    if st.session_state.alerts_updated:
+        clear_alert_caches()
+
+    render_live_alerts()
+
+    # Pick up alerts appended to alerts.log since the last load, then read only metadata
+    with perf.span("alerts.metadata"):
+        all_alert_types, (min_date_in_data, max_date_in_data) = load_alert_metadata()
+
+    if not all_alert_types or min_date_in_data is None:
+        st.info("No alerts have been logged yet.")
+        return # Exit if no alerts to prevent errors with DataFrame operations
+
+    st.markdown("---")
+    st.subheader("⚙️ Filter Alerts")
+
+    # --- Filtering Controls ---
+    col_filter1, col_filter2, col_filter3 = st.columns([0.3, 0.4, 0.3])
+    
+    with col_filter1:
+        # Filter by Alert Type
+        selected_alert_types = st.multiselect(
+            "Select Alert Type(s):", 
+            options=all_alert_types, 
+            default=all_alert_types
+        )
+
+    with col_filter2:
+        # Search by Keyword in Details
+        search_query = st.text_input("Search in Alert Details (keyword):").lower()
+
+    with col_filter3:
+        # Filter by Date Range
+        today = datetime.date.today()
+
+        # Adjust default start date to be within the data range
+        default_start_date = today - datetime.timedelta(days=7)
+        if default_start_date < min_date_in_data:
+            default_start_date = min_date_in_data
+        
+        # Ensure default end date is not beyond max_date_in_data
+        default_end_date = today
+        if default_end_date > max_date_in_data:
+            default_end_date = max_date_in_data
+
+        # Ensure that default_start_date does not exceed default_end_date
+        if default_start_date > default_end_date:
+            default_start_date = default_end_date # Fallback if start date is after end date
+
+        date_range = st.date_input(
+            "Select Date Range:",
+            # Ensure default value is within min_value and max_value
+            value=(default_start_date, default_end_date), 
+            min_value=min_date_in_data,
+            max_value=max_date_in_data
+        )
+        
+        # Ensure date_range has two dates selected
+        start_date = None
+        end_date = None
+        if len(date_range) == 2:
+            start_date = date_range[0]
+            end_date = date_range[1]
+        elif len(date_range) == 1: # If only one date is selected, assume it's the start date
+            start_date = date_range[0]
+            end_date = date_range[0] # End date is same as start date
+
+    # --- Apply Filters ---
+    # Filters are pushed down to the alert store so only matching rows are loaded
+    log_filters = {
+        'alert_types': selected_alert_types or None,
+        'start_date': start_date,
+        'end_date': end_date,
+        'keyword': search_query or None,
+    }
+    filtered_df_alerts = pd.DataFrame()
+    if search_query:
+        with perf.span("alerts.keyword_query"):
+            matching_alerts = query_alerts(**log_filters)
+        with perf.span("alerts.dataframe"):
+            filtered_df_alerts = pd.DataFrame(matching_alerts)
+            if not filtered_df_alerts.empty:
+                filtered_df_alerts['timestamp_dt'] = pd.to_datetime(filtered_df_alerts['timestamp'])
+                filtered_df_alerts['date'] = filtered_df_alerts['timestamp_dt'].dt.date
+                filtered_df_alerts['hour'] = filtered_df_alerts['timestamp_dt'].dt.hour
+
+    with perf.span("alerts.stats"):
+        if search_query:
+            # Rollups have no keyword dimension, so keyword searches are summarized from the matching events
+            alert_stats = alert_stats_from_events(filtered_df_alerts)
+        else:
+            alert_stats = alert_stats_from_rollups(selected_alert_types or None, start_date, end_date)
+
+    st.info(f"Showing {alert_stats['total']} alerts based on current filters.")
+
+    st.markdown("---")
+    st.subheader("📊 Alert Statistics (Filtered Data)")
+
+    if alert_stats['total']:
+        col_kpi1, col_kpi2, col_kpi3 = st.columns(3)
+        with col_kpi1:
+            st.metric("Total Alerts (Filtered)", alert_stats['total'])
+        with col_kpi2:
+            st.metric("Alerts in Last 24 Hours (Filtered)", alert_stats['last_24h'])
+        with col_kpi3:
+            st.metric("Most Frequent Alert Type (Filtered)", alert_stats['most_common'])
+
+        st.markdown("---")
+        st.subheader("📈 Alert Trends and Breakdown (Filtered Data)")
+
+        tab_type, tab_time = st.tabs(["Alert Type Breakdown", "Alerts Over Time"])
+
+        with tab_type:
+            alert_type_counts = alert_stats['type_counts']
+            st.dataframe(alert_type_counts, hide_index=True, use_container_width=True)
+
+            with perf.span("alerts.chart.types"):
+                fig_pie = px.pie(alert_type_counts, values='Count', names='Alert Type', title='Distribution of Alert Types (Filtered)')
+                st.plotly_chart(fig_pie, use_container_width=True)
+
+        with tab_time:
+            # Daily trends for filtered data
+            with perf.span("alerts.chart.daily"):
+                fig_line_daily = px.line(alert_stats['daily'], x='date', y='Count', title='Daily Alert Count Trend (Filtered)')
+                st.plotly_chart(fig_line_daily, use_container_width=True)
+
+            # Hourly trends for filtered data (for a recent period, e.g., last 24h of filtered data)
+            if alert_stats['last_24h']:
+                with perf.span("alerts.chart.hourly"):
+                    fig_bar_hourly = px.bar(alert_stats['hourly'], x='hour', y='Count', title='Hourly Alert Count (Last 24 Hours - Filtered)')
+                    st.plotly_chart(fig_bar_hourly, use_container_width=True)
+            else:
+                st.info("Not enough recent data (within filtered range) to display hourly trends.")
+    else:
+        st.warning("No alerts found matching the applied filters for statistics and trends.")
+
+    st.markdown("---")
+    st.subheader("📜 Recent Alerts Log (Filtered Data)")
+
+    col_view, col_page_size = st.columns([0.7, 0.3])
+    with col_view:
+        log_view = st.radio("View as:", ["Expanders", "Table"], horizontal=True)
+    with col_page_size:
+        page_size = st.selectbox("Alerts per page:", ALERT_LOG_PAGE_SIZES, index=1)
+
+    # Pages are fetched with a (timestamp, id) cursor and kept until the filters change
+    log_key = (tuple(selected_alert_types), start_date, end_date, search_query, page_size)
+    if st.session_state.get('alert_log_key') != log_key or st.session_state.alerts_updated:
+        with perf.span("alerts.log_page"):
+            first_page = query_alerts(limit=page_size, **log_filters)
+        st.session_state.alert_log_key = log_key
+        st.session_state.alert_log_rows = first_page
+        st.session_state.alert_log_has_more = len(first_page) == page_size
+        st.session_state.alerts_updated = False
+    log_rows = st.session_state.alert_log_rows
+
+    alert_container = st.container(height=600, border=True)
+    with alert_container:
+        if not log_rows:
+            st.info("No alerts found matching the applied filters.")
+        elif log_view == "Table":
+            st.dataframe(
+                pd.DataFrame({
+                    'Time': [alert['timestamp'] for alert in log_rows],
+                    'Alert Type': [alert['alert_type'] for alert in log_rows],
+                    'Status': [alert['status'] for alert in log_rows],
+                    'Hits': [alert.get('hit_count') or 1 for alert in log_rows],
+                    'Details': [json.dumps(alert['details'], ensure_ascii=False) for alert in log_rows],
+                }),
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            for alert in log_rows:
+                status_emoji = "🔴" 
+                date_obj = datetime.datetime.fromisoformat(alert['timestamp'])
+                formatted_timestamp = date_obj.strftime("%d/%m/%Y %H:%M:%S")
+
+                expander_title_html = (
+                    f"{status_emoji} **{alert['alert_type']}** "
+                    f"(Time: {formatted_timestamp})"
+                )
+                if (alert.get('hit_count') or 1) > 1:
+                    # Repeats suppressed at ingestion are shown on the original alert
+                    expander_title_html += f" ×{alert['hit_count']}, last seen {alert['last_seen']}"
+                with st.expander(expander_title_html, expanded=False):
+                    st.json(alert['details'])
+
+    col_shown, col_more = st.columns([0.8, 0.2])
+    with col_shown:
+        st.caption(f"Showing the newest {len(log_rows)} of {alert_stats['total']} matching alerts.")
+    with col_more:
+        st.button(
+            "⬇️ Load more",
+            on_click=_load_more_alerts,
+            args=(log_filters, page_size),
+            disabled=not st.session_state.alert_log_has_more
+        )
@@ -0,0 +1,57 @@
+import streamlit as st
+import pandas as pd
+import datetime
+import plotly.express as px
+
+from request_log import REQUEST_LOG_FILE, TEXT_LENGTH_EDGES, get_request_monitor
+
+# Sliding windows offered by the live traffic page, and its refresh interval
+LIVE_TRAFFIC_WINDOWS = {"1 min": 60, "5 min": 300, "15 min": 900, "1 hour": 3600}
+LIVE_TRAFFIC_REFRESH_SECONDS = 5
+
+
+def show_live_traffic():
+    st.title("📡 Live Traffic")
+    st.caption(f"Tailing `{REQUEST_LOG_FILE}`; only lines appended since the last refresh are parsed.")
+    window_label = st.radio("Sliding window:", list(LIVE_TRAFFIC_WINDOWS), index=1, horizontal=True)
+    render_live_traffic(LIVE_TRAFFIC_WINDOWS[window_label])
+
+
+@st.fragment(run_every=LIVE_TRAFFIC_REFRESH_SECONDS)
+def render_live_traffic(window_seconds):
+    monitor = get_request_monitor()
+    monitor.poll()
+    snapshot = monitor.snapshot(window_seconds)
+    if not snapshot["total_requests"]:
+        st.info(f"No requests logged yet in '{REQUEST_LOG_FILE}'.")
+        return
+
+    window = snapshot["window"]
+    latest = datetime.datetime.fromtimestamp(snapshot["latest_second"])
+    col_rate, col_requests, col_p50, col_p95, col_p99 = st.columns(5)
+    col_rate.metric("Requests / s", f"{window['rate_per_second']:.2f}")
+    col_requests.metric("Requests in window", window["requests"])
+    for col, name in ((col_p50, "p50"), (col_p95, "p95"), (col_p99, "p99")):
+        value = window[f"latency_{name}_ms"]
+        col.metric(f"Latency {name}", f"≤ {value:.0f} ms" if value is not None else "N/A")
+    st.caption(f"Newest request at {latest:%Y-%m-%d %H:%M:%S}")
+
+    # Tumbling one-minute windows over the whole ring buffer
+    per_minute = pd.DataFrame(snapshot["per_minute"], columns=["Minute", "Requests"])
+    # Local time, like the newest request caption above
+    per_minute["Minute"] = pd.to_datetime(per_minute["Minute"].map(datetime.datetime.fromtimestamp))
+    fig_rate = px.bar(per_minute, x="Minute", y="Requests", title="Requests per Minute")
+    st.plotly_chart(fig_rate, use_container_width=True)
+
+    col_classes, col_lengths = st.columns(2)
+    with col_classes:
+        if window["class_mix"]:
+            class_mix = pd.DataFrame(list(window["class_mix"].items()), columns=["Prediction", "Requests"])
+            fig_classes = px.pie(class_mix, names="Prediction", values="Requests", title="Prediction Class Mix")
+            st.plotly_chart(fig_classes, use_container_width=True)
+    with col_lengths:
+        edges = TEXT_LENGTH_EDGES.tolist()
+        bins = [f"< {edges[0]}"] + [f"{low}-{high - 1}" for low, high in zip(edges, edges[1:])] + [f"≥ {edges[-1]}"]
+        lengths = pd.DataFrame({"Text length": bins, "Requests": window["text_length_counts"]})
+        fig_lengths = px.bar(lengths, x="Text length", y="Requests", title="Text Length Distribution")
+        st.plotly_chart(fig_lengths, use_container_width=True)
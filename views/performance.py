@@ -0,0 +1,51 @@
+import streamlit as st
+import pandas as pd
+
+import perf
+
+
+def show_performance():
+    st.title("⏱️ Performance")
+    st.caption("Timing spans of the last reruns of each page. Instrumentation costs nothing while it is off.")
+
+    col_enabled, col_profiler, col_clear = st.columns([0.3, 0.4, 0.3])
+    with col_enabled:
+        enabled = st.toggle("Record timings", value=perf.is_enabled())
+    with col_profiler:
+        profiler_options = ["None", "cprofile", "pyinstrument"]
+        profiler_choice = st.selectbox(
+            "Profile each rerun with:", profiler_options, index=profiler_options.index(perf.profiler() or "None")
+        )
+    perf.configure(enabled=enabled, profiler="" if profiler_choice == "None" else profiler_choice)
+    with col_clear:
+        if st.button("🗑️ Clear history"):
+            perf.clear_history()
+
+    reruns = perf.recent_reruns()
+    if not reruns:
+        st.info("No reruns recorded yet. Turn on recording and use the other pages.")
+        return
+
+    pages = sorted({record["page"] for record in reruns})
+    page = st.selectbox("Page:", ["All pages"] + pages)
+    page_filter = None if page == "All pages" else page
+    st.subheader("Spans (p50 / p95)")
+    st.dataframe(pd.DataFrame(perf.span_stats(page_filter)), hide_index=True, use_container_width=True)
+
+    st.subheader(f"Last {len(reruns)} reruns")
+    page_reruns = [record for record in reruns if page_filter is None or record["page"] == page_filter]
+    st.dataframe(
+        pd.DataFrame({
+            "Started": [record["started_at"] for record in page_reruns],
+            "Page": [record["page"] for record in page_reruns],
+            "Total (ms)": [round(record["total_ms"], 1) for record in page_reruns],
+            "Slowest span": [max(record["spans"], key=record["spans"].get) if record["spans"] else "" for record in page_reruns],
+            "Profiled": [record["profile"] is not None for record in page_reruns],
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+    profiled = [record for record in page_reruns if record["profile"]]
+    if profiled:
+        with st.expander("Profile of the latest profiled rerun", expanded=False):
+            st.code(profiled[0]["profile"], language="text")
@@ -0,0 +1,168 @@
+import streamlit as st
+import pandas as pd
+import os
+import plotly.express as px
+
+import perf
+from dashboard_cache import clear_report_caches, load_report_filters, load_report_summary, load_report_types, query_reports
+from report_store import REPORTS_DIR, REPORTS_PAGE_SIZE, read_report, report_cache
+
+
+def _report_label(report):
+    """Labels a report by the timestamp parsed from its name, or the raw name if there is none."""
+    return f"{report['timestamp']:%Y-%m-%d %H:%M:%S}" if report["timestamp"] else report["name"]
+
+
+def _show_report_summary(summary):
+    """Renders a pre-rendered report summary: headline counters, static charts and tables."""
+    for group in summary["counters"]:
+        if group["tests"]:
+            continue
+        if group["title"]:
+            st.markdown(f"**{group['title']}**")
+        metric_columns = st.columns(min(len(group["values"]), 4))
+        for i, (label, value) in enumerate(group["values"]):
+            if isinstance(value, float):
+                metric_columns[i % len(metric_columns)].metric(label, f"{value:g}")
+            elif "NOT" in value:
+                st.success(value)
+            else:
+                st.warning(value)
+
+    if summary["charts"]:
+        chart_columns = st.columns(min(len(summary["charts"]), 3))
+        for i, chart in enumerate(summary["charts"]):
+            with chart_columns[i % len(chart_columns)]:
+                st.image(chart["svg"])
+
+    if summary["tests"]:
+        st.markdown("**Tests**")
+        tests_df = pd.DataFrame(summary["tests"]).rename(
+            columns={"title": "Test", "state": "State", "description": "Description"}
+        )
+        st.dataframe(tests_df[["State", "Test", "Description"]], hide_index=True, use_container_width=True)
+    if summary["columns"]:
+        st.markdown("**Column drift**")
+        st.dataframe(pd.DataFrame(summary["columns"]), hide_index=True, use_container_width=True)
+    for table in summary["tables"]:
+        if table["title"]:
+            st.markdown(f"**{table['title']}**")
+        st.dataframe(pd.DataFrame(table["data"], columns=table["header"]), hide_index=True, use_container_width=True)
+
+
+def show_dashboard():
+    st.title("📊 Model Monitoring Reports")
+    base_dir = REPORTS_DIR
+    if not os.path.exists(base_dir):
+        st.warning("Folder 'reports' does not exist. Please upload reports first.")
+        return
+
+    col_btn_refresh, col_empty = st.columns([0.2, 0.8])
+    with col_btn_refresh:
+        if st.button("🔄 Rescan Reports"):
+            clear_report_caches()
+
+    # The index is refreshed by an mtime scan, at most every REPORT_CACHE_TTL_SECONDS across sessions
+    with perf.span("reports.index"):
+        dashboard_types = load_report_types()
+    if not dashboard_types:
+        st.warning("No report types found in the 'reports' folder.")
+        return
+
+    # Only the selected type and report are loaded, so reruns do not read every HTML file
+    dash_type = st.radio("Report type:", dashboard_types, horizontal=True)
+    with perf.span("reports.index"):
+        (first_date, last_date), metric_names = load_report_filters(dash_type)
+
+    col_dates, col_metric, col_min, col_max = st.columns([0.3, 0.3, 0.2, 0.2])
+    with col_dates:
+        date_range = st.date_input(
+            "Report date range:",
+            value=(first_date, last_date) if first_date else (),
+            min_value=first_date,
+            max_value=last_date,
+            key=f"report_dates_{dash_type}"
+        )
+    with col_metric:
+        filter_metric = st.selectbox("Filter by metric:", ["(none)"] + metric_names, key=f"report_metric_{dash_type}")
+    min_value = max_value = None
+    if filter_metric != "(none)":
+        with col_min:
+            min_value = st.number_input("Min value", value=None, key=f"report_metric_min_{dash_type}")
+        with col_max:
+            max_value = st.number_input("Max value", value=None, key=f"report_metric_max_{dash_type}")
+
+    start_date = date_range[0] if len(date_range) > 0 else None
+    end_date = date_range[1] if len(date_range) > 1 else start_date
+    with perf.span("reports.index"):
+        report_files = query_reports(
+            dash_type,
+            start_date=start_date,
+            end_date=end_date,
+            metric=None if filter_metric == "(none)" else filter_metric,
+            min_value=min_value,
+            max_value=max_value
+        )
+    if not report_files:
+        st.warning("No reports match these filters.")
+        return
+
+    if metric_names:
+        with st.expander("📈 Metrics over time", expanded=False):
+            chart_metrics = st.multiselect(
+                "Metrics:",
+                metric_names,
+                default=[filter_metric] if filter_metric != "(none)" else metric_names[:1],
+                key=f"report_chart_metrics_{dash_type}"
+            )
+            chart_df = pd.DataFrame([
+                {"Report time": report["timestamp"], "Metric": metric, "Value": report["metrics"][metric]}
+                for report in report_files if report["timestamp"]
+                for metric in chart_metrics if metric in report["metrics"]
+            ])
+            if not chart_df.empty:
+                with perf.span("reports.chart.metrics"):
+                    fig_metrics = px.line(chart_df.sort_values("Report time"), x="Report time", y="Value", color="Metric", markers=True)
+                    st.plotly_chart(fig_metrics, use_container_width=True)
+
+    page_count = (len(report_files) - 1) // REPORTS_PAGE_SIZE + 1
+    col_report, col_page = st.columns([0.8, 0.2])
+    with col_page:
+        page = st.number_input(
+            f"Page (of {page_count})",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            step=1,
+            key=f"report_page_{dash_type}"
+        )
+    page_reports = report_files[(page - 1) * REPORTS_PAGE_SIZE:page * REPORTS_PAGE_SIZE]
+    reports_by_name = {report["name"]: report for report in page_reports}
+    with col_report:
+        selected_name = st.selectbox(
+            "Select a report:",
+            options=list(reports_by_name),
+            format_func=lambda name: _report_label(reports_by_name[name]),
+            key=f"report_select_{dash_type}"
+        )
+
+    selected_report = reports_by_name[selected_name]
+    st.caption(f"{len(report_files)} reports in '{dash_type}' · {selected_report['size'] / 1_048_576:.1f} MB")
+    with perf.span("reports.summary"):
+        summary = load_report_summary(selected_report["path"], selected_report["sha256"])
+    if summary is not None:
+        _show_report_summary(summary)
+    # The full Evidently HTML is several MB of JavaScript, so it is only sent to the browser on request
+    show_full = st.toggle("Show full interactive report", value=summary is None, key=f"report_full_{dash_type}")
+    if show_full:
+        html_content = read_report(selected_report["path"])
+        with perf.span("reports.render"):
+            st.components.v1.html(html_content, height=1000, scrolling=True)
+
+    with st.expander("Report cache statistics", expanded=False):
+        cache_stats = report_cache.stats()
+        col_hits, col_misses, col_evictions, col_size = st.columns(4)
+        col_hits.metric("Hits", cache_stats["hits"])
+        col_misses.metric("Misses", cache_stats["misses"], help=f"{cache_stats['dedup_hits']} served from identical content")
+        col_evictions.metric("Evictions", cache_stats["evictions"])
+        col_size.metric("Cached", f"{cache_stats['bytes'] / 1_048_576:.1f} / {cache_stats['max_bytes'] / 1_048_576:.0f} MB")
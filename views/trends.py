@@ -0,0 +1,73 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+import perf
+from dashboard_cache import load_metric_series_bounds, load_metric_series_names, query_metric_series
+from metric_series import SERIES_MAX_POINTS
+
+# Series selected when the page is first opened, if they exist
+DEFAULT_TREND_SERIES = ("Model Drift/Accuracy", "Model Drift/F1")
+
+
+def show_trends():
+    st.title("📈 Metric Trends")
+    st.caption(
+        "Metrics of every indexed report and of logged alerts. Long ranges are served from "
+        f"hourly, daily or weekly min/mean/max buckets, at most {SERIES_MAX_POINTS} points per series."
+    )
+    with perf.span("trends.series"):
+        series_names = load_metric_series_names()
+    if not series_names:
+        st.info("No metrics recorded yet. They are fed from the reports index and from logged alerts.")
+        return
+
+    selected_series = st.multiselect(
+        "Metrics:",
+        series_names,
+        default=[name for name in DEFAULT_TREND_SERIES if name in series_names] or series_names[:1],
+        key="trend_series"
+    )
+    if not selected_series:
+        st.info("Select at least one metric.")
+        return
+
+    first_date, last_date = load_metric_series_bounds(tuple(selected_series))
+    if first_date is None:
+        st.info("The selected metrics have no points.")
+        return
+    date_range = st.date_input(
+        "Date range:",
+        value=(first_date, last_date),
+        min_value=first_date,
+        max_value=last_date,
+        key="trend_dates"
+    )
+    start_date = date_range[0] if len(date_range) > 0 else first_date
+    end_date = date_range[1] if len(date_range) > 1 else start_date
+
+    fig = go.Figure()
+    resolutions = {}
+    with perf.span("trends.query"):
+        for series in selected_series:
+            resolution, rows = query_metric_series(series, start_date, end_date)
+            resolutions[series] = resolution
+            if not rows:
+                continue
+            series_df = pd.DataFrame(rows)
+            if resolution != "raw":
+                # Shaded band between the bucket minimum and maximum
+                fig.add_trace(go.Scatter(
+                    x=pd.concat([series_df["time"], series_df["time"][::-1]]),
+                    y=pd.concat([series_df["max"], series_df["min"][::-1]]),
+                    fill="toself", opacity=0.2, line={"width": 0}, hoverinfo="skip",
+                    showlegend=False, name=f"{series} min/max"
+                ))
+            fig.add_trace(go.Scatter(
+                x=series_df["time"], y=series_df["mean"], mode="lines+markers", name=series,
+                customdata=series_df[["min", "max", "count"]],
+                hovertemplate="%{y:.4g} (min %{customdata[0]:.4g}, max %{customdata[1]:.4g}, n=%{customdata[2]})"
+            ))
+    fig.update_layout(xaxis_title="Time", yaxis_title="Value", legend_title="Metric")
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(" · ".join(f"{series}: {resolution}" for series, resolution in resolutions.items()))
@@ -0,0 +1,245 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import os
+import hashlib
+
+import perf
+from dashboard_cache import list_results_files
+from quality_metrics import LABEL_COLUMNS, PREDICTION_COLUMNS, apply_editor_changes, base_confusion_matrix, find_column
+from results_edits import (ResultsEditLog, apply_change_sets, change_set_size, editor_change_set, get_results_edit_log,
+                           results_signature, write_results_file)
+from results_sampling import (LARGE_RESULTS_ROWS, RESULTS_PAGE_ROWS, SAMPLE_ROWS, SAMPLE_SEED, cached_stratified_sample,
+                              label_counts)
+from results_store import RESULTS_DIR, load_results_file, load_uploaded_results
+
+
+def show_quality_metrics(df, view, editor_state, label_column, prediction_column):
+    """
+    Shows accuracy, precision, recall and F1 of the whole file with the
+    current editor changes applied. The file's confusion matrix is computed
+    once; edits only adjust the counts of the rows they touch.
+    """
+    base = base_confusion_matrix(df, label_column, prediction_column)
+    confusion = apply_editor_changes(base, view, editor_state, label_column, prediction_column)
+    quality = confusion.metrics()
+
+    st.markdown("**📐 Model quality (all rows, with edits)**")
+    col_accuracy, col_f1 = st.columns(2)
+    col_accuracy.metric("Accuracy", f"{quality['accuracy']:.3f}")
+    col_f1.metric("F1 (macro)", f"{quality['f1']:.3f}")
+    col_precision, col_recall = st.columns(2)
+    col_precision.metric("Precision (macro)", f"{quality['precision']:.3f}")
+    col_recall.metric("Recall (macro)", f"{quality['recall']:.3f}")
+    st.caption(f"Computed over {quality['rows']:,} labelled rows.")
+
+    with st.expander("Per-class metrics", expanded=False):
+        st.dataframe(quality['per_class'].round(3), hide_index=True, use_container_width=True)
+    with st.expander("Confusion matrix (rows: label, columns: prediction)", expanded=False):
+        st.dataframe(confusion.to_frame(), use_container_width=True)
+
+def csv_editor():
+    st.title("📁 Validate Model Results")
+
+    load_option = st.radio(
+        "Choose how to load the CSV file:",
+        ("Upload from computer", "Choose from 'results' folder")
+    )
+
+    df = None
+    selected_file_name = None
+    file_path = None
+    edit_log = None
+
+    if load_option == "Upload from computer":
+        uploaded_file = st.file_uploader("Drag and drop a CSV file here", type=["csv"])
+        if uploaded_file is not None:
+            try:
+                with perf.span("results.load"):
+                    df = load_uploaded_results(uploaded_file)
+                selected_file_name = uploaded_file.name
+                # Edits of an upload are kept for this session only
+                edit_log = st.session_state.setdefault(f"results_edit_log_{uploaded_file.file_id}", ResultsEditLog())
+                st.success(f"File loaded successfully: {uploaded_file.name}")
+            except Exception as e:
+                st.error(f"Error loading file: {e}")
+        else:
+            st.info("Please upload a CSV file to get started.")
+            return
+
+    elif load_option == "Choose from 'results' folder":
+        results_dir = RESULTS_DIR
+        if not os.path.exists(results_dir):
+            st.warning("⚠️ Folder 'results' not found. Please create this folder if you want to select files from here.")
+            return
+
+        csv_files = list_results_files(results_dir)
+        if not csv_files:
+            st.info("📭 No CSV files found in the 'results' folder.")
+            return
+
+        selected_file = st.selectbox("Select a CSV file", options=csv_files)
+        if selected_file:
+            file_path = os.path.join(results_dir, selected_file)
+            with perf.span("results.load"):
+                df = load_results_file(file_path)
+            selected_file_name = selected_file
+            edit_log = get_results_edit_log(file_path)
+
+    if df is not None:
+        if edit_log.stale:
+            st.warning("⚠️ The saved edits of this file were made against an older version of it and are not applied.")
+            st.button("🗑️ Discard saved edits", on_click=edit_log.discard,
+                      args=(results_signature(file_path) if file_path else None,))
+        # Saved edits are applied once per log version; otherwise df is the cached frame shared across reruns
+        with perf.span("results.merge_edits"):
+            df = edit_log.merged(df)
+        label_column = find_column(df, LABEL_COLUMNS)
+        prediction_column = find_column(df, PREDICTION_COLUMNS)
+        selected_labels = None
+        label_filter_key = "all"
+        if label_column:
+            st.subheader(f"🔍 Filter by '{label_column}'")
+            if isinstance(df[label_column].dtype, pd.CategoricalDtype):
+                label_values = df[label_column].cat.categories.tolist()
+            else:
+                label_values = df[label_column].dropna().unique().tolist()
+            # Counted over every row of the file in one vectorized pass, once per loaded frame
+            with perf.span("results.label_counts"):
+                counts = label_counts(df, label_column)
+            chosen_labels = st.multiselect(
+                f"Select {label_column} values to view", 
+                options=label_values, 
+                default=label_values,
+                format_func=lambda value: f"{value} ({counts.get(value, 0):,} rows)"
+            )
+            
+            label_filter_key = hashlib.sha1(repr(sorted(map(str, chosen_labels))).encode()).hexdigest()[:12]
+            if not chosen_labels:
+                st.info(f"No {label_column}s selected, showing all data.")
+            elif len(chosen_labels) < len(label_values):
+                selected_labels = chosen_labels
+        else:
+            st.info("ℹ️ CSV file does not have a 'label' or 'Label' column. No label filter will be applied.")
+
+        st.subheader("✏️ Edit data:")
+        col_mode, col_size, col_seed = st.columns([0.5, 0.25, 0.25])
+        with col_mode:
+            # Positions are only computed for the rows sent to the editor; nothing else is copied
+            with perf.span("results.sample"):
+                sample_positions, strata = cached_stratified_sample(
+                    df, label_column, prediction_column, selected_labels,
+                    rows=st.session_state.get("results_sample_rows", SAMPLE_ROWS),
+                    seed=st.session_state.get("results_sample_seed", SAMPLE_SEED)
+                )
+            selected_rows = int(strata["rows"].sum())
+            view_modes = ["Stratified sample", "Pages"]
+            if selected_rows <= LARGE_RESULTS_ROWS:
+                view_modes.append("All rows")
+            # Small selections open with every row, large ones with the sample
+            view_mode = st.radio("Rows to edit:", view_modes, index=len(view_modes) - 1 if len(view_modes) > 2 else 0,
+                                 horizontal=True,
+                                 key=f"results_view_mode_{selected_rows > LARGE_RESULTS_ROWS}")
+        view_key = view_mode
+        if view_mode == "Stratified sample":
+            with col_size:
+                st.number_input("Sample size", min_value=10, max_value=LARGE_RESULTS_ROWS, step=100,
+                                value=SAMPLE_ROWS, key="results_sample_rows")
+            with col_seed:
+                st.number_input("Seed", min_value=0, step=1, value=SAMPLE_SEED, key="results_sample_seed")
+            view = df.iloc[sample_positions]
+            view_key += f"_{len(sample_positions)}_{st.session_state.results_sample_seed}"
+        elif view_mode == "Pages":
+            page_count = max((selected_rows - 1) // RESULTS_PAGE_ROWS + 1, 1)
+            with col_size:
+                page = st.number_input(f"Page (of {page_count:,})", min_value=1, max_value=page_count, value=1, step=1)
+            page_slice = slice((page - 1) * RESULTS_PAGE_ROWS, page * RESULTS_PAGE_ROWS)
+            if selected_labels is None:
+                view = df.iloc[page_slice]
+            else:
+                with perf.span("results.filter"):
+                    view = df.iloc[np.flatnonzero(df[label_column].isin(selected_labels).to_numpy())[page_slice]]
+            view_key += f"_{page}"
+        elif selected_labels is None:
+            view = df
+        else:
+            with perf.span("results.filter"):
+                view = df[df[label_column].isin(selected_labels)]
+
+        disagreements = int(strata.loc[strata["disagreement"], "rows"].sum())
+        st.caption(
+            f"Showing {len(view):,} of {selected_rows:,} selected rows ({len(df):,} in the file)"
+            + (f" · {disagreements:,} selected rows where {label_column} ≠ {prediction_column} "
+               f"({disagreements / max(selected_rows, 1):.1%})" if prediction_column else "")
+            + (" · save edits before changing the page or sample" if view_mode != "All rows" else "")
+        )
+        if view_mode == "Stratified sample":
+            with st.expander("Sample strata", expanded=False):
+                st.dataframe(strata, hide_index=True, use_container_width=True)
+
+        # A new key per log version resets the editor once its changes are saved
+        editor_key = f"results_editor_{selected_file_name}_{label_filter_key}_{view_key}_{edit_log.version}"
+        if label_column and prediction_column:
+            col_editor, col_metrics = st.columns([0.7, 0.3])
+        else:
+            col_editor, col_metrics = st.container(), None
+
+        with col_editor:
+            with perf.span("results.editor"):
+                st.data_editor(view, num_rows="dynamic", use_container_width=True, key=editor_key)
+
+        if col_metrics is not None:
+            with col_metrics:
+                with perf.span("results.metrics"):
+                    show_quality_metrics(df, view, st.session_state.get(editor_key), label_column, prediction_column)
+
+        change_set = editor_change_set(view, st.session_state.get(editor_key))
+        pending = [change_set] if change_set else []
+        saved_rows = sum(change_set_size(saved) for saved in edit_log.change_sets)
+        st.caption(
+            f"{edit_log.version} saved change sets ({saved_rows} rows)"
+            + (f" in `{edit_log.path}`" if edit_log.path and edit_log.version else "")
+            + f" · {change_set_size(change_set) if change_set else 0} unsaved changes"
+        )
+
+        col_save, col_write, col_download = st.columns(3)
+        with col_save:
+            st.button(
+                "💾 Save edits",
+                on_click=edit_log.append,
+                args=(change_set,),
+                disabled=change_set is None or edit_log.stale,
+                help="Records only the changed, added and deleted rows in the file's edit log"
+            )
+        with col_write:
+            if file_path:
+                st.button(
+                    "📝 Write edits to file",
+                    on_click=_write_merged_file,
+                    args=(df, pending, file_path, edit_log),
+                    disabled=not (pending or edit_log.version) or edit_log.stale,
+                    help=f"Rewrites '{selected_file_name}' in '{RESULTS_DIR}' with every edit applied"
+                )
+
+        download_file_name = f"edited_{selected_file_name}" if selected_file_name else "edited_data.csv"
+        with col_download:
+            # The CSV is generated only when the button is clicked, not on every rerun
+            st.download_button(
+                "⬇️ Download edited CSV",
+                lambda: _export_csv(df, pending),
+                file_name=download_file_name,
+                mime="text/csv"
+            )
+
+
+def _export_csv(df, pending):
+    with perf.span("results.export"):
+        return apply_change_sets(df, pending).to_csv(index=False).encode("utf-8")
+
+
+def _write_merged_file(df, pending, file_path, edit_log):
+    """Writes the file with the saved and unsaved edits applied, then starts an empty edit log."""
+    with perf.span("results.write"):
+        signature = write_results_file(apply_change_sets(df, pending), file_path)
+    edit_log.discard(signature)
+    st.toast(f"Saved edits to {file_path}")